@@ -4,25 +4,41 @@ Chequeo semántico y de tipos para B-Minor
 '''
 
 from model   import *
-from Symtab  import Symtab
+from Symtab  import Symtab, FlatSymtab
 from Typesys import (
     typenames, check_binop, check_unaryop, CheckError,
-    is_array_type, get_array_element_type, is_compatible_type
+    is_array_type, get_array_element_type, is_compatible_type,
+    array_type, function_type,
+    integer_type, float_type, boolean_type, char_type, string_type, void_type,
 )
-from errors  import error, errors_detected
+from errors  import current_diagnostics
+from tracing import current_tracer
 
 
 class Check(Visitor):
+    def __init__(self, diag=None):
+        # Diagnostics donde se reportan los errores de esta compilación
+        self.diag = diag or current_diagnostics()
+
     @classmethod
-    def checker(cls, n: Program):
+    def checker(cls, n: Program, diag=None, externs=None, env=None):
         """
-        1. Crear la tabla de símbolos global
-        2. Visitar todas las declaraciones en n.body
+        1. Crear la tabla de símbolos global: por defecto una FlatSymtab
+           (los scopes se liberan al cerrarse). Se puede
+           pasar otra, p. ej. FlatSymtab('global', retain=True) o
+           Symtab('global') para volcar el árbol de scopes con print().
+        2. Registrar las declaraciones externas (funciones y globales
+           definidas en otros archivos; ver build.py)
+        3. Visitar todas las declaraciones en n.body
         """
-        checker = cls()
-        env = Symtab('global')
-        for decl in n.body:
-            decl.accept(checker, env)
+        checker = cls(diag)
+        if env is None:
+            env = FlatSymtab('global')
+        with current_tracer().span('Check.checker', 'check'):
+            for decl in (externs or []):
+                env.add(decl.name, decl)
+            for decl in n.body:
+                decl.accept(checker, env)
         return env
     
     def _check_incdec_operand(self, n, env):
@@ -32,17 +48,17 @@ class Check(Visitor):
         """
         target = n.expr
         if not isinstance(target, VarLoc):
-            error("El operador ++/-- requiere una variable (lvalue)", n.lineno)
+            self.diag.error("El operador ++/-- requiere una variable (lvalue)", n.lineno)
             n.type = None
             return
 
         target.accept(self, env)  # fija tipo de la variable
-        if target.type != 'integer':
-            error(f"El operador ++/-- requiere 'integer', obtenido '{target.type}'", n.lineno)
+        if target.type is not integer_type:
+            self.diag.error(f"El operador ++/-- requiere 'integer', obtenido '{target.type}'", n.lineno)
             n.type = None
             return
 
-        n.type = 'integer'  # el valor de la expresión ++/-- es entero
+        n.type = integer_type  # el valor de la expresión ++/-- es entero
     
     def visit_PreInc(self, n: PreInc, env: Symtab):
         self._check_incdec_operand(n, env)
@@ -68,7 +84,7 @@ class Check(Visitor):
         if n.value is not None:
             n.value.accept(self, env)
             if not is_compatible_type(n.type, n.value.type):
-                error(
+                self.diag.error(
                     f"En asignación de '{n.name}', no coincide los tipos: "
                     f"esperado '{n.type}', obtenido '{n.value.type}'",
                     n.lineno
@@ -76,31 +92,53 @@ class Check(Visitor):
         try:
             env.add(n.name, n)
         except Symtab.SymbolConflictError:
-            error(f"La variable '{n.name}' ya declarada y con tipo diferente", n.lineno)
+            self.diag.error(f"La variable '{n.name}' ya declarada y con tipo diferente", n.lineno)
         except Symtab.SymbolDefinedError:
-            error(f"La variable '{n.name}' ya declarada", n.lineno)
+            self.diag.error(f"La variable '{n.name}' ya declarada", n.lineno)
 
     def visit_FuncDecl(self, n: FuncDecl, env: Symtab):
         """
         Registrar función, abrir scope propio, registrar parámetros,
         y visitar el cuerpo (BlockStmt garantizado).
+        Un prototipo (body None) solo registra la firma; la definición
+        posterior debe coincidir con él y lo reemplaza en la tabla.
         """
-        try:
-            env.add(n.name, n)
-        except Symtab.SymbolConflictError:
-            error(f"La función '{n.name}' ya declarada y con tipo diferente", n.lineno)
-        except Symtab.SymbolDefinedError:
-            error(f"La función '{n.name}' ya declarada", n.lineno)
+        prev = env.entries.get(n.name)
+        if isinstance(prev, FuncDecl) and (prev.body is None or n.body is None):
+            if not self._same_signature(prev, n):
+                self.diag.error(f"La función '{n.name}' no coincide con su prototipo", n.lineno)
+            elif n.body is not None:
+                env[n.name] = n
+        else:
+            try:
+                env.add(n.name, n)
+            except Symtab.SymbolConflictError:
+                self.diag.error(f"La función '{n.name}' ya declarada y con tipo diferente", n.lineno)
+            except Symtab.SymbolDefinedError:
+                self.diag.error(f"La función '{n.name}' ya declarada", n.lineno)
+
+        if n.body is None:
+            return
 
-        # Nuevo scope de función
-        fenv = Symtab(n.name, env)
+        with current_tracer().span(n.name, 'check'):
+            # Nuevo scope de función
+            fenv = env.push(n.name)
 
-        # Registrar parámetros como variables (para que VarLoc los resuelva)
-        for parm in n.parms:
-            parm.accept(self, fenv)
+            # Registrar parámetros como variables (para que VarLoc los resuelva)
+            for parm in n.parms:
+                parm.accept(self, fenv)
 
-        # Cuerpo: ahora SIEMPRE es BlockStmt
-        n.body.accept(self, fenv)
+            # Cuerpo: ahora SIEMPRE es BlockStmt
+            n.body.accept(self, fenv)
+            fenv.pop()
+
+    @staticmethod
+    def _same_signature(a: FuncDecl, b: FuncDecl):
+        """
+        Mismo tipo de retorno y mismos tipos de parámetros
+        """
+        return (function_type(a.type, [p.type for p in a.parms])
+                is function_type(b.type, [p.type for p in b.parms]))
 
     def visit_VarParm(self, n: VarParm, env: Symtab):
         """
@@ -110,9 +148,9 @@ class Check(Visitor):
         try:
             env.add(n.name, pseudo_decl)
         except Symtab.SymbolConflictError:
-            error(f"El parámetro '{n.name}' ya declarada y con tipo diferente", n.lineno)
+            self.diag.error(f"El parámetro '{n.name}' ya declarada y con tipo diferente", n.lineno)
         except Symtab.SymbolDefinedError:
-            error(f"El parámetro '{n.name}' ya declarada", n.lineno)
+            self.diag.error(f"El parámetro '{n.name}' ya declarada", n.lineno)
 
     # -------------
     # Sentencias
@@ -122,9 +160,10 @@ class Check(Visitor):
         """
         Crear nuevo scope de bloque y visitar sentencias.
         """
-        benv = Symtab(f"block_{id(n)}", env)
+        benv = env.push(f"block_{id(n)}")
         for stmt in (n.statements or []):
             stmt.accept(self, benv)
+        benv.pop()
 
     def visit_ReturnStmt(self, n: ReturnStmt, env: Symtab):
         """
@@ -132,40 +171,40 @@ class Check(Visitor):
         - Verificar tipo de retorno
         """
         if env.name == 'global':
-            error("La instrucción return está por fuera de una función", n.lineno)
+            self.diag.error("La instrucción return está por fuera de una función", n.lineno)
             return
 
         func = env.get(env.name)  # busca la FuncDecl en el scope padre
         if n.expr is not None:
             n.expr.accept(self, env)
-            if func and func.type != n.expr.type:
-                error(f"La función '{func.name}' retorna un tipo diferente", n.lineno)
+            if func and func.type is not n.expr.type:
+                self.diag.error(f"La función '{func.name}' retorna un tipo diferente", n.lineno)
         else:
             # Si tu lenguaje permite 'return;' solo en void, valida aquí si quieres
-            if func and func.type != 'void':
-                error(f"La función '{func.name}' requiere un valor de retorno", n.lineno)
+            if func and func.type is not void_type:
+                self.diag.error(f"La función '{func.name}' requiere un valor de retorno", n.lineno)
 
     def visit_AssignStmt(self, n: AssignStmt, env: Symtab):
         n.location.accept(self, env)
         n.expr.accept(self, env)
         if not is_compatible_type(n.location.type, n.expr.type):
-            error(f"Asignación incompatible: '{n.location.type}' = '{n.expr.type}'", n.lineno)
+            self.diag.error(f"Asignación incompatible: '{n.location.type}' = '{n.expr.type}'", n.lineno)
 
     def visit_ExprStmt(self, n: ExprStmt, env: Symtab):
         n.expr.accept(self, env)
 
     def visit_IfStmt(self, n: IfStmt, env: Symtab):
         n.condition.accept(self, env)
-        if n.condition.type != 'boolean':
-            error(f"Condición if debe ser booleana, obtenido '{n.condition.type}'", n.lineno)
+        if n.condition.type is not boolean_type:
+            self.diag.error(f"Condición if debe ser booleana, obtenido '{n.condition.type}'", n.lineno)
         n.then_stmt.accept(self, env)
         if n.else_stmt is not None:
             n.else_stmt.accept(self, env)
 
     def visit_WhileStmt(self, n: WhileStmt, env: Symtab):
         n.condition.accept(self, env)
-        if n.condition.type != 'boolean':
-            error(f"Condición while debe ser booleana, obtenido '{n.condition.type}'", n.lineno)
+        if n.condition.type is not boolean_type:
+            self.diag.error(f"Condición while debe ser booleana, obtenido '{n.condition.type}'", n.lineno)
         n.stmt.accept(self, env)
 
     # -------------
@@ -177,13 +216,13 @@ class Check(Visitor):
         n.right.accept(self, env)
         n.type = check_binop(n.oper, n.left.type, n.right.type)
         if n.type is None:
-            error(f"En '{n.oper}', no coincide los tipos", n.lineno)
+            self.diag.error(f"En '{n.oper}', no coincide los tipos", n.lineno)
 
     def visit_UnaryOper(self, n: UnaryOper, env: Symtab):
         n.operand.accept(self, env)
         n.type = check_unaryop(n.oper, n.operand.type)
         if n.type is None:
-            error(f"Operación unaria '{n.oper}' no permitida para tipo '{n.operand.type}'", n.lineno)
+            self.diag.error(f"Operación unaria '{n.oper}' no permitida para tipo '{n.operand.type}'", n.lineno)
 
     def visit_FuncCall(self, n: FuncCall, env: Symtab):
         """
@@ -193,7 +232,7 @@ class Check(Visitor):
         """
         func_decl = env.get(n.name)
         if func_decl is None:
-            error(f"La función '{n.name}' no está definida", n.lineno)
+            self.diag.error(f"La función '{n.name}' no está definida", n.lineno)
             n.type = None
             return
 
@@ -201,7 +240,7 @@ class Check(Visitor):
             arg.accept(self, env)
 
         if len(n.args) != len(func_decl.parms):
-            error(
+            self.diag.error(
                 f"La función '{n.name}' espera {len(func_decl.parms)} argumentos, "
                 f"se proporcionaron {len(n.args)}",
                 n.lineno
@@ -211,7 +250,7 @@ class Check(Visitor):
 
         for i, (arg, parm) in enumerate(zip(n.args, func_decl.parms), start=1):
             if not is_compatible_type(parm.type, arg.type):
-                error(
+                self.diag.error(
                     f"Argumento {i} de función '{n.name}': "
                     f"esperado '{parm.type}', obtenido '{arg.type}'",
                     n.lineno
@@ -221,7 +260,7 @@ class Check(Visitor):
     def visit_VarLoc(self, n: VarLoc, env: Symtab):
         decl = env.get(n.name)
         if decl is None:
-            error(f"La variable '{n.name}' no está definida", n.lineno)
+            self.diag.error(f"La variable '{n.name}' no está definida", n.lineno)
             n.type = None
         else:
             n.type = decl.type
@@ -236,26 +275,26 @@ class Check(Visitor):
         # Buscar símbolo
         arr_decl = env.get(n.name)
         if arr_decl is None:
-            error(f"El arreglo '{n.name}' no está definido", n.lineno)
+            self.diag.error(f"El arreglo '{n.name}' no está definido", n.lineno)
             n.type = None
             return
 
         # Verificar que sea un ArrayDecl
         if not isinstance(arr_decl, ArrayDecl):
-            error(f"'{n.name}' no es un arreglo", n.lineno)
+            self.diag.error(f"'{n.name}' no es un arreglo", n.lineno)
             n.type = None
             return
 
         # Validar 1 índice
         if not isinstance(n.indices, list) or len(n.indices) != 1:
-            error("Solo se soportan accesos 1D: a[i]", n.lineno)
+            self.diag.error("Solo se soportan accesos 1D: a[i]", n.lineno)
             n.type = None
             return
 
         idx = n.indices[0]
         idx.accept(self, env)
-        if getattr(idx, "type", None) != 'integer':
-            error(f"Índice de array debe ser integer, obtenido '{idx.type}'", n.lineno)
+        if getattr(idx, "type", None) is not integer_type:
+            self.diag.error(f"Índice de array debe ser integer, obtenido '{idx.type}'", n.lineno)
             n.type = None
             return
 
@@ -265,7 +304,7 @@ class Check(Visitor):
 
     def visit_ArrayLiteral(self, n: ArrayLiteral, env: Symtab):
         if not n.elements:
-            error("Array literal vacío", n.lineno)
+            self.diag.error("Array literal vacío", n.lineno)
             n.type = None
             return
 
@@ -275,9 +314,9 @@ class Check(Visitor):
         for i, e in enumerate(n.elements[1:], start=2):
             e.accept(self, env)
             if not is_compatible_type(elem_t, e.type):
-                error(f"Elemento {i} del array: esperado '{elem_t}', obtenido '{e.type}'", n.lineno)
+                self.diag.error(f"Elemento {i} del array: esperado '{elem_t}', obtenido '{e.type}'", n.lineno)
 
-        n.type = f"array[{len(n.elements)}]{elem_t}"
+        n.type = array_type(elem_t, [len(n.elements)])
 
     def visit_PrintStmt(self, n: PrintStmt, env: Symtab):
         """
@@ -288,9 +327,9 @@ class Check(Visitor):
         n.expr.accept(self, env)
         t = getattr(n.expr, "type", None)
         # Por ahora aceptamos estos (enteros/boolean ya, char/string/float listos para cuando los uses)
-        imprimibles = {"integer", "boolean", "char", "string", "float"}
+        imprimibles = {integer_type, boolean_type, char_type, string_type, float_type}
         if t not in imprimibles:
-            error(f"print: tipo no soportado '{t}'", n.lineno)
+            self.diag.error(f"print: tipo no soportado '{t}'", n.lineno)
 
     def visit_ForStmt(self, n: ForStmt, env: Symtab):
         """
@@ -300,15 +339,15 @@ class Check(Visitor):
         - update puede ser AssignStmt o ExprStmt o None.
         - stmt es siempre BlockStmt (gracias a ensure_blockstmt).
         """
-        fenv = Symtab(f"for_{id(n)}", env)
+        fenv = env.push(f"for_{id(n)}")
 
         if n.init is not None:
             n.init.accept(self, fenv)
 
         if n.condition is not None:
             n.condition.accept(self, fenv)
-            if n.condition.type != 'boolean':
-                error(f"Condición for debe ser booleana, obtenido '{n.condition.type}'", n.lineno)
+            if n.condition.type is not boolean_type:
+                self.diag.error(f"Condición for debe ser booleana, obtenido '{n.condition.type}'", n.lineno)
 
         # cuerpo
         n.stmt.accept(self, fenv)
@@ -316,6 +355,24 @@ class Check(Visitor):
         # update se chequea al final del ciclo
         if n.update is not None:
             n.update.accept(self, fenv)
+        fenv.pop()
+
+    def visit_RangeFor(self, n: RangeFor, env: Symtab):
+        """
+        Maneja 'for i in range(a, b) stmt'.
+        - a y b se chequean en el scope de afuera (se evalúan antes de
+          que exista i) y deben ser enteros.
+        - i se declara como integer en un scope propio del loop.
+        """
+        for bound in (n.start, n.stop):
+            bound.accept(self, env)
+            if bound.type is not integer_type:
+                self.diag.error(f"Límite de range debe ser entero, obtenido '{bound.type}'", n.lineno)
+
+        fenv = env.push(f"range_{id(n)}")
+        n.var.accept(self, fenv)
+        n.stmt.accept(self, fenv)
+        fenv.pop()
 
     def visit_ArrayDecl(self, n: ArrayDecl, env: Symtab):
         """
@@ -326,7 +383,7 @@ class Check(Visitor):
         """
         # Validación básica de dimensión
         if not isinstance(n.dimensions, list) or len(n.dimensions) != 1:
-            error("Solo se soportan arreglos 1D por ahora", n.lineno)
+            self.diag.error("Solo se soportan arreglos 1D por ahora", n.lineno)
             return
 
         dim = n.dimensions[0]
@@ -336,20 +393,20 @@ class Check(Visitor):
         elif isinstance(dim, IntegerLit):
             size = dim.value
         else:
-            error("Tamaño de arreglo debe ser entero literal", n.lineno)
+            self.diag.error("Tamaño de arreglo debe ser entero literal", n.lineno)
             return
 
         if size <= 0:
-            error("Tamaño de arreglo debe ser > 0", n.lineno)
+            self.diag.error("Tamaño de arreglo debe ser > 0", n.lineno)
             return
 
         # Registrar símbolo (tal cual como haces con VarDecl)
         try:
             env.add(n.name, n)
         except Symtab.SymbolConflictError:
-            error(f"El arreglo '{n.name}' ya declarado con tipo diferente", n.lineno)
+            self.diag.error(f"El arreglo '{n.name}' ya declarado con tipo diferente", n.lineno)
         except Symtab.SymbolDefinedError:
-            error(f"El arreglo '{n.name}' ya declarado", n.lineno)
+            self.diag.error(f"El arreglo '{n.name}' ya declarado", n.lineno)
 
 
     
@@ -71,7 +71,7 @@ class Symtab:
 		o FuncDeclaration)
 		'''
 		if name in self.entries:
-			if self.entries[name].type != value.type:
+			if self.entries[name].type is not value.type:
 				raise Symtab.SymbolConflictError()
 			else:
 				raise Symtab.SymbolDefinedError()
@@ -88,6 +88,19 @@ class Symtab:
 		elif self.parent:
 			return self.parent.get(name)
 		return None
+
+	def push(self, name):
+		'''
+		Abre un scope hijo y lo devuelve (misma interfaz que
+		FlatSymtab.push).
+		'''
+		return Symtab(name, self)
+
+	def pop(self):
+		'''
+		Cierra este scope. El árbol se conserva (ver print()).
+		'''
+		return self.parent
 		
 	def print(self):
 		print(f"Symbol Table: '{self.name}'")
@@ -101,3 +114,125 @@ class Symtab:
 		for child in self.children:
 			child.print()
 
+
+
+class FlatSymtab:
+	'''
+	Tabla de símbolos "plana" para el checker. En vez de una tabla
+	por scope encadenada a su padre, mantiene un solo dict
+	nombre -> pila de ligaduras y una pila de scopes abiertos:
+
+	- get() mira el tope de la pila del nombre, sin recorrer los padres.
+	- push()/pop() abren y cierran scopes; al cerrar uno se sacan sus
+	  ligaduras y el scope se libera (no queda colgado de un padre).
+
+	La ganancia es de memoria: el árbol conserva una tabla por cada
+	función, bloque y for hasta el final de la compilación. En tiempo
+	quedan a la par: con el anidamiento de los programas reales la
+	cadena de padres que recorre Symtab.get() es corta, y las búsquedas
+	pesan poco en el resto del chequeo (ver bench_symtab.py).
+
+	Con retain=True además se arma el árbol de Symtab de siempre,
+	solo para poder volcarlo con print().
+
+	Se usa con disciplina de pila (como recorre Check): el objeto que
+	devuelve push() es la misma tabla, y cada push() se cierra con su
+	pop().
+	'''
+	SymbolDefinedError = Symtab.SymbolDefinedError
+	SymbolConflictError = Symtab.SymbolConflictError
+
+	def __init__(self, name='global', retain=False):
+		self.bindings = {}	# nombre -> [valor más externo, ..., valor visible]
+		self.scopes = []	# [(nombre, {nombre: valor})], el último es el actual
+		self.retain = retain
+		self.tree = None	# raíz del árbol retenido (Symtab)
+		self._records = []	# Symtab del árbol para cada scope abierto
+		self.push(name)
+
+	@property
+	def name(self):
+		return self.scopes[-1][0]
+
+	@property
+	def entries(self):
+		return self.scopes[-1][1]
+
+	def push(self, name):
+		'''
+		Abre un scope nuevo (hijo del actual)
+		'''
+		self.scopes.append((name, {}))
+		if self.retain:
+			parent = self._records[-1] if self._records else None
+			record = Symtab(name, parent)
+			if parent is None:
+				self.tree = record
+			self._records.append(record)
+		return self
+
+	def pop(self):
+		'''
+		Cierra el scope actual y descarta sus ligaduras
+		'''
+		_, entries = self.scopes.pop()
+		for name in entries:
+			stack = self.bindings[name]
+			stack.pop()
+			if not stack:
+				del self.bindings[name]
+		if self.retain:
+			self._records.pop()
+		return self
+
+	def __getitem__(self, name):
+		return self.entries[name]
+
+	def __setitem__(self, name, value):
+		entries = self.entries
+		if name in entries:
+			self.bindings[name][-1] = value
+		else:
+			self.bindings.setdefault(name, []).append(value)
+		entries[name] = value
+		if self.retain:
+			self._records[-1][name] = value
+
+	def __contains__(self, name):
+		if name in self.entries:
+			return self.entries[name]
+		return False
+
+	def add(self, name, value):
+		'''
+		Agrega un símbolo al scope actual (mismos errores que Symtab.add)
+		'''
+		entries = self.entries
+		if name in entries:
+			if entries[name].type is not value.type:
+				raise Symtab.SymbolConflictError()
+			else:
+				raise Symtab.SymbolDefinedError()
+		self[name] = value
+
+	def get(self, name):
+		'''
+		Ligadura visible de 'name' (la del scope más interno), o None
+		'''
+		stack = self.bindings.get(name)
+		if stack:
+			return stack[-1]
+		return None
+
+	def print(self):
+		if self.tree is not None:
+			self.tree.print()
+			return
+		# Sin árbol retenido: solo los scopes abiertos
+		for name, entries in self.scopes:
+			print(f"Symbol Table: '{name}'")
+			print("-" * 40)
+			for k,v in entries.items():
+				value = f"{v.__class__.__name__}({v.name})" if isinstance(v, Node) else f"{v}"
+				print(f"{k}: {value}")
+			print()
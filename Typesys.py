@@ -22,6 +22,111 @@ class CheckError(Exception):
 	
 typenames = { 'integer', 'float', 'char', 'boolean', 'string', 'void' }
 
+
+# ---------------------------------------------------------------------
+# Objetos de tipo
+#
+# Los tipos son objetos "internados": hay un único objeto por tipo
+# (integer, array[10]integer, function integer(integer), ...), así que
+# se comparan por identidad y sirven de clave en dicts sin costo de
+# hashing de strings. str(t) da la escritura de siempre ('integer',
+# 'array[10]integer') para los mensajes de error.
+# ---------------------------------------------------------------------
+
+class Type:
+	__slots__ = ('name',)
+
+	def __init__(self, name):
+		self.name = name
+
+	def __str__(self):
+		return self.name
+
+	def __repr__(self):
+		return f"<type {self.name}>"
+
+	def __reduce__(self):
+		# Al deserializar se recupera el objeto internado
+		return (lookup_type, (self.name,))
+
+class PrimitiveType(Type):
+	__slots__ = ()
+
+class ArrayType(Type):
+	'''
+	Arreglo: tipo de elemento y dimensiones (None si no es un literal)
+	'''
+	__slots__ = ('element', 'dims')
+
+	def __init__(self, element, dims):
+		size = ''.join(f'[{d}]' if d is not None else '[?]' for d in dims)
+		super().__init__(f"array{size}{element}")
+		self.element = element
+		self.dims = dims
+
+	def __reduce__(self):
+		return (array_type, (self.element, self.dims))
+
+class FunctionType(Type):
+	'''
+	Función: tipo de retorno y tipos de los parámetros
+	'''
+	__slots__ = ('ret', 'params')
+
+	def __init__(self, ret, params):
+		super().__init__(f"function {ret}({', '.join(str(p) for p in params)})")
+		self.ret = ret
+		self.params = params
+
+	def __reduce__(self):
+		return (function_type, (self.ret, self.params))
+
+
+_primitives = { name: PrimitiveType(name) for name in typenames }
+
+integer_type = _primitives['integer']
+float_type   = _primitives['float']
+char_type    = _primitives['char']
+boolean_type = _primitives['boolean']
+string_type  = _primitives['string']
+void_type    = _primitives['void']
+
+_array_types = {}
+_function_types = {}
+
+def lookup_type(name):
+	'''
+	Objeto de tipo para un nombre de tipo primitivo ('integer', ...).
+	Los objetos de tipo se devuelven tal cual; None si no existe.
+	'''
+	if isinstance(name, Type):
+		return name
+	return _primitives.get(name)
+
+def array_type(element, dims):
+	'''
+	Tipo arreglo (internado). 'dims' es una secuencia de tamaños; los
+	que no son enteros (expresiones) quedan como None.
+	'''
+	element = lookup_type(element)
+	dims = tuple(d if isinstance(d, int) else getattr(d, 'value', None) for d in dims)
+	key = (element, dims)
+	t = _array_types.get(key)
+	if t is None:
+		# setdefault es atómico: dos hilos que compiten reciben el mismo objeto
+		t = _array_types.setdefault(key, ArrayType(element, dims))
+	return t
+
+def function_type(ret, params):
+	'''
+	Tipo función (internado) a partir de retorno y tipos de parámetros
+	'''
+	key = (lookup_type(ret), tuple(lookup_type(p) for p in params))
+	t = _function_types.get(key)
+	if t is None:
+		t = _function_types.setdefault(key, FunctionType(*key))
+	return t
+
 # Capabilities
 _bin_ops = {
 	# Integer operations
@@ -99,6 +204,17 @@ _unary_ops = {
 	('!', 'boolean') : 'boolean',
 }
 
+# Tablas precalculadas sobre los objetos de tipo: (tipo, op, tipo) -> tipo
+_bin_table = {
+	(lookup_type(left), op, lookup_type(right)) : lookup_type(result)
+	for (left, op, right), result in _bin_ops.items()
+}
+
+_unary_table = {
+	(op, lookup_type(operand)) : lookup_type(result)
+	for (op, operand), result in _unary_ops.items()
+}
+
 # Check if a binary operator is supported. Returns the
 # result type or None (if not supported). Type checker
 # uses this function.
@@ -106,41 +222,33 @@ _unary_ops = {
 def loockup_type(name):
 	'''
 	Dado el nombre de un tipo primitivo, se busca el objeto "type" apropiado.
-	Para empezar, los tipos son solo nombres, pero mas adelante pueden ser
-	objetos mas avanzados.
+	(Nombre histórico; ver lookup_type.)
 	'''
-	if name in typenames:
-		return name
-	else:
-		return None
+	return lookup_type(name)
 		
 def check_binop(op, left_type, right_type):
-	return _bin_ops.get((left_type, op, right_type))
+	return _bin_table.get((left_type, op, right_type))
 
 def check_unaryop(op, operand_type):
-	return _unary_ops.get((op, operand_type))
+	return _unary_table.get((op, operand_type))
 
-def is_array_type(type_name):
+def is_array_type(t):
 	'''
 	Check if a type is an array type
 	'''
-	return isinstance(type_name, str) and type_name.startswith('array[')
+	return isinstance(t, ArrayType)
 
 def get_array_element_type(array_type):
 	'''
-	Extract the element type from an array type string
+	Element type of an array type (None if it is not an array)
 	'''
-	if is_array_type(array_type):
-		# Extract element type from "array[size]element_type"
-		bracket_end = array_type.find(']')
-		if bracket_end != -1:
-			return array_type[bracket_end + 1:]
+	if isinstance(array_type, ArrayType):
+		return array_type.element
 	return None
 
 def is_compatible_type(type1, type2):
 	'''
 	Check if two types are compatible for assignment
 	'''
-	# Exact type match required
-	return type1 == type2
-
+	# Exact type match required (tipos internados: identidad)
+	return type1 is type2
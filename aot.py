@@ -0,0 +1,138 @@
+# aot.py
+'''
+Compilación anticipada (AOT) a objeto y ejecutable
+==================================================
+Toma el módulo de IRGenerator.generate, le fija el triple y el data
+layout del destino (IRGenerator sin destino deja 'unknown-unknown-unknown'
+y un layout vacío), lo optimiza y emite un objeto reubicable con una
+TargetMachine de llvmlite.binding. El destino por defecto es el host
+(target.default_target); --cpu/--features dan binarios para otra CPU,
+p.ej. '--cpu x86-64' para uno portable. El ejecutable se enlaza con el
+compilador de C del sistema ($CC, por defecto cc), que aporta libc y el
+arranque de C; main de B-Minor es el main del proceso y su valor de
+retorno el código de salida.
+
+    from aot import compile_executable
+    compile_executable(source, 'programa', opt_level=2)
+
+    python aot.py programa.bminor -o programa [-O2]
+    python aot.py programa.bminor -c -o programa.o
+    python aot.py programa.bminor -S -o programa.ll   (IR con triple y layout)
+    python aot.py programa.bminor --cpu x86-64 --features +avx2 -o programa
+
+Con --cache el objeto sale de la caché en disco (cache.py): volver a
+construir un fuente ya compilado solo cuesta el enlace.
+'''
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import llvmlite.binding as llvm
+
+from compiler  import compile_source, host_target_machine, parse_ir, CompileError
+from optimizer import optimize
+from cache     import CompileCache, build
+from target    import Target
+
+
+def optimized_module(module, opt_level=2, target=None):
+    '''
+    ir.Module (o llvm.ModuleRef) -> llvm.ModuleRef con el triple y el
+    data layout del destino y optimizado a -O<opt_level>
+    '''
+    tm = host_target_machine(opt=opt_level, for_object=True, target=target)
+    if isinstance(module, llvm.ModuleRef):
+        llmod = module
+        llmod.triple = tm.triple
+        llmod.data_layout = str(tm.target_data)
+    else:
+        llmod = parse_ir(module, tm)
+    if opt_level > 0:
+        llmod, _ = optimize(llmod, opt_level, target_machine=tm)
+    return llmod
+
+def emit_object(module, opt_level=2, target=None):
+    '''
+    Objeto nativo reubicable (bytes) para el destino
+    '''
+    tm = host_target_machine(opt=opt_level, for_object=True, target=target)
+    return tm.emit_object(optimized_module(module, opt_level, target))
+
+def compile_object(source, opt_level=2, cache=None, target=None):
+    '''
+    Fuente B-Minor -> objeto nativo (bytes). Con 'cache' (CompileCache)
+    el objeto se reutiliza entre compilaciones del mismo fuente.
+    '''
+    if cache is not None:
+        return build(source, opt_level, kind='o', cache=cache, target=target)
+    ast, module = compile_source(source, target=target)
+    return emit_object(module, opt_level, target)
+
+def link_executable(objects, output, cc=None, libs=()):
+    '''
+    Enlaza objetos (rutas o bytes) en un ejecutable con el compilador de
+    C del sistema
+    '''
+    cc = cc or os.environ.get('CC', 'cc')
+    with tempfile.TemporaryDirectory(prefix='bminor-aot-') as tmp:
+        paths = []
+        for i, obj in enumerate(objects):
+            if isinstance(obj, (bytes, bytearray)):
+                path = os.path.join(tmp, f"obj{i:04d}.o")
+                with open(path, 'wb') as f:
+                    f.write(obj)
+                obj = path
+            paths.append(obj)
+        result = subprocess.run([cc] + paths + ['-o', output] + [f"-l{lib}" for lib in libs],
+                                capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"Error al enlazar el ejecutable: {result.stderr.strip()}")
+    return output
+
+def compile_executable(source, output, opt_level=2, cache=None, cc=None, target=None):
+    '''
+    Fuente B-Minor -> ejecutable en 'output'
+    '''
+    return link_executable([compile_object(source, opt_level, cache, target)], output, cc=cc)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Compilación AOT de B-Minor a objeto o ejecutable")
+    ap.add_argument('source', help="programa B-Minor")
+    ap.add_argument('-o', '--output', help="archivo de salida (por defecto el nombre del fuente)")
+    ap.add_argument('-O', dest='opt', type=int, default=2, help="nivel de optimización (0-3)")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument('-c', action='store_true', help="solo emitir el objeto")
+    mode.add_argument('-S', action='store_true', help="emitir el IR con el target del host")
+    ap.add_argument('--cache', action='store_true', help="reutilizar objetos de la caché en disco")
+    ap.add_argument('--cpu', help="CPU destino (por defecto la del host)")
+    ap.add_argument('--features', help="features de LLVM, p.ej. '+avx2,+fma'")
+    args = ap.parse_args()
+
+    with open(args.source, encoding='utf-8') as f:
+        source = f.read()
+    stem = os.path.splitext(args.source)[0]
+    output = args.output or stem + ('.o' if args.c else '.ll' if args.S else '')
+    cache = CompileCache() if args.cache else None
+    target = Target(args.cpu, args.features) if args.cpu or args.features else None
+
+    try:
+        if args.S:
+            _, module = compile_source(source, target=target)
+            with open(output, 'w') as f:
+                f.write(str(optimized_module(module, args.opt, target)))
+        elif args.c:
+            with open(output, 'wb') as f:
+                f.write(compile_object(source, args.opt, cache, target))
+        else:
+            compile_executable(source, output, args.opt, cache, target=target)
+    except CompileError as e:
+        if e.diagnostics is not None:
+            e.diagnostics.flush()
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"generado: {output}")
@@ -0,0 +1,89 @@
+'''
+Benchmark de memoria del AST: bytes por nodo y tamaño total del AST
+sobre un corpus sintético grande (funciones con ciclos, ifs, llamadas,
+arreglos y expresiones).
+
+    python bench_ast_memory.py [funciones]     (por defecto 2000)
+'''
+
+import sys
+import time
+import tracemalloc
+
+from model  import Node
+from parser import parse_string
+from errors import errors_detected, reset_errors
+
+FUNC = '''
+f{i}: function integer (a: integer, b: integer) = {{
+    acc: integer = 0;
+    v: array [8] integer;
+    for k in range(0, 8) {{
+        v[k] = a * k + b;
+        if (v[k] % 2 == 0 && a > 0) {{
+            acc = acc + v[k];
+        }} else {{
+            acc = acc - 1;
+        }}
+    }}
+    while (acc > 100) {{
+        acc = acc / 2;
+    }}
+    return acc + f{j}(a - 1, b);
+}}
+'''
+
+def gen_corpus(nfuncs):
+    # Cada función llama a la anterior (la primera, a sí misma)
+    return ''.join(FUNC.format(i=i, j=max(i - 1, 0)) for i in range(nfuncs))
+
+def _fields(node):
+    if hasattr(node, '__dict__'):
+        yield from vars(node).values()
+    for cls in type(node).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if hasattr(node, slot):
+                yield getattr(node, slot)
+
+def walk(root):
+    '''Todos los nodos alcanzables desde root'''
+    stack = [root]
+    seen = set()
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, Node) and id(value) not in seen:
+            seen.add(id(value))
+            yield value
+            stack.extend(_fields(value))
+
+def node_bytes(node):
+    '''Tamaño del objeto más su __dict__ (si tiene)'''
+    size = sys.getsizeof(node)
+    if hasattr(node, '__dict__'):
+        size += sys.getsizeof(vars(node))
+    return size
+
+if __name__ == '__main__':
+    nfuncs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = gen_corpus(nfuncs)
+
+    reset_errors()
+    tracemalloc.start()
+    start = time.perf_counter()
+    ast = parse_string(source)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if ast is None or errors_detected():
+        raise SystemExit("Error de parsing del corpus")
+
+    nodes = list(walk(ast))
+    total = sum(node_bytes(n) for n in nodes)
+    print(f"fuente:            {len(source) / 1e6:8.2f} MB ({nfuncs} funciones)")
+    print(f"parse:             {elapsed:8.2f} s")
+    print(f"nodos:             {len(nodes):8d}")
+    print(f"bytes por nodo:    {total / len(nodes):8.1f}  (objeto + __dict__)")
+    print(f"nodos en total:    {total / 1e6:8.2f} MB")
+    print(f"memoria retenida:  {retained / 1e6:8.2f} MB  (tracemalloc tras el parse; incluye los mapas de posiciones de SLY)")
@@ -0,0 +1,76 @@
+'''
+Benchmark del plegado de constantes: instrucciones del IR y tiempo de
+codegen + optimización LLVM, con y sin constfold, sobre un corpus con
+subárboles constantes (tamaños, máscaras, for-range con límites
+literales) y sobre el corpus de bench_ast_memory.
+
+    python bench_constfold.py [funciones]     (por defecto 300)
+'''
+
+import sys
+import time
+
+from parser    import parse_string
+from Checker   import Check
+from irgen     import IRGenerator
+from constfold import ConstantFolder
+from compiler  import parse_ir, host_target_machine
+from optimizer import optimize, count_instructions
+from errors    import Diagnostics
+from bench_ast_memory import gen_corpus
+
+FUNC = '''
+g{i}: function integer (a: integer) = {{
+    size: integer = 16 * 4;
+    mask: integer = size - 1;
+    half: integer = size / 2;
+    scale: float = 2.0 * 0.5;
+    debug: boolean = false && (size > 0);
+    acc: integer = 0;
+    for k in range(0, half + 2 * 3) {{
+        acc = acc + (a * k) % size + mask * (1 + 1);
+        if (debug || (mask < 0)) {{
+            acc = acc - 1;
+        }}
+    }}
+    return acc + g{j}(a - (3 - 2));
+}}
+'''
+
+def const_corpus(nfuncs):
+    return ''.join(FUNC.format(i=i, j=max(i - 1, 0)) for i in range(nfuncs))
+
+def run(source, fold):
+    diag = Diagnostics()
+    ast = parse_string(source, diag)
+    env = Check.checker(ast, diag)
+    if diag.errors_detected():
+        raise SystemExit(diag.format())
+
+    start = time.perf_counter()
+    report = ConstantFolder.fold(ast) if fold else None
+    folding = time.perf_counter() - start
+
+    start = time.perf_counter()
+    module = IRGenerator.generate(ast, env)
+    codegen = time.perf_counter() - start
+
+    tm = host_target_machine(opt=2)
+    llmod = parse_ir(module, tm)
+    instrs = count_instructions(llmod)
+    start = time.perf_counter()
+    optimize(llmod, 2, target_machine=tm)
+    opt = time.perf_counter() - start
+    return report, folding, codegen, opt, instrs
+
+if __name__ == '__main__':
+    nfuncs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    for label, source in (('constantes', const_corpus(nfuncs)),
+                          ('ast_memory', gen_corpus(nfuncs))):
+        _, _, codegen0, opt0, instrs0 = run(source, fold=False)
+        report, folding, codegen1, opt1, instrs1 = run(source, fold=True)
+        print(f"[{label}] {report}")
+        print(f"  sin plegado: {instrs0:8d} instrucciones   codegen {codegen0 * 1000:8.1f} ms   -O2 {opt0 * 1000:8.1f} ms")
+        print(f"  con plegado: {instrs1:8d} instrucciones   codegen {codegen1 * 1000:8.1f} ms   -O2 {opt1 * 1000:8.1f} ms"
+              f"   (plegado {folding * 1000:.1f} ms)")
@@ -0,0 +1,94 @@
+'''
+Microbenchmark del despacho de visitantes: visitas por segundo en
+Check.checker e IRGenerator.generate sobre un AST grande, con el
+Node.accept anterior (f-string + getattr por visita) y con la tabla de
+despacho por clase de visitor.
+
+    python bench_dispatch.py [funciones]     (por defecto 500)
+'''
+
+import sys
+import time
+
+from model   import Node
+from parser  import parse_string
+from Checker import Check
+from irgen   import IRGenerator
+from errors  import errors_detected, reset_errors
+from bench_ast_memory import gen_corpus
+
+def legacy_accept(self, visitor, *args, **kwargs):
+    '''Node.accept tal como estaba antes de la tabla de despacho'''
+    method_name = f'visit_{self.__class__.__name__}'
+    method = getattr(visitor, method_name, None)
+    if method:
+        return method(self, *args, **kwargs)
+    method = getattr(visitor, 'visit', None)
+    if method:
+        return method(self, *args, **kwargs)
+    raise Exception(f"No visit method for {self.__class__.__name__}")
+
+def count_visits(ast):
+    '''Número de llamadas a accept en checker + codegen'''
+    calls = 0
+    accept = Node.accept
+    def counting(self, *args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return accept(self, *args, **kwargs)
+    Node.accept = counting
+    try:
+        reset_errors()
+        env = Check.checker(ast)
+        checker_calls = calls
+        IRGenerator.generate(ast, env)
+    finally:
+        Node.accept = accept
+    return checker_calls, calls - checker_calls
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(source, repeat):
+    results = {}
+    for phase in ('check', 'codegen'):
+        ast = parse_string(source)
+        reset_errors()
+        env = Check.checker(ast)
+        if phase == 'check':
+            results[phase] = best_time(lambda: Check.checker(ast), repeat)
+        else:
+            results[phase] = best_time(lambda: IRGenerator.generate(ast, env), repeat)
+    return results
+
+if __name__ == '__main__':
+    nfuncs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = 5
+    source = gen_corpus(nfuncs)
+
+    reset_errors()
+    ast = parse_string(source)
+    if ast is None or errors_detected():
+        raise SystemExit("Error de parsing del corpus")
+    visits = dict(zip(('check', 'codegen'), count_visits(ast)))
+
+    current = Node.accept
+    Node.accept = legacy_accept
+    try:
+        before = run(source, repeat)
+    finally:
+        Node.accept = current
+    after = run(source, repeat)
+
+    for phase in ('check', 'codegen'):
+        n = visits[phase]
+        print(f"{phase:<8} {n:8d} visitas   "
+              f"getattr: {n / before[phase]:12,.0f} visitas/s   "
+              f"tabla: {n / after[phase]:12,.0f} visitas/s   "
+              f"({before[phase] / after[phase]:.2f}x)")
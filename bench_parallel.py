@@ -0,0 +1,42 @@
+'''
+Benchmark del back-end paralelo: tiempo de optimizar y emitir objetos
+para un programa con muchas FuncDecl, con 1, 2, 4, ... procesos hasta el
+número de núcleos. También verifica que la salida sea idéntica para
+cualquier número de procesos.
+
+    python bench_parallel.py [funciones] [nivel]     (por defecto 300, 2)
+'''
+
+import hashlib
+import os
+import sys
+import time
+
+from compiler import compile_source
+from parallel import compile_parallel
+from bench_ast_memory import gen_corpus
+
+if __name__ == '__main__':
+    nfuncs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    level = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    source = gen_corpus(nfuncs) + 'main: function integer () = { return f0(3, 4); }\n'
+    _, module = compile_source(source)
+
+    cores = os.cpu_count() or 1
+    jobs_list = [1]
+    while jobs_list[-1] * 2 <= cores:
+        jobs_list.append(jobs_list[-1] * 2)
+    if jobs_list[-1] != cores:
+        jobs_list.append(cores)
+
+    base = None
+    digests = set()
+    for jobs in jobs_list:
+        start = time.perf_counter()
+        objects = compile_parallel(module, level, jobs)
+        elapsed = time.perf_counter() - start
+        digests.add(hashlib.sha256(b''.join(objects)).hexdigest())
+        base = base or elapsed
+        print(f"jobs={jobs:<3} {elapsed:8.2f} s   {nfuncs / elapsed:8.1f} funciones/s   "
+              f"speedup {base / elapsed:5.2f}x")
+    print("salida determinista:", "sí" if len(digests) == 1 else "NO")
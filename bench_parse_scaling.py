@@ -0,0 +1,49 @@
+'''
+Benchmark de escalamiento del parser: tiempo de parse_string sobre
+programas generados con N sentencias en un solo bloque y N declaraciones
+globales. Con producciones de lista lineales, el tiempo por sentencia
+debe mantenerse (aprox.) constante al crecer N.
+
+    python bench_parse_scaling.py [N_max]     (por defecto 1000000)
+'''
+
+import sys
+import time
+
+from parser import parse_string
+from errors import errors_detected, reset_errors
+
+def gen_block(n):
+    '''main con n sentencias en su cuerpo'''
+    body = '\n'.join('    x = x + 1;' for _ in range(n))
+    return f"main: function integer () = {{\n    x: integer = 0;\n{body}\n    return x;\n}}\n"
+
+def gen_globals(n):
+    '''n declaraciones globales'''
+    return '\n'.join(f"g{i}: integer;" for i in range(n)) + '\n'
+
+def measure(gen, n):
+    source = gen(n)
+    reset_errors()
+    start = time.perf_counter()
+    ast = parse_string(source)
+    elapsed = time.perf_counter() - start
+    if ast is None or errors_detected():
+        raise SystemExit(f"Error de parsing con N={n}")
+    return elapsed
+
+if __name__ == '__main__':
+    n_max = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    sizes = []
+    n = 1000
+    while n <= n_max:
+        sizes.append(n)
+        n *= 10
+
+    for label, gen in [("sentencias en un bloque", gen_block),
+                       ("declaraciones globales", gen_globals)]:
+        print(label)
+        for n in sizes:
+            elapsed = measure(gen, n)
+            print(f"  N={n:>9,}  {elapsed:9.3f} s  {elapsed / n * 1e6:7.2f} µs/elemento")
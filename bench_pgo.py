@@ -0,0 +1,91 @@
+'''
+Benchmark de la optimización guiada por perfil (PGO): tiempo de
+ejecución de main() en el JIT a -O2, sin perfil y con el perfil de una
+corrida instrumentada de entrenamiento (branch_weights en los saltos,
+funciones calientes con alwaysinline y frías con cold/minsize). También
+mide el perfil a -O1: -O2 con perfil no debe ser más lento que -O1.
+
+    python bench_pgo.py [iteraciones]     (por defecto 20000000)
+'''
+
+import sys
+import time
+
+from jit       import jit_compile
+from profiling import read_profile
+
+KERNEL = '''
+clamp: function integer (x: integer, lo: integer, hi: integer) = {
+    if (x < lo) {
+        return lo;
+    }
+    if (x > hi) {
+        return hi;
+    }
+    return x;
+}
+
+mix: function integer (a: integer, b: integer) = {
+    return (a * 31 + b) % 1000003;
+}
+
+report_error: function integer (code: integer) = {
+    print "valor fuera de rango";
+    print code;
+    return 0 - 1;
+}
+
+main: function integer () = {
+    acc: integer = 0;
+    i: integer = 0;
+    while (i < {n}) {
+        v: integer = mix(acc, i);
+        if (v < 0 && i > 5) {
+            acc = acc + report_error(v);
+        } else {
+            acc = clamp(acc + v, 0, 500000);
+        }
+        i = i + 1;
+    }
+    return acc;
+}
+'''
+
+def kernel(n):
+    return KERNEL.replace('{n}', str(n))
+
+def best_run(program, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = program.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000000
+
+    # Entrenamiento: una corrida instrumentada más corta. Los sitios se
+    # identifican por (función, construcción, ordinal), así que el perfil
+    # vale para el programa con otro número de iteraciones.
+    training = jit_compile(kernel(max(n // 100, 1)), opt_level=0, instrument=True)
+    training.run()
+    profile = read_profile(training)
+    print(profile.report(10))
+    print()
+
+    source = kernel(n)
+    plain = jit_compile(source, opt_level=2)
+    guided = jit_compile(source, opt_level=2, profile=profile)
+    guided_o1 = jit_compile(source, opt_level=1, profile=profile)
+    t_plain, r_plain = best_run(plain)
+    t_guided, r_guided = best_run(guided)
+    t_guided_o1, r_guided_o1 = best_run(guided_o1)
+    assert r_plain == r_guided == r_guided_o1, (r_plain, r_guided, r_guided_o1)
+
+    print(f"-O2 sin perfil: {t_plain * 1000:9.1f} ms")
+    print(f"-O2 con perfil: {t_guided * 1000:9.1f} ms   ({t_plain / t_guided:.2f}x)")
+    print(f"-O1 con perfil: {t_guided_o1 * 1000:9.1f} ms")
+    # margen del 20% para el ruido de medición
+    assert t_guided <= t_guided_o1 * 1.2, "-O2 con perfil más lento que -O1 con perfil"
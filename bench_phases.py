@@ -0,0 +1,274 @@
+'''
+Benchmark por fases del compilador, con seguimiento de regresiones.
+
+Corpus:
+- typechecker/*.bminor
+- los programas de test2.py (los que generan resultados_ir/*.ll)
+- programas generados (gen_corpus de bench_ast_memory) de varios tamaños
+
+Para cada programa y repetición corre el pipeline desde cero y mide por
+separado: lex, parse, check, fold, irgen, str (texto del IR) y, si se
+piden, opt (parse_ir + pipeline LLVM) y jit (MCJIT + finalize). Los
+programas con errores de parsing o semánticos solo cuentan las fases que
+alcanzan.
+
+El resultado (mín, mediana, media, desviación por fase) se escribe en
+JSON. Con --compare se compara contra una corrida anterior: cualquier
+fase cuya mediana empeore más de --threshold (y más de --min-delta en
+valor absoluto, para ignorar ruido en fases de microsegundos) hace que
+el script termine con código 1.
+
+    python bench_phases.py -o base.json
+    python bench_phases.py -o nuevo.json --compare base.json --threshold 0.10
+    python bench_phases.py --opt 2 --jit --sizes 50,500 --repeat 10
+'''
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import llvmlite
+import llvmlite.binding as llvm
+
+from parser    import BMinorParser
+from Checker   import Check
+from constfold import ConstantFolder
+from irgen     import IRGenerator
+from errors    import Diagnostics
+from compiler  import host_target_machine, parse_ir
+from optimizer import optimize
+from cache     import compiler_version
+from bench_ast_memory import gen_corpus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PHASES = ('lex', 'parse', 'check', 'fold', 'irgen', 'str', 'opt', 'jit')
+
+
+# ---------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------
+
+def typechecker_programs():
+    for path in sorted(glob.glob(os.path.join(HERE, 'typechecker', '*.bminor'))):
+        with open(path, encoding='utf-8') as f:
+            yield f"typechecker/{os.path.basename(path)}", f.read()
+
+def resultados_ir_programs():
+    '''
+    Los fuentes de test2.py: se llama a cada prueba con test_code
+    reemplazado por una función que solo recoge el código.
+    '''
+    import test2
+    programs = []
+    def collect(description, code, filename_hint=None):
+        programs.append((f"resultados_ir/{filename_hint or description}", code))
+        return True
+    original = test2.test_code
+    test2.test_code = collect
+    try:
+        for name in sorted(dir(test2)):
+            if name.startswith('test') and name != 'test_code' and callable(getattr(test2, name)):
+                getattr(test2, name)()
+    finally:
+        test2.test_code = original
+    return programs
+
+def generated_programs(sizes):
+    for n in sizes:
+        yield f"generado/{n}", gen_corpus(n)
+
+def corpus(sizes):
+    return list(typechecker_programs()) + resultados_ir_programs() + list(generated_programs(sizes))
+
+
+# ---------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------
+
+def run_once(parser, source, opt_level, jit):
+    '''
+    Corre el pipeline una vez. Devuelve ({fase: segundos}, estado).
+    '''
+    times = {}
+    diag = Diagnostics()
+    parser.reset(diag)
+
+    start = time.perf_counter()
+    tokens = list(parser.lexer.tokenize(source))
+    times['lex'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        ast = parser.parse(iter(tokens))
+    except Exception:
+        ast = None
+    times['parse'] = time.perf_counter() - start
+    if ast is None or diag.errors_detected():
+        return times, 'parse-error'
+
+    start = time.perf_counter()
+    env = Check.checker(ast, diag)
+    times['check'] = time.perf_counter() - start
+    if diag.errors_detected():
+        return times, 'check-error'
+
+    start = time.perf_counter()
+    ConstantFolder.fold(ast)
+    times['fold'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        module = IRGenerator.generate(ast, env)
+    except Exception:
+        return times, 'irgen-error'
+    times['irgen'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    str(module)
+    times['str'] = time.perf_counter() - start
+
+    if opt_level is None and not jit:
+        return times, 'ok'
+
+    level = opt_level or 0
+    tm = host_target_machine(opt=level)
+    start = time.perf_counter()
+    llmod = parse_ir(module, tm)
+    if level > 0:
+        llmod, _ = optimize(llmod, level, target_machine=tm)
+    times['opt'] = time.perf_counter() - start
+
+    if jit:
+        start = time.perf_counter()
+        engine = llvm.create_mcjit_compiler(llmod, tm)
+        engine.finalize_object()
+        times['jit'] = time.perf_counter() - start
+    return times, 'ok'
+
+def summarize(samples):
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'samples': samples,
+    }
+
+def bench(programs, repeat, opt_level=None, jit=False, warmup=1):
+    parser = BMinorParser()
+    results = {}
+    for name, source in programs:
+        samples = {}
+        status = None
+        for i in range(warmup + repeat):
+            times, status = run_once(parser, source, opt_level, jit)
+            if i >= warmup:
+                for phase, t in times.items():
+                    samples.setdefault(phase, []).append(t)
+        results[name] = {
+            'bytes': len(source.encode('utf-8')),
+            'status': status,
+            'phases': {p: summarize(samples[p]) for p in PHASES if p in samples},
+        }
+    return results
+
+def totals(results):
+    '''
+    Suma de medianas por fase sobre todo el corpus
+    '''
+    total = {}
+    for entry in results.values():
+        for phase, stats in entry['phases'].items():
+            total[phase] = total.get(phase, 0.0) + stats['median']
+    return total
+
+
+# ---------------------------------------------------------------------
+# Comparación
+# ---------------------------------------------------------------------
+
+def compare(old, new, threshold, min_delta):
+    '''
+    Lista de regresiones (programa, fase, mediana vieja, nueva, razón)
+    '''
+    regressions = []
+    pairs = [('TOTAL', old['totals'], new['totals'])]
+    for name, entry in new['programs'].items():
+        before = old['programs'].get(name)
+        if before is not None:
+            pairs.append((name,
+                          {p: s['median'] for p, s in before['phases'].items()},
+                          {p: s['median'] for p, s in entry['phases'].items()}))
+    for name, before, after in pairs:
+        for phase, t_new in after.items():
+            t_old = before.get(phase)
+            if not t_old:
+                continue
+            ratio = t_new / t_old
+            if ratio > 1 + threshold and t_new - t_old > min_delta:
+                regressions.append((name, phase, t_old, t_new, ratio))
+    return regressions
+
+
+def print_report(data):
+    print(f"{'programa':<36}{'estado':<13}" + ''.join(f"{p:>10}" for p in PHASES))
+    rows = list(data['programs'].items()) + [('TOTAL', {'status': '', 'phases': {
+        p: {'median': t} for p, t in data['totals'].items()}})]
+    for name, entry in rows:
+        cells = ''.join(
+            f"{entry['phases'][p]['median'] * 1000:10.3f}" if p in entry['phases'] else f"{'-':>10}"
+            for p in PHASES
+        )
+        print(f"{name[:35]:<36}{entry['status']:<13}{cells}")
+    print("(medianas en ms)")
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description="Benchmark por fases del compilador B-Minor")
+    ap.add_argument('--repeat', type=int, default=5, help="repeticiones medidas por programa")
+    ap.add_argument('--sizes', default='20,200', help="tamaños (funciones) de los programas generados")
+    ap.add_argument('--opt', type=int, default=None, help="medir también la optimización -O<n>")
+    ap.add_argument('--jit', action='store_true', help="medir también la compilación JIT")
+    ap.add_argument('-o', '--output', help="archivo JSON de salida")
+    ap.add_argument('--compare', help="JSON de una corrida anterior")
+    ap.add_argument('--threshold', type=float, default=0.10, help="empeoramiento relativo tolerado")
+    ap.add_argument('--min-delta', type=float, default=0.0005, help="diferencia absoluta mínima (s)")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    programs = bench(corpus(sizes), args.repeat, args.opt, args.jit)
+    data = {
+        'meta': {
+            'python': platform.python_version(),
+            'llvmlite': llvmlite.__version__,
+            'compiler': compiler_version(),
+            'machine': platform.machine(),
+            'repeat': args.repeat,
+            'opt': args.opt,
+            'jit': args.jit,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'programs': programs,
+        'totals': totals(programs),
+    }
+    print_report(data)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=1)
+        print(f"resultados: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare(old, data, args.threshold, args.min_delta)
+        for name, phase, t_old, t_new, ratio in regressions:
+            print(f"REGRESIÓN {name} [{phase}]: {t_old * 1000:.3f} ms -> {t_new * 1000:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"sin regresiones (umbral {args.threshold:.0%})")
@@ -0,0 +1,120 @@
+'''
+Benchmark de la salida de print: líneas por segundo de programas que
+solo imprimen, con print bajado a printf (un formato variádico por
+línea) y al runtime con buffer (runtime.py).
+
+Cada variante se compila a un ejecutable (-O2, enlazado con cc) y se
+mide su tiempo de pared escribiendo a /dev/null y a un archivo.
+
+    python bench_print.py [líneas]     (por defecto 2000000 por programa)
+'''
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from parser    import parse_string
+from Checker   import Check
+from irgen     import IRGenerator
+from compiler  import host_target_machine, parse_ir
+from optimizer import optimize
+from errors    import Diagnostics
+
+PROGRAMS = {
+    'enteros': '''
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n}) {{
+        print i * 7 - 1000;
+        i = i + 1;
+    }}
+    return 0;
+}}
+''',
+    'cadenas': '''
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n}) {{
+        print "una linea de salida de tamano medio";
+        i = i + 1;
+    }}
+    return 0;
+}}
+''',
+    'mixto': '''
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n} / 4) {{
+        print i;
+        print 'c';
+        print "ok";
+        print i % 2 == 0;
+        i = i + 1;
+    }}
+    return 0;
+}}
+''',
+    'floats': '''
+main: function integer () = {{
+    x: float = 0.5;
+    i: integer = 0;
+    while (i < {n}) {{
+        print x;
+        x = x * 1.0001 + 0.25;
+        i = i + 1;
+    }}
+    return 0;
+}}
+''',
+}
+
+
+class PrintfGenerator(IRGenerator):
+    buffered_output = False
+
+
+def build(source, generator, path):
+    diag = Diagnostics()
+    ast = parse_string(source, diag)
+    env = Check.checker(ast, diag)
+    if diag.errors_detected():
+        raise SystemExit(diag.format())
+    module = generator.generate(ast, env)
+    tm = host_target_machine(opt=2, for_object=True)
+    llmod, _ = optimize(parse_ir(module, tm), 2, target_machine=tm)
+    obj = path + '.o'
+    with open(obj, 'wb') as f:
+        f.write(tm.emit_object(llmod))
+    subprocess.run(['cc', obj, '-o', path], check=True)
+    return path
+
+def run(exe, target, repeat=3):
+    best = None
+    for _ in range(repeat):
+        with open(target, 'wb') as out:
+            start = time.perf_counter()
+            subprocess.run([exe], stdout=out, check=True)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == '__main__':
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+
+    with tempfile.TemporaryDirectory(prefix='bminor-print-') as tmp:
+        outfile = os.path.join(tmp, 'salida.txt')
+        print(f"{'programa':<10}{'destino':<11}{'printf':>16}{'buffer':>16}{'mejora':>9}")
+        for name, template in PROGRAMS.items():
+            source = template.format(n=lines)
+            exes = {
+                label: build(source, gen, os.path.join(tmp, f"{name}-{label}"))
+                for label, gen in (('printf', PrintfGenerator), ('buffer', IRGenerator))
+            }
+            for target in (os.devnull, outfile):
+                times = {label: run(exe, target) for label, exe in exes.items()}
+                rates = {label: lines / t for label, t in times.items()}
+                print(f"{name:<10}{os.path.basename(target):<11}"
+                      f"{rates['printf'] / 1e6:10.2f} Ml/s{rates['buffer'] / 1e6:10.2f} Ml/s"
+                      f"{times['printf'] / times['buffer']:8.2f}x")
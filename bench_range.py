@@ -0,0 +1,76 @@
+'''
+Benchmark de los loops for-in-range: el mismo recorrido escrito como
+'for i in range(a, b)' (RangeFor: límite evaluado una vez, variable de
+inducción canónica) y como el while en que el parser lo desazucaraba
+antes (el límite se reevalúa en cada vuelta). Tiempo de main() en el JIT.
+
+    python bench_range.py [repeticiones]     (por defecto 2000)
+'''
+
+import sys
+import time
+
+from jit import jit_compile
+
+N = 4096
+
+# {loop} es el recorrido de j en [0, size(n)); size() no se puede
+# sacar del loop: escribe una global
+TEMPLATE = '''
+a: array [{n}] integer;
+queries: integer = 0;
+
+size: function integer (n: integer) = {{
+    queries = queries + 1;
+    return n;
+}}
+
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n}) {{
+        a[i] = i % 97;
+        i = i + 1;
+    }}
+    s: integer = 0;
+    r: integer = 0;
+    while (r < {reps}) {{
+        {loop}
+        r = r + 1;
+    }}
+    return s % 1000003;
+}}
+'''
+
+LOOPS = {
+    'while': '''j: integer = 0;
+        while (j < size({n})) {{
+            s = s + a[j] * 3;
+            j = j + 1;
+        }}''',
+    'range': '''for j in range(0, size({n})) {{
+            s = s + a[j] * 3;
+        }}''',
+}
+
+def best_run(program, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = program.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+if __name__ == '__main__':
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'nivel':<7}{'while':>12}{'range':>12}{'mejora':>9}")
+    for opt in (2, 3):
+        times = {}
+        results = set()
+        for label, loop in LOOPS.items():
+            source = TEMPLATE.format(n=N, reps=reps, loop=loop.format(n=N))
+            times[label], result = best_run(jit_compile(source, opt_level=opt))
+            results.add(result)
+        assert len(results) == 1, results
+        print(f"-O{opt:<5}{times['while'] * 1000:9.1f} ms{times['range'] * 1000:9.1f} ms"
+              f"{times['while'] / times['range']:8.2f}x")
@@ -0,0 +1,55 @@
+'''
+Benchmark de arranque: latencia desde el import de parser.py hasta el
+primer AST, medida en intérpretes nuevos (como una invocación del CLI).
+
+Compara la construcción de tablas LALR en cada import (BMINOR_PARSETAB=0)
+contra las tablas precalculadas de parsetables.py.
+
+    python bench_startup.py [repeticiones]
+'''
+
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SOURCE = 'main: function integer () = { x: integer = 1; return x + 2; }'
+
+# Código que corre cada proceso hijo: mide import + primer parse
+CHILD = f'''
+import time
+t0 = time.perf_counter()
+from parser import parse_string
+t1 = time.perf_counter()
+ast = parse_string({SOURCE!r})
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t0)
+'''
+
+def measure(env_overrides, repeat):
+    env = dict(os.environ, **env_overrides)
+    imports, totals = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', CHILD], cwd=HERE, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(out[0]))
+        totals.append(float(out[1]))
+    return imports, totals
+
+def report(label, imports, totals):
+    print(f"{label:<22} import {statistics.median(imports) * 1000:8.2f} ms   "
+          f"import→AST {statistics.median(totals) * 1000:8.2f} ms   "
+          f"(mediana de {len(totals)})")
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # Un import previo asegura que el artefacto exista y esté al día
+    measure({}, 1)
+
+    report("tablas en cada import", *measure({'BMINOR_PARSETAB': '0'}, repeat))
+    report("tablas precalculadas", *measure({}, repeat))
@@ -0,0 +1,141 @@
+'''
+Benchmark de la ejecución por niveles (interp.py): tiempo de pared desde
+el fuente hasta el resultado de main(), con parsing y chequeo incluidos,
+para tres formas de ejecutar:
+
+    jit       compile_source + JIT a -O2 de todo el programa (sin caché)
+    interp    solo el intérprete del AST
+    niveles   intérprete que promueve al JIT las funciones calientes
+
+Los programas chicos miden latencia. En el largo, niveles pasa collatz a
+nativo por sus llamadas y el ciclo de main por sus vueltas (termina en
+su entrada nativa), así que desde unas decenas de miles de iteraciones
+su tiempo es casi todo la compilación en segundo plano y deja de crecer
+con el argumento. La salida de print va a /dev/null.
+
+    python bench_tiered.py [iteraciones del programa largo]   (por defecto 20000)
+'''
+
+import os
+import sys
+import time
+
+from model    import FuncDecl
+from compiler import compile_source
+from jit      import compile_module
+from interp   import Interpreter
+
+SMALL = {
+    'hola': '''
+main: function integer () = {
+    print "hola mundo";
+    return 0;
+}
+''',
+    'suma': '''
+main: function integer () = {
+    s: integer = 0;
+    for i in range(0, 100) {
+        s = s + i * i;
+    }
+    print s;
+    return 0;
+}
+''',
+    'funciones': '''
+sq: function integer (x: integer) = {
+    return x * x;
+}
+max: function integer (a: integer, b: integer) = {
+    if (a > b) {
+        return a;
+    }
+    return b;
+}
+main: function integer () = {
+    m: integer = 0;
+    for i in range(0, 50) {
+        m = max(m, sq(i) % 97);
+    }
+    print m;
+    return 0;
+}
+''',
+}
+
+LONG = '''
+collatz: function integer (n: integer) = {
+    steps: integer = 0;
+    while (n != 1) {
+        if (n % 2 == 0) {
+            n = n / 2;
+        } else {
+            n = 3 * n + 1;
+        }
+        steps = steps + 1;
+    }
+    return steps;
+}
+
+main: function integer () = {
+    best: integer = 0;
+    total: integer = 0;
+    for i in range(1, {n}) {
+        s: integer = collatz(i % 1000 + 1);
+        total = (total + s) % 1000003;
+        if (s > best) {
+            best = s;
+        }
+    }
+    print best;
+    return total;
+}
+'''
+
+def run_jit(source):
+    ast, module = compile_source(source)
+    signatures = {d.name: (d.type, [p.type for p in d.parms]) for d in ast.body if isinstance(d, FuncDecl)}
+    return compile_module(module, signatures, 2).run()
+
+def run_interp(source):
+    return Interpreter(source, jit=False).run()
+
+def run_tiered(source):
+    return Interpreter(source).run()
+
+MODES = [('jit', run_jit), ('interp', run_interp), ('niveles', run_tiered)]
+
+def best_time(func, source, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    # print escribe en el descriptor 1: a /dev/null mientras se mide
+    stdout = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    rows = []
+    try:
+        os.dup2(devnull, 1)
+        programs = [(name, src, 10) for name, src in SMALL.items()]
+        programs += [(f"largo ({n})", LONG.replace('{n}', str(n)), 1)]
+        for name, source, repeat in programs:
+            times = {}
+            results = set()
+            for label, func in MODES:
+                times[label], result = best_time(func, source, repeat)
+                results.add(result)
+            assert len(results) == 1, results
+            rows.append((name, times))
+    finally:
+        os.dup2(stdout, 1)
+
+    print(f"{'programa':<18}" + ''.join(f"{label:>12}" for label, _ in MODES))
+    for name, times in rows:
+        print(f"{name:<18}" + ''.join(f"{times[label] * 1000:9.1f} ms" for label, _ in MODES))
@@ -0,0 +1,121 @@
+'''
+Benchmark de la vectorización por CPU destino: los mismos loops sobre
+arreglos globales compilados en el JIT al nivel por defecto, -O2 (que
+termina en el pipeline estándar de LLVM, con vectorizador de loops y SLP) para la CPU base x86-64 (SSE2,
+vectores de 128 bits) y para el host con todas sus features (AVX2 o
+AVX-512 si las tiene).
+
+    python bench_vectorize.py [repeticiones]     (por defecto 2000)
+'''
+
+import sys
+import time
+
+from jit    import jit_compile
+from target import Target
+
+N = 4096
+
+PROGRAMS = {
+    'axpy entero': '''
+a: array [{n}] integer;
+b: array [{n}] integer;
+c: array [{n}] integer;
+
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n}) {{
+        a[i] = i % 17;
+        b[i] = i % 13;
+        i = i + 1;
+    }}
+    r: integer = 0;
+    while (r < {reps}) {{
+        j: integer = 0;
+        while (j < {n}) {{
+            c[j] = a[j] * b[j] + c[j];
+            j = j + 1;
+        }}
+        r = r + 1;
+    }}
+    s: integer = 0;
+    k: integer = 0;
+    while (k < {n}) {{
+        s = s + c[k];
+        k = k + 1;
+    }}
+    return s;
+}}
+''',
+    'suma entera': '''
+a: array [{n}] integer;
+
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n}) {{
+        a[i] = i % 101;
+        i = i + 1;
+    }}
+    s: integer = 0;
+    r: integer = 0;
+    while (r < {reps}) {{
+        j: integer = 0;
+        while (j < {n}) {{
+            s = s + a[j];
+            j = j + 1;
+        }}
+        r = r + 1;
+    }}
+    return s % 1000003;
+}}
+''',
+    'escala float': '''
+x: array [{n}] float;
+y: array [{n}] float;
+
+main: function integer () = {{
+    i: integer = 0;
+    while (i < {n}) {{
+        x[i] = 0.5;
+        y[i] = 1.0;
+        i = i + 1;
+    }}
+    r: integer = 0;
+    while (r < {reps}) {{
+        j: integer = 0;
+        while (j < {n}) {{
+            y[j] = y[j] * 0.999 + x[j];
+            j = j + 1;
+        }}
+        r = r + 1;
+    }}
+    return 0;
+}}
+''',
+}
+
+TARGETS = [('x86-64', Target('x86-64')), ('host', Target())]
+
+def best_run(program, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = program.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+if __name__ == '__main__':
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"host: {TARGETS[1][1]}")
+    print(f"{'programa':<14}{'x86-64':>12}{'host':>12}{'mejora':>9}")
+    for name, template in PROGRAMS.items():
+        source = template.format(n=N, reps=reps)
+        times = {}
+        results = set()
+        for label, target in TARGETS:
+            times[label], result = best_run(jit_compile(source, target=target))
+            results.add(result)
+        assert len(results) == 1, results
+        print(f"{name:<14}{times['x86-64'] * 1000:9.1f} ms{times['host'] * 1000:9.1f} ms"
+              f"{times['x86-64'] / times['host']:8.2f}x")
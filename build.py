@@ -0,0 +1,297 @@
+# build.py
+'''
+Compilación separada
+====================
+Compila cada archivo .bminor a su propio módulo LLVM (bitcode) y los
+enlaza en uno solo con llvmlite.binding.
+
+- La "interfaz" de un archivo son las funciones que define (firma) y
+  sus variables/arreglos globales. Cada archivo se compila conociendo
+  las interfaces de los demás como declaraciones externas, así que puede
+  llamar funciones y usar globales definidas en otro archivo (con o sin
+  prototipo 'f: function void (x: integer);').
+- Un manifiesto en el directorio de build guarda, por archivo, el hash
+  del fuente, los nombres que usa, el hash de las firmas importadas (las
+  de otros archivos con esos nombres) y su interfaz. Un archivo se
+  recompila solo si cambió su contenido o alguna firma que usa; cambiar
+  el cuerpo de una función no recompila a quienes la llaman, y agregar
+  o cambiar una firma solo recompila a quienes la nombran.
+
+    from build import Project
+    project = Project('build/', opt_level=2)
+    project.build(['main.bminor', 'util.bminor'], 'programa.o')
+    project.rebuilt         # archivos recompilados en la última llamada
+
+Desde la línea de comandos:
+
+    python build.py -o programa.o main.bminor util.bminor
+'''
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import llvmlite.binding as llvm
+
+from model    import FuncDecl, VarDecl, ArrayDecl, VarParm, ArrayParm, IntegerLit
+from Typesys  import ArrayType
+from parser   import parse_string
+from Checker  import Check
+from irgen    import IRGenerator
+from constfold import ConstantFolder, referenced_names
+from errors   import Diagnostics
+from compiler import CompileError, host_target_machine, parse_ir, init_llvm
+from cache    import compiler_version
+
+MANIFEST = 'manifest.json'
+
+
+# ---------------------------------------------------------------------
+# Interfaces
+# ---------------------------------------------------------------------
+
+def interface(ast):
+    '''
+    Símbolos que exporta un Program, como listas serializables en JSON:
+      ['function', nombre, retorno, [parámetro, ...]]
+      ['variable', nombre, tipo]
+      ['array', nombre, tipo_elemento, tamaño]
+    con cada parámetro como [nombre, tipo] o, si es un arreglo,
+    [nombre, tipo_elemento, [dimensiones]]. Los tipos van por nombre.
+    Los prototipos no se exportan: declaran algo definido en otro lado.
+    '''
+    entries = []
+    for decl in ast.body:
+        if isinstance(decl, FuncDecl):
+            if decl.body is not None:
+                parms = [_parm_entry(p) for p in decl.parms]
+                entries.append(['function', decl.name, str(decl.type), parms])
+        elif isinstance(decl, ArrayDecl):
+            entries.append(['array', decl.name, str(decl.element_type), decl.type.dims[0]])
+        elif isinstance(decl, VarDecl):
+            entries.append(['variable', decl.name, str(decl.type)])
+    return entries
+
+def _parm_entry(parm):
+    if isinstance(parm.type, ArrayType):
+        return [parm.name, str(parm.type.element), list(parm.type.dims)]
+    return [parm.name, str(parm.type)]
+
+def _parm_decl(entry):
+    if len(entry) == 3:
+        return ArrayParm(entry[0], entry[1], entry[2])
+    return VarParm(entry[0], entry[1])
+
+def extern_decls(entries):
+    '''
+    Nodos de declaración (sin definición) para las entradas de una interfaz
+    '''
+    decls = []
+    for entry in entries:
+        kind, name = entry[0], entry[1]
+        if kind == 'function':
+            parms = [_parm_decl(p) for p in entry[3]]
+            decls.append(FuncDecl(name, entry[2], parms, None))
+        elif kind == 'array':
+            decls.append(ArrayDecl(name, entry[2], [entry[3]]))
+        else:
+            decls.append(VarDecl(name, entry[2]))
+    return decls
+
+def signature_hash(entries):
+    text = json.dumps(sorted(entries), separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# ---------------------------------------------------------------------
+# Proyecto
+# ---------------------------------------------------------------------
+
+class Project:
+    '''
+    Directorio de build con un bitcode por archivo fuente y el manifiesto
+    para la recompilación incremental.
+    '''
+    def __init__(self, directory, opt_level=0):
+        self.directory = directory
+        self.opt_level = opt_level
+        self.rebuilt = []
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        # Otro compilador u otro nivel de optimización: todo se recompila
+        if data.get('version') != compiler_version() or data.get('opt') != self.opt_level:
+            data = {'version': compiler_version(), 'opt': self.opt_level, 'files': {}}
+        return data
+
+    def _save_manifest(self):
+        text = json.dumps(self.manifest, indent=1, sort_keys=True)
+        _write_atomic(os.path.join(self.directory, MANIFEST), text.encode('utf-8'))
+
+    def _artifact(self, path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        tag = hashlib.sha256(path.encode('utf-8')).hexdigest()[:8]
+        return f"{stem}-{tag}.bc"
+
+    def compile(self, paths):
+        '''
+        Compila (solo lo necesario) los archivos dados. Devuelve la lista
+        de rutas de bitcode en el orden de 'paths'.
+        '''
+        paths = [os.path.abspath(p) for p in paths]
+        files = self.manifest['files']
+        sources, hashes, asts, interfaces, uses = {}, {}, {}, {}, {}
+
+        # 1. Interfaces y nombres usados: del manifiesto si el fuente no cambió; si no, parseando
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                sources[path] = f.read()
+            hashes[path] = hashlib.sha256(sources[path].encode('utf-8')).hexdigest()
+            entry = files.get(path)
+            if entry and entry['source'] == hashes[path] and 'uses' in entry:
+                interfaces[path] = entry['interface']
+                uses[path] = set(entry['uses'])
+                continue
+            diag = Diagnostics()
+            ast = parse_string(sources[path], diag)
+            if ast is None or diag.errors_detected():
+                raise CompileError(f"{path}: errores de parsing ({diag.error_count()})", diag)
+            asts[path] = ast
+            interfaces[path] = interface(ast)
+            uses[path] = referenced_names(ast)
+
+        # Un símbolo solo puede definirse en un archivo
+        owners = {}
+        for path in paths:
+            for entry in interfaces[path]:
+                other = owners.setdefault(entry[1], path)
+                if other != path:
+                    raise CompileError(f"'{entry[1]}' definido en {other} y en {path}")
+
+        # 2. Recompilar lo que cambió (fuente o firmas importadas que usa)
+        self.rebuilt = []
+        artifacts = []
+        for path in paths:
+            imported = [e for p in paths if p != path for e in interfaces[p] if e[1] in uses[path]]
+            imports = signature_hash(imported)
+            artifact = os.path.join(self.directory, self._artifact(path))
+            entry = files.get(path)
+            if (entry is None or entry['source'] != hashes[path] or entry['imports'] != imports
+                    or not os.path.exists(artifact)):
+                ast = asts.get(path) or parse_string(sources[path], Diagnostics())
+                _write_atomic(artifact, self._compile_ast(path, ast, extern_decls(imported)))
+                files[path] = {
+                    'source': hashes[path],
+                    'imports': imports,
+                    'uses': sorted(uses[path]),
+                    'interface': interfaces[path],
+                    'artifact': os.path.basename(artifact),
+                }
+                self.rebuilt.append(path)
+            artifacts.append(artifact)
+
+        if self.rebuilt:
+            self._save_manifest()
+        return artifacts
+
+    def _compile_ast(self, path, ast, externs):
+        diag = Diagnostics()
+        env = Check.checker(ast, diag, externs)
+        if diag.errors_detected():
+            raise CompileError(f"{path}: errores semánticos ({diag.error_count()})", diag)
+        ConstantFolder.fold(ast)
+        module = IRGenerator.generate(ast, env, externs)
+        module.name = os.path.basename(path)
+
+        tm = host_target_machine(opt=self.opt_level, for_object=True)
+        llmod = parse_ir(module, tm)
+        if self.opt_level > 0:
+            from optimizer import optimize
+            llmod, _ = optimize(llmod, self.opt_level, target_machine=tm)
+        return llmod.as_bitcode()
+
+    def link(self, paths):
+        '''
+        Compila lo necesario y enlaza todos los módulos en un llvm.ModuleRef
+        '''
+        return link_modules(self.compile(paths))
+
+    def build(self, paths, output):
+        '''
+        Compila, enlaza y escribe 'output': objeto nativo (.o), bitcode
+        (.bc) o texto IR (cualquier otra extensión).
+        '''
+        llmod = self.link(paths)
+        ext = os.path.splitext(output)[1]
+        if ext == '.o':
+            data = host_target_machine(opt=self.opt_level, for_object=True).emit_object(llmod)
+        elif ext == '.bc':
+            data = llmod.as_bitcode()
+        else:
+            data = str(llmod).encode('utf-8')
+        with open(output, 'wb') as f:
+            f.write(data)
+        return output
+
+
+def link_modules(artifacts):
+    '''
+    Enlaza los bitcodes dados (rutas) en un único llvm.ModuleRef
+    '''
+    init_llvm()
+    linked = None
+    for artifact in artifacts:
+        with open(artifact, 'rb') as f:
+            llmod = llvm.parse_bitcode(f.read())
+        if linked is None:
+            linked = llmod
+            linked.name = 'bminor_program'
+        else:
+            try:
+                linked.link_in(llmod)
+            except RuntimeError as e:
+                raise Exception(f"Error al enlazar {os.path.basename(artifact)}: {e}")
+    if linked is None:
+        raise Exception("No hay módulos para enlazar")
+    linked.verify()
+    return linked
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] != '-o':
+        print("Uso: python build.py -o <salida.o|.bc|.ll> <archivo.bminor> ...")
+        sys.exit(1)
+
+    output, paths = args[1], args[2:]
+    project = Project(os.environ.get('BMINOR_BUILD_DIR', '.bminor-build'), opt_level=2)
+    try:
+        project.build(paths, output)
+    except CompileError as e:
+        if e.diagnostics is not None:
+            e.diagnostics.flush()
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    for path in project.rebuilt:
+        print(f"compilado: {path}")
+    print(f"enlazado: {output}")
@@ -0,0 +1,181 @@
+# cache.py
+'''
+Caché persistente de compilación
+================================
+Directorio direccionado por contenido con los artefactos de compilar un
+fuente B-Minor: texto IR ('ll'), bitcode LLVM ('bc') u objeto nativo ('o').
+La clave es un hash del fuente, el nivel de optimización y la versión del
+propio compilador (contenido de sus módulos + versión de llvmlite), así
+que cualquier cambio en el compilador invalida las entradas viejas.
+
+- Escrituras atómicas (archivo temporal + os.replace): varios procesos
+  pueden compartir el mismo directorio.
+- Desalojo LRU acotado por tamaño total; cada acierto actualiza el mtime.
+
+    from cache import build
+    ir_text = build(source, opt_level=2, kind='ll').decode()
+'''
+
+import hashlib
+import os
+import tempfile
+
+import llvmlite
+
+from target import default_target
+
+DEFAULT_DIR = os.environ.get(
+    'BMINOR_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'bminor')
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Artefactos soportados (extensión del archivo en la caché)
+kinds = { 'll', 'bc', 'o' }
+
+# Módulos cuyo contenido define la "versión" del compilador
+_compiler_modules = [
+    'parser.py', 'model.py', 'Symtab.py', 'Typesys.py', 'Checker.py',
+    'irgen.py', 'compiler.py', 'optimizer.py', 'constfold.py',
+    'parsetables.py', 'runtime.py', 'profiling.py', 'target.py',
+]
+
+_compiler_version = None
+
+def compiler_version():
+    '''
+    Hash del código fuente del compilador y de la versión de llvmlite
+    '''
+    global _compiler_version
+    if _compiler_version is None:
+        h = hashlib.sha256(llvmlite.__version__.encode())
+        base = os.path.dirname(os.path.abspath(__file__))
+        for name in _compiler_modules:
+            with open(os.path.join(base, name), 'rb') as f:
+                h.update(name.encode())
+                h.update(f.read())
+        _compiler_version = h.hexdigest()
+    return _compiler_version
+
+
+class CompileCache:
+    '''
+    Caché en disco de artefactos de compilación con desalojo LRU.
+    '''
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or DEFAULT_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source, opt_level=0, target=None):
+        h = hashlib.sha256()
+        h.update(compiler_version().encode())
+        h.update(f"-O{opt_level}\0".encode())
+        # Objetos y bitcode dependen de la CPU/features del destino
+        h.update(f"{(target or default_target()).key}\0".encode())
+        h.update(source.encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key, kind):
+        if kind not in kinds:
+            raise Exception(f"Tipo de artefacto desconocido: {kind}")
+        return os.path.join(self.directory, f"{key}.{kind}")
+
+    def get(self, key, kind):
+        '''
+        Devuelve los bytes del artefacto o None si no está en la caché.
+        '''
+        path = self._path(key, kind)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)          # marca de uso para LRU
+        except FileNotFoundError:   # ausente, o desalojado por otro proceso
+            return None
+        return data
+
+    def put(self, key, kind, data):
+        '''
+        Guarda el artefacto de forma atómica y aplica el límite de tamaño.
+        '''
+        path = self._path(key, kind)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith('.tmp-'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        '''
+        Borra las entradas menos usadas hasta quedar bajo max_bytes.
+        '''
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, name in self._entries():
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def _produce(source, opt_level, kind, target=None):
+    # Import diferido: un acierto de caché no paga la construcción del parser
+    from compiler  import compile_source, host_target_machine, parse_ir
+    from optimizer import optimize
+
+    ast, module = compile_source(source, target=target)
+    if kind == 'll' and opt_level == 0:
+        return str(module).encode('utf-8')
+
+    tm = host_target_machine(opt=opt_level, for_object=(kind == 'o'), target=target)
+    llmod = parse_ir(module, tm)
+    if opt_level > 0:
+        llmod, _ = optimize(llmod, opt_level, target_machine=tm)
+    if kind == 'll':
+        return str(llmod).encode('utf-8')
+    if kind == 'bc':
+        return llmod.as_bitcode()
+    return tm.emit_object(llmod)
+
+def build(source, opt_level=0, kind='ll', cache=None, target=None):
+    '''
+    Compila 'source' al artefacto 'kind' usando la caché en disco.
+    Devuelve bytes.
+    '''
+    cache = cache or CompileCache()
+    key = cache.key(source, opt_level, target)
+    data = cache.get(key, kind)
+    if data is None:
+        data = _produce(source, opt_level, kind, target)
+        cache.put(key, kind, data)
+    return data
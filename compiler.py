@@ -0,0 +1,102 @@
+# compiler.py
+'''
+Driver del compilador B-Minor
+=============================
+Encadena las etapas del front-end (parse_string -> Check.checker ->
+IRGenerator.generate) y crea las TargetMachine que comparten el JIT y
+las etapas de back-end (el destino y la inicialización de LLVM están en
+target.py).
+'''
+
+import llvmlite.binding as llvm
+
+from parser  import parse_string
+from Checker import Check
+from irgen   import IRGenerator
+from constfold import ConstantFolder
+from errors  import Diagnostics
+from tracing import current_tracer
+from target  import Target, default_target, init_llvm
+
+
+class CompileError(Exception):
+    '''
+    Se genera cuando alguna etapa del front-end reporta errores. Los
+    errores de la compilación quedan en 'diagnostics'.
+    '''
+    def __init__(self, message, diagnostics=None):
+        super().__init__(message)
+        self.diagnostics = diagnostics
+
+
+def compile_source(source, diag=None, externs=None, fold=True, instrument=False, profile=None,
+                   target=None):
+    '''
+    Compila un string fuente B-Minor hasta un ir.Module.
+    Devuelve (ast, module). Lanza CompileError si el parser o el
+    checker reportan errores.
+
+    'externs' son declaraciones (FuncDecl sin cuerpo, VarDecl, ArrayDecl)
+    de símbolos definidos en otros archivos: el checker las conoce y el
+    módulo las declara como externas (compilación separada, build.py).
+
+    Con fold=True el AST pasa por el plegado de constantes (constfold.py)
+    antes de generar IR. Con instrument=True el módulo cuenta sus
+    ejecuciones por función, ciclo y rama (ver profiling.py); con un
+    'profile' de esa ejecución se compila guiado por el perfil (PGO).
+
+    El módulo lleva el triple y el data layout de 'target' (por defecto
+    default_target(), el host).
+
+    Cada llamada usa su propio Diagnostics (o el que se le pase), así
+    que es seguro compilar en paralelo desde varios hilos.
+    '''
+    ast, env = check_source(source, diag, externs, fold)
+    module = IRGenerator.generate(ast, env, externs, instrument, profile, target or default_target())
+    return ast, module
+
+def check_source(source, diag=None, externs=None, fold=True):
+    '''
+    Solo el front-end: parsing, chequeo y (con fold=True) plegado de
+    constantes. Devuelve (ast, env) listos para IRGenerator.generate o
+    para el intérprete (interp.py). Lanza CompileError como compile_source.
+    '''
+    diag = diag or Diagnostics()
+
+    ast = parse_string(source, diag)
+    if ast is None or diag.errors_detected():
+        raise CompileError(f"Errores de parsing ({diag.error_count()})", diag)
+
+    env = Check.checker(ast, diag, externs)
+    if diag.errors_detected():
+        raise CompileError(f"Errores semánticos ({diag.error_count()})", diag)
+
+    if fold:
+        with current_tracer().span('ConstantFolder.fold', 'fold'):
+            ConstantFolder.fold(ast)
+    return ast, env
+
+
+# ---------------------------------------------------------------------
+# LLVM (llvmlite.binding)
+# ---------------------------------------------------------------------
+
+def host_target_machine(opt=2, for_object=False, target=None):
+    '''
+    Crea una TargetMachine para 'target' (por defecto default_target()).
+    Con for_object=True se configura para emitir objetos enlazables.
+    '''
+    return (target or default_target()).target_machine(opt, for_object)
+
+def parse_ir(module, target_machine=None):
+    '''
+    Convierte un ir.Module en un llvm.ModuleRef verificado. Si se da
+    una TargetMachine, fija su triple y data layout en el módulo.
+    '''
+    init_llvm()
+    llmod = llvm.parse_assembly(str(module))
+    if target_machine is not None:
+        llmod.triple = target_machine.triple
+        llmod.data_layout = str(target_machine.target_data)
+    llmod.verify()
+    return llmod
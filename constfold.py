@@ -0,0 +1,361 @@
+# constfold.py
+'''
+Plegado y propagación de constantes sobre el AST
+================================================
+Pase entre Check e IRGenerator: reemplaza subárboles constantes por
+literales para que el generador no emita instrucciones que LLVM luego
+tiene que borrar.
+
+- Aritmética, comparaciones y lógica booleana entre literales, con los
+  tipos de Typesys y la semántica del IR generado (i32 con desborde,
+  división entera truncada, double).
+- Cortocircuito con un lado constante: 'true && x' -> x, 'false && x'
+  -> false (x no se evalúa en el programa original).
+- Variables locales inicializadas con una constante y nunca reasignadas
+  en su función: sus usos se reemplazan por el literal.
+- 'if (false)' sin else y 'while (false)' se eliminan.
+
+No se pliega lo que en tiempo de ejecución falla o es indefinido
+(división por cero, INT_MIN / -1): se deja al programa.
+
+    from constfold import ConstantFolder
+    report = ConstantFolder.fold(ast)     # después de Check.checker
+    print(report)                         # nodos plegados / usos propagados
+'''
+
+from model   import *
+from Typesys import check_binop, check_unaryop, integer_type, float_type, boolean_type, char_type
+
+_literals = {
+    integer_type: IntegerLit,
+    float_type:   FloatLit,
+    boolean_type: BooleanLit,
+    char_type:    CharLit,
+}
+
+def _wrap32(value):
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value & 0x80000000 else value
+
+def _const(n):
+    '''
+    Valor Python de un literal plegable, o None
+    '''
+    if isinstance(n, (IntegerLit, FloatLit, BooleanLit, CharLit)):
+        return n.value
+    return None
+
+def _int_binop(oper, a, b):
+    if oper == '+':
+        return _wrap32(a + b)
+    if oper == '-':
+        return _wrap32(a - b)
+    if oper == '*':
+        return _wrap32(a * b)
+    if b == 0 or (a == -(1 << 31) and b == -1):
+        return None
+    # sdiv/srem: cociente truncado hacia cero, resto con el signo del dividendo
+    q = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        q = -q
+    if oper == '/':
+        return q
+    if oper == '%':
+        return a - q * b
+    return None
+
+def _float_binop(oper, a, b):
+    if oper == '+':
+        return a + b
+    if oper == '-':
+        return a - b
+    if oper == '*':
+        return a * b
+    if oper == '/' and b != 0.0:
+        return a / b
+    return None
+
+_compare = {
+    '<':  lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>':  lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+}
+
+def _walk(node):
+    '''
+    Todos los nodos bajo 'node' (recorre los __slots__ de cada clase)
+    '''
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, Node):
+            yield value
+            for cls in type(value).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if slot != 'lineno':
+                        stack.append(getattr(value, slot, None))
+
+def assigned_names(node):
+    '''
+    Nombres de variables que se asignan (=, ++, --) bajo 'node'
+    '''
+    names = set()
+    for n in _walk(node):
+        if isinstance(n, AssignStmt) and isinstance(n.location, VarLoc):
+            names.add(n.location.name)
+        elif isinstance(n, (PreInc, PreDec, PostInc, PostDec)) and isinstance(n.expr, VarLoc):
+            names.add(n.expr.name)
+    return names
+
+def referenced_names(node):
+    '''
+    Nombres de funciones y variables que se usan (llamadas, lecturas,
+    asignaciones y prototipos) bajo 'node'
+    '''
+    names = set()
+    for n in _walk(node):
+        if isinstance(n, (FuncCall, VarLoc, ArrayLoc)):
+            names.add(n.name)
+        elif isinstance(n, FuncDecl) and n.body is None:
+            names.add(n.name)
+    return names
+
+
+class ConstantFolder(Visitor):
+    '''
+    Las visitas de expresiones devuelven el nodo que las reemplaza (el
+    mismo u otro literal); las de sentencias devuelven la sentencia o
+    None si se elimina.
+    '''
+    def __init__(self):
+        self.folded = 0         # operaciones reemplazadas por un literal
+        self.propagated = 0     # usos de variables reemplazados por su constante
+        self.removed = 0        # sentencias eliminadas
+        self.scopes = []        # pila de {nombre: literal o None}
+        self.assigned = set()   # nombres reasignados en la función actual
+
+    @classmethod
+    def fold(cls, ast):
+        '''
+        Pliega el AST (ya chequeado) en su lugar. Devuelve el folder con
+        los contadores.
+        '''
+        folder = cls()
+        ast.accept(folder)
+        return folder
+
+    def __str__(self):
+        return (f"{self.folded} nodos plegados, {self.propagated} usos propagados, "
+                f"{self.removed} sentencias eliminadas")
+
+    def _literal(self, type, value, lineno):
+        self.folded += 1
+        return _literals[type](value, lineno)
+
+    def _lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def _statements(self, stmts):
+        kept = []
+        for stmt in stmts:
+            stmt = stmt.accept(self)
+            if stmt is not None:
+                kept.append(stmt)
+        return kept
+
+    # -------------
+    # Declaraciones
+    # -------------
+
+    def visit_Program(self, n: Program):
+        for decl in n.body:
+            decl.accept(self)
+        return n
+
+    def visit_VarDecl(self, n: VarDecl):
+        if n.value is not None:
+            n.value = n.value.accept(self)
+        if self.scopes:
+            # Local: propagable si su valor es constante y nadie la reasigna
+            constant = n.value if n.name not in self.assigned else None
+            self.scopes[-1][n.name] = constant if _const(constant) is not None else None
+        return n
+
+    def visit_ArrayDecl(self, n: ArrayDecl):
+        n.values = [v.accept(self) for v in n.values]
+        if self.scopes:
+            self.scopes[-1][n.name] = None
+        return n
+
+    def visit_FuncDecl(self, n: FuncDecl):
+        if n.body is None:
+            return n
+        self.assigned = assigned_names(n.body)
+        self.scopes = [{p.name: None for p in n.parms}]
+        n.body.accept(self)
+        self.scopes = []
+        self.assigned = set()
+        return n
+
+    # -------------
+    # Sentencias
+    # -------------
+
+    def visit_BlockStmt(self, n: BlockStmt):
+        self.scopes.append({})
+        n.statements = self._statements(n.statements or [])
+        self.scopes.pop()
+        return n
+
+    def visit_AssignStmt(self, n: AssignStmt):
+        if isinstance(n.location, ArrayLoc):
+            n.location = n.location.accept(self)
+        n.expr = n.expr.accept(self)
+        return n
+
+    def visit_ExprStmt(self, n: ExprStmt):
+        n.expr = n.expr.accept(self)
+        return n
+
+    def visit_PrintStmt(self, n: PrintStmt):
+        n.expr = n.expr.accept(self)
+        return n
+
+    def visit_ReturnStmt(self, n: ReturnStmt):
+        if n.expr is not None:
+            n.expr = n.expr.accept(self)
+        return n
+
+    def visit_IfStmt(self, n: IfStmt):
+        n.condition = n.condition.accept(self)
+        if n.else_stmt is None and isinstance(n.condition, BooleanLit) and not n.condition.value:
+            self.removed += 1
+            return None
+        n.then_stmt = n.then_stmt.accept(self)
+        if n.else_stmt is not None:
+            n.else_stmt = n.else_stmt.accept(self)
+        return n
+
+    def visit_WhileStmt(self, n: WhileStmt):
+        n.condition = n.condition.accept(self)
+        if isinstance(n.condition, BooleanLit) and not n.condition.value:
+            self.removed += 1
+            return None
+        n.stmt = n.stmt.accept(self)
+        return n
+
+    def visit_DoWhileStmt(self, n: DoWhileStmt):
+        n.stmt = n.stmt.accept(self)
+        n.condition = n.condition.accept(self)
+        return n
+
+    def visit_ForStmt(self, n: ForStmt):
+        self.scopes.append({})
+        if n.init is not None:
+            n.init = n.init.accept(self)
+        if n.condition is not None:
+            n.condition = n.condition.accept(self)
+        if n.update is not None:
+            n.update = n.update.accept(self)
+        n.stmt = n.stmt.accept(self)
+        self.scopes.pop()
+        return n
+
+    def visit_RangeFor(self, n: RangeFor):
+        n.start = n.start.accept(self)
+        n.stop = n.stop.accept(self)
+        if isinstance(n.start, IntegerLit) and isinstance(n.stop, IntegerLit) and n.start.value >= n.stop.value:
+            self.removed += 1
+            return None
+        self.scopes.append({n.name: None})
+        n.stmt = n.stmt.accept(self)
+        self.scopes.pop()
+        return n
+
+    # -------------
+    # Expresiones
+    # -------------
+
+    def visit_BinOper(self, n: BinOper):
+        n.left = n.left.accept(self)
+        n.right = n.right.accept(self)
+        a, b = _const(n.left), _const(n.right)
+
+        if n.oper in ('&&', '||'):
+            return self._fold_logic(n, a, b)
+        if a is None or b is None or check_binop(n.oper, n.left.type, n.right.type) is not n.type:
+            return n
+
+        operand_type = n.left.type
+        if n.type is boolean_type and n.oper in _compare:
+            return self._literal(boolean_type, _compare[n.oper](a, b), n.lineno)
+        if operand_type is integer_type:
+            value = _int_binop(n.oper, a, b)
+        elif operand_type is float_type:
+            value = _float_binop(n.oper, a, b)
+        else:
+            value = None
+        if value is None:
+            return n
+        return self._literal(n.type, value, n.lineno)
+
+    def _fold_logic(self, n, a, b):
+        short = (n.oper == '||')        # valor que corta la evaluación
+        if a is not None:
+            if a == short:
+                # 'true || x' / 'false && x': x nunca se evalúa
+                return self._literal(boolean_type, short, n.lineno)
+            self.folded += 1
+            return n.right
+        if b is not None and b != short:
+            # 'x && true' / 'x || false' -> x
+            self.folded += 1
+            return n.left
+        return n
+
+    def visit_UnaryOper(self, n: UnaryOper):
+        n.operand = n.operand.accept(self)
+        a = _const(n.operand)
+        if a is None or check_unaryop(n.oper, n.operand.type) is not n.type:
+            return n
+        if n.oper == '+' and n.type in (integer_type, float_type):
+            self.folded += 1
+            return n.operand
+        if n.oper == '-' and n.type is integer_type:
+            return self._literal(integer_type, _wrap32(-a), n.lineno)
+        if n.oper == '-' and n.type is float_type:
+            return self._literal(float_type, 0.0 - a, n.lineno)
+        if n.oper == '!' and n.type is boolean_type:
+            return self._literal(boolean_type, not a, n.lineno)
+        return n
+
+    def visit_VarLoc(self, n: VarLoc):
+        constant = self._lookup(n.name)
+        if constant is None:
+            return n
+        self.propagated += 1
+        return type(constant)(constant.value, n.lineno)
+
+    def visit_ArrayLoc(self, n: ArrayLoc):
+        n.indices = [i.accept(self) for i in n.indices]
+        return n
+
+    def visit_FuncCall(self, n: FuncCall):
+        n.args = [a.accept(self) for a in n.args]
+        return n
+
+    def visit_ArrayLiteral(self, n: ArrayLiteral):
+        n.elements = [e.accept(self) for e in n.elements]
+        return n
+
+    def visit(self, n):
+        # Literales, ++/-- y demás nodos sin subexpresiones plegables
+        return n
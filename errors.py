@@ -1,39 +1,139 @@
 # errors.py
 '''
 Error handling for the bminor compiler
+
+Los errores se reportan a un objeto Diagnostics. Cada compilación puede
+usar el suyo (compiler.compile_source crea uno por llamada) y pasarlo al
+lexer, al parser y a Check, de modo que varias compilaciones en el mismo
+proceso (o en hilos distintos) no mezclan sus errores.
+
+Las funciones de módulo (error, errors_detected, ...) siguen existiendo
+y operan sobre el Diagnostics "actual": el fijado con use_diagnostics()
+o, si no hay ninguno, uno global que imprime cada mensaje en stderr.
 '''
 
+import contextlib
+import contextvars
 import sys
+import threading
+
+class Diagnostic:
+    '''
+    Un error reportado: mensaje y línea (0 si no se conoce)
+    '''
+    __slots__ = ('message', 'lineno')
+
+    def __init__(self, message, lineno=0):
+        self.message = message
+        self.lineno = lineno
+
+    def __str__(self):
+        if self.lineno > 0:
+            return f"Error en línea {self.lineno}: {self.message}"
+        return f"Error: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.message!r}, {self.lineno})"
+
+
+class Diagnostics:
+    '''
+    Colección de errores de una compilación.
+    - max_errors: cuántos errores se guardan (el conteo sigue aunque se
+      supere el tope).
+    - stream: si se da, cada mensaje se imprime ahí de inmediato; si es
+      None la salida queda en buffer hasta flush().
+    '''
+    def __init__(self, max_errors=100, stream=None):
+        self.max_errors = max_errors
+        self.stream = stream
+        self.errors = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def error(self, message, lineno=0):
+        '''
+        Report an error message
+        '''
+        diag = Diagnostic(message, lineno)
+        with self._lock:
+            self._count += 1
+            if len(self.errors) < self.max_errors:
+                self.errors.append(diag)
+            stream = self.stream
+        if stream is not None:
+            print(diag, file=stream)
 
-# Global error counter
-_error_count = 0
+    def errors_detected(self):
+        return self._count > 0
+
+    def error_count(self):
+        return self._count
+
+    def reset(self):
+        with self._lock:
+            self._count = 0
+            self.errors = []
+
+    def format(self):
+        '''
+        Texto con todos los errores guardados (uno por línea)
+        '''
+        lines = [str(d) for d in self.errors]
+        dropped = self._count - len(self.errors)
+        if dropped > 0:
+            lines.append(f"... y {dropped} errores más")
+        return '\n'.join(lines)
+
+    def flush(self, file=None):
+        '''
+        Escribe los errores en buffer (por defecto en stderr)
+        '''
+        if self.errors:
+            print(self.format(), file=file or sys.stderr)
+
+
+# Diagnostics global: conserva el comportamiento de imprimir en stderr
+_default = Diagnostics(max_errors=sys.maxsize, stream=sys.stderr)
+_current = contextvars.ContextVar('bminor_diagnostics', default=None)
+
+def current_diagnostics():
+    '''
+    Diagnostics activo en este contexto (hilo/tarea)
+    '''
+    return _current.get() or _default
+
+@contextlib.contextmanager
+def use_diagnostics(diag):
+    '''
+    Fija 'diag' como Diagnostics actual dentro del bloque with
+    '''
+    token = _current.set(diag)
+    try:
+        yield diag
+    finally:
+        _current.reset(token)
 
 def error(message, lineno=0):
     '''
     Report an error message
     '''
-    global _error_count
-    _error_count += 1
-    if lineno > 0:
-        print(f"Error en línea {lineno}: {message}", file=sys.stderr)
-    else:
-        print(f"Error: {message}", file=sys.stderr)
+    current_diagnostics().error(message, lineno)
 
 def errors_detected():
     '''
     Return True if any errors have been detected
     '''
-    return _error_count > 0
+    return current_diagnostics().errors_detected()
 
 def error_count():
     '''
     Return the number of errors detected
     '''
-    return _error_count
+    return current_diagnostics().error_count()
 
 def reset_errors():
     '''
     Reset the error count (useful for testing)
     '''
-    global _error_count
-    _error_count = 0
+    current_diagnostics().reset()
@@ -0,0 +1,1162 @@
+# interp.py
+'''
+Ejecución por niveles: intérprete del AST y JIT
+===============================================
+Para los programas chicos y de vida corta el camino IRGenerator -> LLVM
+-> código nativo cuesta mucho más que ejecutarlos. El intérprete corre
+el AST ya chequeado (y plegado) sin pasar por LLVM, con la misma
+semántica que el IR de IRGenerator:
+
+- integer es de 32 bits en complemento a dos (desborda como i32); / y %
+  truncan hacia cero como sdiv/srem.
+- float es double; boolean es 0/1; char es un i8; string son los bytes
+  UTF-8 del literal.
+- las globales y los arreglos arrancan en cero (IRGenerator no emite sus
+  inicializadores) y una local declarada en un ciclo conserva su valor
+  entre vueltas (como su alloca).
+- print escribe lo mismo que el runtime de salida (runtime.py), con
+  buffer, en el descriptor 1.
+
+Cada función se traduce una sola vez a clausuras de Python (una por
+nodo, con las locales resueltas a posiciones del marco), así que al
+ejecutar no se recorre el AST ni se despachan visitas.
+
+El intérprete cuenta las llamadas y las vueltas de ciclo (back-edges)
+de cada función. Cuando una supera call_threshold llamadas o
+loop_threshold vueltas (se mira en cada llamada y en los back-edges) se
+marca caliente: el programa entero se compila con el JIT (en un hilo
+aparte si background=True) y desde entonces las llamadas a funciones
+calientes van al código nativo. Las globales viven en memoria de ctypes
+del intérprete y el módulo del JIT las declara externas (resueltas con
+llvm.add_symbol), así que los dos niveles ven el mismo estado sin
+copiarlo. Solo se promueven funciones con parámetros y retorno integer,
+float o boolean.
+
+Una invocación que ya empezó en el intérprete (main, típicamente) no se
+reemplaza en pila, pero sus ciclos sí pasan a nativo: el módulo del JIT
+lleva además una función por ciclo cuyas locales son todas escalares
+(integer, float, boolean o char), que recibe punteros a esas locales y
+retoma el ciclo desde su cabecera. En el primer back-edge después de
+compilar, el intérprete copia el marco a celdas de ctypes, termina el
+ciclo en nativo y copia las celdas de vuelta.
+
+    from interp import Interpreter
+    program = Interpreter(source)
+    program.run()                              # main()
+    print(program.report())
+
+    python interp.py programa.bminor [--stats] [--calls N] [--loops N] [--no-jit]
+'''
+
+import ctypes
+import itertools
+import math
+import os
+import sys
+import threading
+import time
+
+import llvmlite.binding as llvm
+from llvmlite import ir
+
+from model     import *
+from Typesys   import integer_type, float_type, boolean_type, char_type, string_type, void_type
+from compiler  import check_source, host_target_machine, parse_ir
+from constfold import assigned_names
+from irgen     import IRGenerator
+from optimizer import optimize
+from jit       import JITProgram
+from target    import default_target
+
+CALL_THRESHOLD = 1000
+LOOP_THRESHOLD = 100000
+OUTPUT_BUFFER = 1 << 16
+
+# Vueltas de un range que se cuentan juntas (y entre las que no se mira poll)
+RANGE_CHUNK = 1024
+
+# Cada llamada de B-Minor usa varios marcos de Python
+RECURSION_LIMIT = 50000
+
+# Memoria de las globales (mismo layout que los tipos de IRGenerator.type_map)
+_storage = {
+    integer_type: ctypes.c_int32,
+    float_type:   ctypes.c_double,
+    boolean_type: ctypes.c_bool,
+    char_type:    ctypes.c_int8,
+    string_type:  ctypes.c_char_p,
+}
+
+_zero = {
+    integer_type: 0,
+    float_type:   0.0,
+    boolean_type: False,
+    char_type:    0,
+    string_type:  b'',
+    void_type:    None,
+}
+
+# Tipos que cruzan al código nativo sin conversión
+_native_types = (integer_type, float_type, boolean_type)
+
+# Locales que un ciclo nativo recibe por puntero
+_cell_types = (integer_type, float_type, boolean_type, char_type)
+
+_VOID = (None,)
+
+# back_edge: el ciclo sigue en el intérprete
+_STAY = object()
+
+_tier_ids = itertools.count(1)
+
+
+def _wrap(value):
+    return ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+def _char(value):
+    value &= 0xFF
+    return value - 0x100 if value > 0x7F else value
+
+def _sdiv(a, b):
+    if b == 0:
+        raise Exception("División entera por cero")
+    q = abs(a) // abs(b)
+    return _wrap(q if (a < 0) == (b < 0) else -q)
+
+def _srem(a, b):
+    if b == 0:
+        raise Exception("División entera por cero")
+    r = abs(a) % abs(b)
+    return -r if a < 0 else r
+
+# NaN que produce el hardware para 0/0, inf - inf, ... (en x86 lleva el
+# bit de signo, y printf lo escribe como -nan)
+_NAN = math.inf - math.inf
+
+def _fdiv(a, b):
+    if b == 0.0:
+        # IEEE 754, como fdiv
+        if a != a:
+            return a
+        if a == 0.0:
+            return _NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+def _fne(a, b):
+    # fcmp one: falso si algún operando es NaN
+    return a == a and b == b and a != b
+
+def _format_float(value):
+    # '%g' de Python escribe todo NaN como 'nan'; printf respeta el signo
+    if value != value:
+        return b'-nan\n' if math.copysign(1.0, value) < 0 else b'nan\n'
+    return b'%g\n' % value
+
+def _nop(f):
+    return None
+
+
+# Fábricas de clausuras: (izquierda, derecha) -> clausura
+_int_ops = {
+    '+': lambda l, r: lambda f: ((l(f) + r(f) + 0x80000000) & 0xFFFFFFFF) - 0x80000000,
+    '-': lambda l, r: lambda f: ((l(f) - r(f) + 0x80000000) & 0xFFFFFFFF) - 0x80000000,
+    '*': lambda l, r: lambda f: ((l(f) * r(f) + 0x80000000) & 0xFFFFFFFF) - 0x80000000,
+    '/': lambda l, r: lambda f: _sdiv(l(f), r(f)),
+    '%': lambda l, r: lambda f: _srem(l(f), r(f)),
+}
+
+# Con el operando derecho constante (i + 1, n % 2, ...)
+_int_const_ops = {
+    '+': lambda l, c: lambda f: ((l(f) + c + 0x80000000) & 0xFFFFFFFF) - 0x80000000,
+    '-': lambda l, c: lambda f: ((l(f) - c + 0x80000000) & 0xFFFFFFFF) - 0x80000000,
+    '*': lambda l, c: lambda f: ((l(f) * c + 0x80000000) & 0xFFFFFFFF) - 0x80000000,
+}
+
+_float_ops = {
+    '+': lambda l, r: lambda f: l(f) + r(f),
+    '-': lambda l, r: lambda f: l(f) - r(f),
+    '*': lambda l, r: lambda f: l(f) * r(f),
+    '/': lambda l, r: lambda f: _fdiv(l(f), r(f)),
+}
+
+_compare_ops = {
+    '<':  lambda l, r: lambda f: l(f) < r(f),
+    '<=': lambda l, r: lambda f: l(f) <= r(f),
+    '>':  lambda l, r: lambda f: l(f) > r(f),
+    '>=': lambda l, r: lambda f: l(f) >= r(f),
+    '==': lambda l, r: lambda f: l(f) == r(f),
+    '!=': lambda l, r: lambda f: l(f) != r(f),
+}
+
+_compare_const_ops = {
+    '<':  lambda l, c: lambda f: l(f) < c,
+    '<=': lambda l, c: lambda f: l(f) <= c,
+    '>':  lambda l, c: lambda f: l(f) > c,
+    '>=': lambda l, c: lambda f: l(f) >= c,
+    '==': lambda l, c: lambda f: l(f) == c,
+    '!=': lambda l, c: lambda f: l(f) != c,
+}
+
+# Los de float son ordenados como fcmp: solo != cambia respecto de Python
+_float_compare_ops = dict(_compare_ops, **{
+    '!=': lambda l, r: lambda f: _fne(l(f), r(f)),
+})
+
+_float_compare_const_ops = dict(_compare_const_ops, **{
+    '!=': lambda l, c: lambda f: _fne(l(f), c),
+})
+
+_bool_ops = {
+    '&&': lambda l, r: lambda f: l(f) and r(f),
+    '||': lambda l, r: lambda f: l(f) or r(f),
+    '==': lambda l, r: lambda f: l(f) == r(f),
+    '!=': lambda l, r: lambda f: l(f) != r(f),
+}
+
+
+class _Function:
+    '''
+    Una función del programa: clausura del cuerpo, valores iniciales del
+    marco y contadores del nivel
+    '''
+    def __init__(self, interp, decl):
+        self.interp = interp
+        self.decl = decl
+        self.name = decl.name
+        self.body = None
+        self.tail = []          # valores iniciales de las locales (tras los parámetros)
+        self.calls = 0
+        self.loops = [0]        # vueltas de ciclo (lista: la incrementan las clausuras)
+        self.hot = False
+        self.native = None      # llamada al JIT una vez promovida
+        self.entries = []       # _Loop de sus ciclos
+
+    @property
+    def promotable(self):
+        decl = self.decl
+        return ((decl.type is void_type or decl.type in _native_types)
+                and all(p.type in _native_types for p in decl.parms))
+
+    @property
+    def tier(self):
+        return 'jit' if self.native is not None else 'interp'
+
+    def call(self, *args):
+        self.calls += 1
+        native = self.native
+        if native is not None:
+            return native(*args)
+        if not self.hot and (self.calls >= self.interp.call_threshold
+                             or self.loops[0] >= self.interp.loop_threshold):
+            self.interp._promote(self)
+            if self.native is not None:
+                return self.native(*args)
+        if self.body is None:
+            raise Exception(f"La función '{self.name}' no tiene cuerpo")
+        r = self.body([*args, *self.tail])
+        return _zero[self.decl.type] if r is None else r[0]
+
+
+class _Capture:
+    '''
+    Posiciones del marco que usa un ciclo mientras se traduce
+    '''
+    def __init__(self):
+        self.outer = {}         # posición -> nombre (locales de afuera del ciclo)
+        self.own = set()        # posiciones declaradas dentro del ciclo
+        self.decls = {}         # posición -> VarDecl de adentro
+        self.returns = False
+
+
+class _Loop:
+    '''
+    Un ciclo de una función y su entrada nativa (si sus locales son
+    escalares): __bminor_loopN.<función>, que recibe un puntero por
+    local, los límites si es un RangeFor y un puntero al valor de retorno
+    si el ciclo retorna; devuelve 1 si retornó.
+    '''
+    def __init__(self, fn, index, node, cells, returns):
+        self.fn = fn
+        self.name = f"__bminor_loop{index}.{fn.name}"
+        self.node = node
+        self.cells = cells          # [(nombre o VarDecl, posición, tipo)]
+        self.ranged = isinstance(node, RangeFor)
+        self.returns = returns
+        self.native = None
+        self.entered = 0            # veces que se terminó en nativo
+        # Vueltas de la función en que el ciclo mira si puede pasar a nativo
+        self.poll = [fn.interp.loop_threshold if fn.interp.jit else sys.maxsize]
+
+    @property
+    def promotable(self):
+        return self.cells is not None
+
+    def bind(self, program):
+        out = self.fn.interp._out
+        flush = self.fn.interp.flush
+        ret_type = self.fn.decl.type
+        ret_storage = _storage[ret_type] if self.returns and ret_type is not void_type else None
+        cells = [(k, _storage[t]) for _, k, t in self.cells]
+        argtypes = [ctypes.c_void_p] * len(cells)
+        if self.ranged:
+            argtypes += [ctypes.c_int32, ctypes.c_int32]
+        if ret_storage is not None:
+            argtypes.append(ctypes.c_void_p)
+        address = program.engine.get_function_address(self.name)
+        call = ctypes.CFUNCTYPE(ctypes.c_bool, *argtypes)(address)
+
+        def native(f, *bounds):
+            values = [storage(f[k]) for k, storage in cells]
+            args = [ctypes.addressof(v) for v in values]
+            ret = None
+            if ret_storage is not None:
+                ret = ret_storage()
+                bounds += (ctypes.addressof(ret),)
+            self.entered += 1
+            # La salida del intérprete va antes que la del código nativo
+            if out:
+                flush()
+            try:
+                returned = call(*args, *bounds)
+            finally:
+                program.flush()
+            for (k, _), v in zip(cells, values):
+                f[k] = v.value
+            if not returned:
+                return None
+            return _VOID if ret is None else (ret.value,)
+        self.native = native
+        # Que el próximo back-edge entre
+        self.poll[0] = 0
+
+    def back_edge(self, f, *bounds):
+        '''
+        Llamada cuando las vueltas de la función llegan a poll. Termina
+        el ciclo en nativo si ya se puede (devuelve lo que devolvería su
+        clausura) o _STAY para seguir en el intérprete.
+        '''
+        # Primero correr poll: _compile lo vuelve a 0 después de enlazar
+        self.poll[0] = sys.maxsize
+        fn = self.fn
+        if not fn.hot:
+            fn.interp._promote(fn)
+        if self.native is not None:
+            return self.native(f, *bounds)
+        return _STAY
+
+
+class _Value(Node):
+    '''
+    Expresión que ya es un valor de LLVM (los límites de un RangeFor en su
+    entrada nativa)
+    '''
+    __slots__ = ('value',)
+
+    def __init__(self, value, lineno=0):
+        super().__init__(lineno)
+        self.value = value
+
+
+class _TierGenerator(IRGenerator):
+    '''
+    IRGenerator que además emite la entrada nativa de cada _Loop: el
+    ciclo con sus locales en los punteros que recibe y cada return como
+    store + ret i1 1.
+    '''
+    def __init__(self, loops):
+        super().__init__()
+        self.loops = loops
+        self._frame = {}        # id(VarDecl) -> puntero a su celda
+        self._ret = None        # puntero al valor de retorno de la entrada
+        self._entry = False
+
+    @classmethod
+    def generate(cls, ast, env, target=None, loops=()):
+        generator = cls(loops)
+        if target is not None:
+            target.apply(generator.module)
+        ast.accept(generator, env)
+        generator.module.profile_guided = False
+        if generator.runtime.used:
+            generator._dtors.append(generator.runtime.flush())
+        generator._emit_global_dtors()
+        return generator.module
+
+    def visit_Program(self, n: Program, env):
+        super().visit_Program(n, env)
+        for loop in self.loops:
+            self._gen_loop(loop, env)
+
+    def _gen_loop(self, loop, env):
+        i1 = ir.IntType(1)
+        i32 = ir.IntType(32)
+        param_types = [self.get_llvm_type(t).as_pointer() for _, _, t in loop.cells]
+        if loop.ranged:
+            param_types += [i32, i32]
+        ret_type = loop.fn.decl.type
+        returns_value = loop.returns and ret_type is not void_type
+        if returns_value:
+            param_types.append(self.get_llvm_type(ret_type).as_pointer())
+        func = ir.Function(self.module, ir.FunctionType(i1, param_types), name=loop.name)
+
+        entry = func.append_basic_block(name="entry")
+        body_bb = func.append_basic_block(name="body")
+        self._alloca_builder = ir.IRBuilder(entry)
+        self.builder = ir.IRBuilder(body_bb)
+        self.current_function = func
+        self.vars = {}
+        self._frame = {}
+        self._entry = True
+
+        # Las celdas no se solapan: el optimizador puede tenerlas en registros
+        for (key, _, _), arg in zip(loop.cells, func.args):
+            arg.add_attribute('noalias')
+            if isinstance(key, str):
+                arg.name = key
+                self.vars[key] = arg
+            else:
+                arg.name = key.name
+                self._frame[id(key)] = arg
+        node = loop.node
+        if loop.ranged:
+            first, stop = func.args[len(loop.cells):len(loop.cells) + 2]
+            node = RangeFor(node.name, _Value(first), _Value(stop), node.stmt, node.lineno)
+        self._ret = func.args[-1] if returns_value else None
+
+        node.accept(self, env)
+        if not self.builder.block.is_terminated:
+            self.builder.ret(ir.Constant(i1, 0))
+        self._alloca_builder.branch(body_bb)
+
+        self.vars = {}
+        self._frame = {}
+        self._ret = None
+        self._entry = False
+        self.current_function = None
+        self.builder = None
+        self._alloca_builder = None
+
+    def visit__Value(self, n: _Value, env):
+        return n.value
+
+    def visit_VarDecl(self, n: VarDecl, env):
+        cell = self._frame.get(id(n))
+        if cell is None:
+            return super().visit_VarDecl(n, env)
+        self.vars[n.name] = cell
+        if n.value:
+            self.builder.store(n.value.accept(self, env), cell)
+
+    def visit_ReturnStmt(self, n: ReturnStmt, env):
+        if not self._entry:
+            return super().visit_ReturnStmt(n, env)
+        if n.expr:
+            self.builder.store(n.expr.accept(self, env), self._ret)
+        self.builder.ret(ir.Constant(ir.IntType(1), 1))
+
+
+class Interpreter(Visitor):
+    '''
+    Las visitas traducen cada nodo a una clausura f(marco): las de
+    expresiones devuelven el valor; las de sentencias None para seguir o
+    una tupla (valor,) cuando la función retorna.
+    '''
+    def __init__(self, source, call_threshold=CALL_THRESHOLD, loop_threshold=LOOP_THRESHOLD,
+                 opt_level=2, jit=True, background=True, target=None):
+        self.call_threshold = call_threshold
+        self.loop_threshold = loop_threshold
+        self.opt_level = opt_level
+        self.jit = jit
+        self.background = background
+        self.target = target or default_target()
+
+        self.globals = {}       # nombre -> objeto ctypes (escalar o arreglo)
+        self.functions = {}     # nombre -> _Function
+        self._fn = None         # función que se está traduciendo
+        self._scopes = []       # pila de {nombre: posición en el marco}
+        self._nslots = 0
+        self._tail = []
+        self._types = []        # tipo de cada posición del marco (None si no es escalar)
+        self._captures = []     # ciclos que se están traduciendo
+        self._loops = []        # todos los _Loop
+
+        self._out = bytearray()
+        self.program = None         # JITProgram, una vez compilado el programa
+        self.compile_time = None
+        self.compile_error = None
+        self._hot = []              # funciones calientes promovibles
+        self._compiler = None       # hilo de compilación (o True si fue sincrónica)
+
+        self.ast, self.env = check_source(source)
+        self.ast.accept(self)
+
+    # -----------------------------------------------------------------
+    # Ejecución
+    # -----------------------------------------------------------------
+
+    def run(self, name='main', *args):
+        '''
+        Llama a la función 'name' con los argumentos dados
+        '''
+        fn = self.functions.get(name)
+        if fn is None:
+            raise KeyError(f"Función no encontrada: {name}")
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+        try:
+            return fn.call(*args)
+        finally:
+            sys.setrecursionlimit(limit)
+            self.flush()
+
+    def flush(self):
+        '''
+        Vacía el buffer de print en el descriptor 1
+        '''
+        with memoryview(self._out) as data:
+            written = 0
+            while written < len(data):
+                written += os.write(1, data[written:])
+        del self._out[:]
+
+    def wait(self):
+        '''
+        Espera a que termine la compilación en curso (si hay una)
+        '''
+        if isinstance(self._compiler, threading.Thread):
+            self._compiler.join()
+
+    def tier(self, name):
+        return self.functions[name].tier
+
+    def report(self):
+        lines = [f"{'función':<20}{'llamadas':>12}{'vueltas':>12}  nivel"]
+        for fn in self.functions.values():
+            lines.append(f"{fn.name:<20}{fn.calls:12d}{fn.loops[0]:12d}  {fn.tier}")
+        entered = [f"{loop.name} ({loop.entered})" for loop in self._loops if loop.entered]
+        if entered:
+            lines.append(f"Ciclos terminados en nativo: {', '.join(entered)}")
+        if self.compile_time is not None:
+            lines.append(f"JIT: programa compilado en {self.compile_time * 1000:.1f} ms")
+        elif self.compile_error is not None:
+            lines.append(f"JIT: no se pudo compilar ({self.compile_error})")
+        return '\n'.join(lines)
+
+    # -----------------------------------------------------------------
+    # Promoción al JIT
+    # -----------------------------------------------------------------
+
+    def _promote(self, fn):
+        fn.hot = True
+        if not self.jit:
+            return
+        if fn.promotable:
+            self._hot.append(fn)
+            if self.program is not None:
+                self._bind(fn)
+        elif not any(loop.promotable for loop in fn.entries):
+            return
+        if self._compiler is None:
+            if self.background:
+                self._compiler = threading.Thread(target=self._compile, name='bminor-jit', daemon=True)
+                self._compiler.start()
+            else:
+                self._compiler = True
+                self._compile()
+
+    def _compile(self):
+        '''
+        Compila el programa entero. Las globales quedan externas con un
+        nombre único y se resuelven a la memoria del intérprete.
+        '''
+        start = time.perf_counter()
+        try:
+            module = _TierGenerator.generate(self.ast, self.env, target=self.target,
+                                             loops=[loop for loop in self._loops if loop.promotable])
+            for name in self.globals:
+                module.get_global(name).initializer = None
+            tm = host_target_machine(opt=self.opt_level, target=self.target)
+            llmod = parse_ir(module, tm)
+            prefix = f"__bminor_tier{next(_tier_ids)}."
+            for name, storage in self.globals.items():
+                llmod.get_global_variable(name).name = prefix + name
+                llvm.add_symbol(prefix + name, ctypes.addressof(storage))
+            if self.opt_level > 0:
+                llmod, _ = optimize(llmod, self.opt_level, target_machine=tm)
+            engine = llvm.create_mcjit_compiler(llmod, tm)
+            engine.finalize_object()
+            signatures = {
+                decl.name: (decl.type, [p.type for p in decl.parms])
+                for decl in self.ast.body if isinstance(decl, FuncDecl)
+            }
+            program = JITProgram(engine, llmod, signatures)
+        except Exception as e:
+            # El programa sigue en el intérprete
+            self.compile_error = e
+            return
+        self.compile_time = time.perf_counter() - start
+        # Primero publicar el programa: lo que se marque caliente después se enlaza solo
+        self.program = program
+        for fn in list(self._hot):
+            self._bind(fn)
+        for loop in self._loops:
+            if loop.promotable:
+                loop.bind(program)
+
+    def _bind(self, fn):
+        run = self.program.run
+        name = fn.name
+        out = self._out
+        flush = self.flush
+
+        def native(*args):
+            # La salida del intérprete va antes que la del código nativo
+            if out:
+                flush()
+            return run(name, *args)
+        fn.native = native
+
+    # -----------------------------------------------------------------
+    # Utilidades de la traducción
+    # -----------------------------------------------------------------
+
+    def _slot(self, name, initial, type=None):
+        k = self._nslots
+        self._nslots += 1
+        self._tail.append(initial)
+        self._types.append(type)
+        self._scopes[-1][name] = k
+        for capture in self._captures:
+            capture.own.add(k)
+        return k
+
+    def _local(self, name):
+        for scope in reversed(self._scopes):
+            if name in scope:
+                k = scope[name]
+                for capture in self._captures:
+                    if k not in capture.own:
+                        capture.outer[k] = name
+                return k
+        return None
+
+    def _loop(self, node, capture):
+        '''
+        _Loop de un ciclo ya traducido con 'capture'. Sin entrada nativa
+        si usa locales no escalares (arreglos, strings) o si retorna un
+        valor que no cruza a nativo.
+        '''
+        fn = self._fn
+        cells = None
+        ret_type = fn.decl.type
+        types = self._types
+        if (all(types[k] in _cell_types for k in capture.outer)
+                and all(types[k] in _cell_types for k in capture.own)
+                and not (capture.returns and ret_type is not void_type and ret_type not in _native_types)):
+            cells = ([(name, k, types[k]) for k, name in capture.outer.items()]
+                     + [(decl, k, types[k]) for k, decl in capture.decls.items()])
+        loop = _Loop(fn, len(self._loops), node, cells, capture.returns)
+        self._loops.append(loop)
+        fn.entries.append(loop)
+        return loop
+
+    def _global(self, name):
+        storage = self.globals.get(name)
+        if storage is None:
+            raise Exception(f"Variable no encontrada: {name}")
+        return storage
+
+    def _stmt(self, node):
+        if node is None:
+            return _nop
+        return node.accept(self) or _nop
+
+    @staticmethod
+    def _array_size(n):
+        if not isinstance(n.dimensions, list) or len(n.dimensions) != 1:
+            raise Exception("Solo 1D soportado")
+        dim = n.dimensions[0]
+        if isinstance(dim, int):
+            return dim
+        if isinstance(dim, IntegerLit):
+            return dim.value
+        raise Exception("Tamaño de arreglo debe ser entero literal")
+
+    # -----------------------------------------------------------------
+    # Declaraciones
+    # -----------------------------------------------------------------
+
+    def visit_Program(self, n: Program):
+        for decl in n.body:
+            if isinstance(decl, FuncDecl):
+                fn = self.functions.get(decl.name)
+                if fn is None:
+                    self.functions[decl.name] = _Function(self, decl)
+                elif decl.body is not None:
+                    fn.decl = decl
+        for decl in n.body:
+            decl.accept(self)
+
+    def visit_FuncDecl(self, n: FuncDecl):
+        if n.body is None:
+            return
+        fn = self._fn = self.functions[n.name]
+        self._scopes = [{p.name: i for i, p in enumerate(n.parms)}]
+        self._nslots = len(n.parms)
+        self._tail = []
+        self._types = [p.type for p in n.parms]
+        fn.body = self._stmt(n.body)
+        fn.tail = self._tail
+        self._fn = None
+        self._scopes = []
+
+    def visit_VarDecl(self, n: VarDecl):
+        if self._fn is None:
+            # Global: en cero, como la emite IRGenerator
+            storage = self.globals[n.name] = _storage[n.type]()
+            if n.type is string_type:
+                storage.value = b''
+            return None
+        # Como en IRGenerator, la variable existe antes de evaluar su inicializador
+        k = self._slot(n.name, _zero[n.type], n.type)
+        for capture in self._captures:
+            capture.decls[k] = n
+        if n.value is None:
+            return None
+        value = n.value.accept(self)
+
+        def run(f):
+            f[k] = value(f)
+        return run
+
+    def visit_ArrayDecl(self, n: ArrayDecl):
+        size = self._array_size(n)
+        if self._fn is None:
+            self.globals[n.name] = (_storage[n.element_type] * size)()
+            return None
+        k = self._slot(n.name, None)
+        zero = _zero[n.element_type]
+
+        def run(f):
+            # Como la alloca: el arreglo vive todo el marco
+            if f[k] is None:
+                f[k] = [zero] * size
+        return run
+
+    # -----------------------------------------------------------------
+    # Sentencias
+    # -----------------------------------------------------------------
+
+    def visit_BlockStmt(self, n: BlockStmt):
+        self._scopes.append({})
+        stmts = [s for s in (stmt.accept(self) for stmt in (n.statements or [])) if s is not None]
+        self._scopes.pop()
+        if not stmts:
+            return _nop
+        if len(stmts) == 1:
+            return stmts[0]
+
+        def run(f):
+            for stmt in stmts:
+                r = stmt(f)
+                if r is not None:
+                    return r
+        return run
+
+    def visit_AssignStmt(self, n: AssignStmt):
+        value = n.expr.accept(self)
+        loc = n.location
+        k = self._local(loc.name)
+        if isinstance(loc, VarLoc):
+            if k is not None:
+                def run(f):
+                    f[k] = value(f)
+            else:
+                storage = self._global(loc.name)
+
+                def run(f):
+                    storage.value = value(f)
+            return run
+        if isinstance(loc, ArrayLoc):
+            # Mismo orden que el IR: primero el valor, después el índice
+            index = loc.indices[0].accept(self)
+            if k is not None:
+                def run(f):
+                    f[k][index(f)] = value(f)
+            else:
+                array = self._global(loc.name)
+
+                def run(f):
+                    array[index(f)] = value(f)
+            return run
+        raise Exception("Asignación: LHS no soportado")
+
+    def visit_ExprStmt(self, n: ExprStmt):
+        expr = n.expr.accept(self)
+
+        def run(f):
+            expr(f)
+        return run
+
+    def visit_PrintStmt(self, n: PrintStmt):
+        value = n.expr.accept(self)
+        t = n.expr.type
+        out = self._out
+        write = out.extend
+        flush = self.flush
+        if t is integer_type:
+            def run(f):
+                write(b'%d\n' % value(f))
+                if len(out) >= OUTPUT_BUFFER:
+                    flush()
+        elif t is boolean_type:
+            def run(f):
+                write(b'1\n' if value(f) else b'0\n')
+                if len(out) >= OUTPUT_BUFFER:
+                    flush()
+        elif t is char_type:
+            def run(f):
+                write(bytes((value(f) & 0xFF, 10)))
+                if len(out) >= OUTPUT_BUFFER:
+                    flush()
+        elif t is float_type:
+            def run(f):
+                write(_format_float(value(f)))
+                if len(out) >= OUTPUT_BUFFER:
+                    flush()
+        elif t is string_type:
+            def run(f):
+                write(value(f))
+                write(b'\n')
+                if len(out) >= OUTPUT_BUFFER:
+                    flush()
+        else:
+            raise Exception(f"print: tipo no soportado: {t}")
+        return run
+
+    def visit_ReturnStmt(self, n: ReturnStmt):
+        for capture in self._captures:
+            capture.returns = True
+        if n.expr is None:
+            return lambda f: _VOID
+        value = n.expr.accept(self)
+        return lambda f: (value(f),)
+
+    def visit_IfStmt(self, n: IfStmt):
+        cond = n.condition.accept(self)
+        then = self._stmt(n.then_stmt)
+        if n.else_stmt is None:
+            def run(f):
+                if cond(f):
+                    return then(f)
+        else:
+            other = self._stmt(n.else_stmt)
+
+            def run(f):
+                if cond(f):
+                    return then(f)
+                return other(f)
+        return run
+
+    # Cada ciclo mira su entrada nativa al empezar y, cuando las vueltas
+    # de la función llegan a loop.poll, en el back-edge (retomando desde
+    # la cabecera)
+
+    def visit_WhileStmt(self, n: WhileStmt):
+        cond = n.condition.accept(self)
+        capture = _Capture()
+        self._captures.append(capture)
+        body = self._stmt(n.stmt)
+        self._captures.pop()
+        loop = self._loop(n, capture)
+        loops = self._fn.loops
+        poll = loop.poll
+        back_edge = loop.back_edge
+
+        def run(f):
+            if loop.native is not None:
+                return loop.native(f)
+            while cond(f):
+                r = body(f)
+                if r is not None:
+                    return r
+                loops[0] += 1
+                if loops[0] >= poll[0]:
+                    r = back_edge(f)
+                    if r is not _STAY:
+                        return r
+        return run
+
+    def visit_ForStmt(self, n: ForStmt):
+        self._scopes.append({})
+        init = self._stmt(n.init)
+        capture = _Capture()
+        self._captures.append(capture)
+        cond = n.condition.accept(self) if n.condition is not None else (lambda f: True)
+        update = self._stmt(n.update)
+        body = self._stmt(n.stmt)
+        self._captures.pop()
+        self._scopes.pop()
+        # La entrada nativa empieza después de init
+        loop = self._loop(ForStmt(None, n.condition, n.update, n.stmt, n.lineno), capture)
+        loops = self._fn.loops
+        poll = loop.poll
+        back_edge = loop.back_edge
+
+        def run(f):
+            init(f)
+            if loop.native is not None:
+                return loop.native(f)
+            while cond(f):
+                r = body(f)
+                if r is not None:
+                    return r
+                update(f)
+                loops[0] += 1
+                if loops[0] >= poll[0]:
+                    r = back_edge(f)
+                    if r is not _STAY:
+                        return r
+        return run
+
+    def visit_RangeFor(self, n: RangeFor):
+        start = n.start.accept(self)
+        stop = n.stop.accept(self)
+        self._scopes.append({})
+        k = self._slot(n.name, 0, integer_type)
+        capture = _Capture()
+        # El contador no es una celda: la entrada nativa lo recibe como límite
+        capture.own.add(k)
+        self._captures.append(capture)
+        body = self._stmt(n.stmt)
+        self._captures.pop()
+        self._scopes.pop()
+        loop = self._loop(n, capture)
+        loops = self._fn.loops
+        poll = loop.poll
+        back_edge = loop.back_edge
+
+        if n.name in assigned_names(n.stmt):
+            # El cuerpo mueve i: el mismo latch que el IR (i + 1 < stop)
+            def run(f):
+                first = start(f)
+                limit = stop(f)
+                if loop.native is not None:
+                    return loop.native(f, first, limit)
+                f[k] = first
+                while f[k] < limit:
+                    r = body(f)
+                    if r is not None:
+                        return r
+                    loops[0] += 1
+                    f[k] = _wrap(f[k] + 1)
+                    if loops[0] >= poll[0]:
+                        r = back_edge(f, f[k], limit)
+                        if r is not _STAY:
+                            return r
+        else:
+            def run(f):
+                i = start(f)
+                limit = stop(f)
+                if loop.native is not None:
+                    return loop.native(f, i, limit)
+                while i < limit:
+                    end = min(limit, i + RANGE_CHUNK)
+                    for j in range(i, end):
+                        f[k] = j
+                        r = body(f)
+                        if r is not None:
+                            loops[0] += j - i
+                            return r
+                    loops[0] += end - i
+                    i = end
+                    if loops[0] >= poll[0] and i < limit:
+                        r = back_edge(f, i, limit)
+                        if r is not _STAY:
+                            return r
+        return run
+
+    # -----------------------------------------------------------------
+    # Expresiones
+    # -----------------------------------------------------------------
+
+    def visit_BinOper(self, n: BinOper):
+        oper = n.oper
+        left = n.left.accept(self)
+        right = n.right.accept(self)
+        const = n.right.value if isinstance(n.right, (IntegerLit, FloatLit)) else None
+        if const is not None and isinstance(n.right, IntegerLit):
+            const = _wrap(const)
+
+        if n.type is integer_type:
+            if const is not None and oper in _int_const_ops:
+                return _int_const_ops[oper](left, const)
+            if oper in _int_ops:
+                return _int_ops[oper](left, right)
+        elif n.type is float_type:
+            if oper in _float_ops:
+                return _float_ops[oper](left, right)
+        elif n.type is boolean_type:
+            if n.left.type is integer_type:
+                if const is not None and oper in _compare_const_ops:
+                    return _compare_const_ops[oper](left, const)
+                if oper in _compare_ops:
+                    return _compare_ops[oper](left, right)
+            elif n.left.type is float_type:
+                if const is not None and oper in _float_compare_const_ops:
+                    return _float_compare_const_ops[oper](left, const)
+                if oper in _float_compare_ops:
+                    return _float_compare_ops[oper](left, right)
+            elif n.left.type is boolean_type:
+                if oper in _bool_ops:
+                    return _bool_ops[oper](left, right)
+
+        raise Exception(f"Operación binaria no soportada: {oper} con tipo {n.type}")
+
+    def visit_UnaryOper(self, n: UnaryOper):
+        operand = n.operand.accept(self)
+        if n.type is integer_type:
+            if n.oper == '-':
+                return lambda f: _wrap(-operand(f))
+            if n.oper == '+':
+                return operand
+        elif n.type is float_type:
+            if n.oper == '-':
+                # fsub 0.0, x (no fneg): -(0.0) da 0.0
+                return lambda f: 0.0 - operand(f)
+            if n.oper == '+':
+                return operand
+        elif n.type is boolean_type:
+            if n.oper == '!':
+                return lambda f: not operand(f)
+        raise Exception(f"Operación unaria no soportada: {n.oper} con tipo {n.type}")
+
+    def _incdec(self, n, delta, post):
+        if not isinstance(n.expr, VarLoc):
+            raise Exception("++/-- requiere variable (lvalue)")
+        k = self._local(n.expr.name)
+        if k is not None:
+            if post:
+                def run(f):
+                    old = f[k]
+                    f[k] = _wrap(old + delta)
+                    return old
+            else:
+                def run(f):
+                    new = f[k] = _wrap(f[k] + delta)
+                    return new
+        else:
+            storage = self._global(n.expr.name)
+            if post:
+                def run(f):
+                    old = storage.value
+                    storage.value = _wrap(old + delta)
+                    return old
+            else:
+                def run(f):
+                    new = storage.value = _wrap(storage.value + delta)
+                    return new
+        return run
+
+    def visit_PreInc(self, n: PreInc):
+        return self._incdec(n, +1, post=False)
+
+    def visit_PreDec(self, n: PreDec):
+        return self._incdec(n, -1, post=False)
+
+    def visit_PostInc(self, n: PostInc):
+        return self._incdec(n, +1, post=True)
+
+    def visit_PostDec(self, n: PostDec):
+        return self._incdec(n, -1, post=True)
+
+    def visit_FuncCall(self, n: FuncCall):
+        fn = self.functions.get(n.name)
+        if fn is None:
+            raise Exception(f"Func '{n.name}' no declarada")
+        call = fn.call
+        args = [arg.accept(self) for arg in n.args]
+        if not args:
+            return lambda f: call()
+        if len(args) == 1:
+            a, = args
+            return lambda f: call(a(f))
+        if len(args) == 2:
+            a, b = args
+            return lambda f: call(a(f), b(f))
+        return lambda f: call(*[arg(f) for arg in args])
+
+    def visit_VarLoc(self, n: VarLoc):
+        k = self._local(n.name)
+        if k is not None:
+            return lambda f: f[k]
+        storage = self._global(n.name)
+        return lambda f: storage.value
+
+    def visit_ArrayLoc(self, n: ArrayLoc):
+        index = n.indices[0].accept(self)
+        k = self._local(n.name)
+        if k is not None:
+            return lambda f: f[k][index(f)]
+        array = self._global(n.name)
+        return lambda f: array[index(f)]
+
+    # Literales
+    def visit_IntegerLit(self, n: IntegerLit):
+        value = _wrap(n.value)
+        return lambda f: value
+
+    def visit_FloatLit(self, n: FloatLit):
+        value = float(n.value)
+        return lambda f: value
+
+    def visit_BooleanLit(self, n: BooleanLit):
+        value = bool(n.value)
+        return lambda f: value
+
+    def visit_CharLit(self, n: CharLit):
+        value = _char(ord(n.value))
+        return lambda f: value
+
+    def visit_StringLit(self, n: StringLit):
+        value = n.value.encode('utf-8')
+        return lambda f: value
+
+
+def run(source, name='main', *args):
+    '''
+    Interpreta la función 'name' de un fuente (promoviendo al JIT lo que
+    se caliente)
+    '''
+    return Interpreter(source).run(name, *args)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from compiler import CompileError
+
+    ap = argparse.ArgumentParser(description="Ejecuta un programa B-Minor con el intérprete y el JIT por niveles")
+    ap.add_argument('source', help="programa B-Minor")
+    ap.add_argument('--calls', type=int, default=CALL_THRESHOLD, help="llamadas para promover una función")
+    ap.add_argument('--loops', type=int, default=LOOP_THRESHOLD, help="vueltas de ciclo para promover una función")
+    ap.add_argument('-O', dest='opt', type=int, default=2, help="nivel de optimización del JIT")
+    ap.add_argument('--no-jit', action='store_true', help="solo el intérprete")
+    ap.add_argument('--stats', action='store_true', help="mostrar llamadas, vueltas y nivel por función")
+    args = ap.parse_args()
+
+    with open(args.source, encoding='utf-8') as f:
+        source = f.read()
+    try:
+        program = Interpreter(source, args.calls, args.loops, args.opt, jit=not args.no_jit)
+    except CompileError as e:
+        if e.diagnostics is not None:
+            e.diagnostics.flush()
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    result = program.run()
+    if args.stats:
+        program.wait()
+        print(program.report(), file=sys.stderr)
+    sys.exit(result if isinstance(result, int) else 0)
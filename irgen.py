@@ -7,9 +7,32 @@ Versión 1: Variables, literales y aritmética básica
 from llvmlite import ir
 from model import *
 from Symtab import Symtab
+from tracing import current_tracer
+from runtime import OutputRuntime
+from constfold import assigned_names
+from profiling import ProfileSite, branch_weights, COUNTERS_NAME, DEFAULT_PROFILE, PROFILE_HEADER
+from Typesys import (
+    lookup_type, integer_type, float_type, boolean_type, char_type, string_type, void_type,
+)
+
+class _LoopID(ir.values.MDValue):
+    '''
+    Nodo !llvm.loop: distinct y con una auto-referencia como primer
+    operando, que es lo que lo identifica como loop ID
+    '''
+    def __init__(self, module, hints):
+        super().__init__(module, hints, name=str(len(module.metadata)))
+        self.operands = (self,) + self.operands
+
+    def descr(self, buf):
+        buf.append("distinct ")
+        super().descr(buf)
 
 class IRGenerator(Visitor):
-    def __init__(self):
+    # print baja al runtime con buffer (runtime.py); False: un printf por print
+    buffered_output = True
+
+    def __init__(self, instrument=False, profile=None):
         # Módulo LLVM principal
         self.module = ir.Module(name="bminor_program")
         self.builder = None
@@ -17,15 +40,27 @@ class IRGenerator(Visitor):
         self.vars = {}       # locales (por función)
         self.globals = {}    # NUEVO: globales
         self.type_map = {
-            'integer': ir.IntType(32),
-            'float': ir.DoubleType(),
-            'boolean': ir.IntType(1),
-            'char': ir.IntType(8),
-            'void': ir.VoidType(),
-            'string': ir.IntType(8).as_pointer(),
+            integer_type: ir.IntType(32),
+            float_type: ir.DoubleType(),
+            boolean_type: ir.IntType(1),
+            char_type: ir.IntType(8),
+            void_type: ir.VoidType(),
+            string_type: ir.IntType(8).as_pointer(),
         }
         self._str_const_count = 0          # contador único para nombres
         self._string_pool = {}  
+        self._alloca_builder = None        # builder del bloque 'entry' (solo allocas)
+        self.runtime = OutputRuntime(self.module)
+        self._dtors = []                   # funciones para llvm.global_dtors
+
+        # Instrumentación y perfil de una ejecución anterior (ver profiling.py)
+        self.instrument = instrument
+        self.profile = profile
+        self.profile_sites = []            # ProfileSite por contador
+        self._site_index = {}              # (id(nodo), construcción) -> contador
+        self._node_ordinals = {}           # id(nodo) -> ordinal en su función
+        self._ordinals = {}                # (función, construcción) -> último ordinal
+        self._counters_base = None         # global i64* al arreglo de contadores
 
     def _declare_printf(self):
         """Declara printf si no existe y lo retorna."""
@@ -67,6 +102,16 @@ class IRGenerator(Visitor):
 
 
 
+    def _alloca(self, llvm_type, name):
+        """
+        Reserva una variable local en el bloque 'entry' de la función actual,
+        sin importar dónde esté posicionado self.builder. Así una declaración
+        dentro de un while/for se reserva una sola vez (pila constante) y
+        mem2reg puede promover todas las locales. El alcance de bloque sigue
+        manejándose en visit_BlockStmt.
+        """
+        return self._alloca_builder.alloca(llvm_type, name=name)
+
     def _as_bool(self, val):
         """
         Normaliza cualquier valor a i1 para usar en cbranch.
@@ -158,23 +203,232 @@ class IRGenerator(Visitor):
 
     
     
+    # -----------------------------------------------------------------
+    # Instrumentación
+    # -----------------------------------------------------------------
+
+    def _site(self, node, kind):
+        '''
+        ProfileSite de la construcción 'kind' ('if.then', 'while', ...)
+        del nodo. El ordinal se asigna al nodo la primera vez que se le
+        pide un sitio ('if.then' e 'if.else' del mismo if comparten
+        ordinal), así que instrumentar y leer un perfil numeran igual.
+        '''
+        function = self.current_function.name
+        ordinal = self._node_ordinals.get(id(node))
+        if ordinal is None:
+            construct = (function, kind.split('.')[0])
+            ordinal = self._node_ordinals[id(node)] = self._ordinals.get(construct, 0) + 1
+            self._ordinals[construct] = ordinal
+        return ProfileSite(function, kind, ordinal)
+
+    def _count(self, node, kind):
+        '''
+        Instrumentación: counters[sitio] += 1 en la posición actual del
+        builder. El sitio es (nodo, construcción): si el mismo nodo se
+        genera dos veces comparte contador.
+        '''
+        if not self.instrument:
+            if self.profile is not None:
+                self._site(node, kind)      # mantener la numeración
+            return
+        key = (id(node), kind)
+        index = self._site_index.get(key)
+        if index is None:
+            index = self._site_index[key] = len(self.profile_sites)
+            self.profile_sites.append(self._site(node, kind))
+
+        if self._counters_base is None:
+            # El tamaño del arreglo se conoce al final: mientras tanto se
+            # accede a través de una constante i64* (LLVM la pliega)
+            self._counters_base = ir.GlobalVariable(
+                self.module, ir.IntType(64).as_pointer(), name=COUNTERS_NAME + ".base")
+            self._counters_base.linkage = 'internal'
+            self._counters_base.global_constant = True
+
+        base = self.builder.load(self._counters_base, name="prof.base")
+        ptr = self.builder.gep(base, [ir.Constant(ir.IntType(32), index)], inbounds=True, name="prof.ptr")
+        old = self.builder.load(ptr, name="prof.ld")
+        self.builder.store(self.builder.add(old, ir.Constant(ir.IntType(64), 1), name="prof.inc"), ptr)
+
+    def _profile_count(self, node, kind):
+        return self.profile.count(*self._site(node, kind).key)
+
+    def _weigh(self, branch, node, taken, not_taken=None, total=None, reverse=False):
+        '''
+        PGO: !prof branch_weights en un cbranch según el perfil. 'taken'
+        es el sitio de la rama verdadera (la falsa si reverse=True); la
+        otra rama es 'not_taken' o, si no tiene sitio propio, 'total'
+        menos 'taken' (cabecera - cuerpo).
+        '''
+        if self.profile is None:
+            return
+        t = self._profile_count(node, taken)
+        if not_taken is not None:
+            f = self._profile_count(node, not_taken)
+        else:
+            f = max(self._profile_count(node, total) - t, 0)
+        weights = branch_weights(t, f)
+        branch.set_weights(weights[::-1] if reverse else weights)
+
+    def _apply_function_profile(self):
+        '''
+        PGO: funciones calientes -> alwaysinline (solo inlinehint si son
+        recursivas o main); nunca ejecutadas -> cold + optsize + minsize.
+        '''
+        hot = self.profile.hot_functions()
+        cold = self.profile.cold_functions()
+        for func in self.module.functions:
+            if func.is_declaration or func.name not in hot | cold:
+                continue
+            if func.name in cold:
+                for attr in ('cold', 'optsize', 'minsize'):
+                    func.attributes.add(attr)
+                continue
+            func.attributes.add('inlinehint')
+            recursive = any(
+                isinstance(instr, ir.CallInstr) and instr.callee is func
+                for block in func.blocks for instr in block.instructions
+            )
+            if func.name != 'main' and not recursive:
+                func.attributes.add('alwaysinline')
+
+    def _finish_instrumentation(self):
+        '''
+        Crea el arreglo de contadores (ya se conoce su tamaño) y la
+        función que lo vuelca a archivo al terminar el programa.
+        '''
+        i64 = ir.IntType(64)
+        arr_ty = ir.ArrayType(i64, max(len(self.profile_sites), 1))
+        counters = ir.GlobalVariable(self.module, arr_ty, name=COUNTERS_NAME)
+        counters.initializer = ir.Constant(arr_ty, None)
+        if self._counters_base is not None:
+            zero = ir.Constant(ir.IntType(32), 0)
+            self._counters_base.initializer = counters.gep([zero, zero])
+        self._emit_profile_dump(counters)
+        self.module.profile_sites = self.profile_sites
+
+    def _emit_profile_dump(self, counters):
+        '''
+        __bminor_profile_dump(): escribe los contadores en $BMINOR_PROFILE
+        (o bminor.profile) con el formato de profiling.Profile.load. Se
+        registra en llvm.global_dtors, así que un ejecutable lo llama al
+        salir; en el JIT el host lee los contadores directamente.
+        '''
+        i8p = ir.IntType(8).as_pointer()
+        i32 = ir.IntType(32)
+        getenv = self._get_or_declare_function('getenv', i8p, [i8p])
+        fopen = self._get_or_declare_function('fopen', i8p, [i8p, i8p])
+        fclose = self._get_or_declare_function('fclose', i32, [i8p])
+        fprintf = self.module.globals.get('fprintf')
+        if fprintf is None:
+            fprintf = ir.Function(self.module, ir.FunctionType(i32, [i8p, i8p], var_arg=True), name="fprintf")
+
+        dump = ir.Function(self.module, ir.FunctionType(ir.VoidType(), []), name="__bminor_profile_dump")
+        dump.linkage = 'internal'
+        entry = dump.append_basic_block("entry")
+        write_bb = dump.append_basic_block("write")
+        done_bb = dump.append_basic_block("done")
+        self.builder = ir.IRBuilder(entry)
+
+        null = ir.Constant(i8p, None)
+        env_path = self.builder.call(getenv, [self._cstr("BMINOR_PROFILE", prefix="prof_env")])
+        no_env = self.builder.icmp_unsigned('==', env_path, null)
+        path = self.builder.select(no_env, self._cstr(DEFAULT_PROFILE, prefix="prof_path"), env_path)
+        f = self.builder.call(fopen, [path, self._cstr("w", prefix="prof_mode")])
+        self.builder.cbranch(self.builder.icmp_unsigned('==', f, null), done_bb, write_bb)
+
+        # Una línea por sitio: cuenta, función, construcción, ordinal
+        self.builder.position_at_end(write_bb)
+        self.builder.call(fprintf, [f, self._cstr(PROFILE_HEADER + "\n", prefix="prof_fmt")])
+        zero = ir.Constant(i32, 0)
+        for index, site in enumerate(self.profile_sites):
+            ptr = self.builder.gep(counters, [zero, ir.Constant(i32, index)], inbounds=True)
+            line = f"%lld\t{site.function}\t{site.kind}\t{site.ordinal}\n"
+            self.builder.call(fprintf, [f, self._cstr(line, prefix="prof_fmt"), self.builder.load(ptr)])
+        self.builder.call(fclose, [f])
+        self.builder.branch(done_bb)
+
+        self.builder.position_at_end(done_bb)
+        self.builder.ret_void()
+        self.builder = None
+        self._dtors.append(dump)
+
+    def _emit_global_dtors(self):
+        '''
+        @llvm.global_dtors = appending global [N x {i32, void()*, i8*}]:
+        funciones que un ejecutable llama al terminar
+        '''
+        if not self._dtors:
+            return
+        i32 = ir.IntType(32)
+        null = ir.Constant(ir.IntType(8).as_pointer(), None)
+        entry_ty = ir.LiteralStructType([i32, self._dtors[0].type, null.type])
+        dtors_ty = ir.ArrayType(entry_ty, len(self._dtors))
+        dtors = ir.GlobalVariable(self.module, dtors_ty, name="llvm.global_dtors")
+        dtors.linkage = 'appending'
+        dtors.initializer = ir.Constant(dtors_ty, [
+            ir.Constant(entry_ty, [ir.Constant(i32, 65535), func, null]) for func in self._dtors
+        ])
+
     @classmethod
-    def generate(cls, ast, env):
+    def generate(cls, ast, env, externs=None, instrument=False, profile=None, target=None):
         '''
-        Método principal para generar IR desde un AST
+        Método principal para generar IR desde un AST.
+        'externs': declaraciones definidas en otros archivos, que se
+        emiten como declaraciones externas (ver build.py).
+        Con instrument=True el código cuenta sus ejecuciones por función,
+        ciclo y rama (ver profiling.py); la tabla de contadores queda en
+        module.profile_sites. Con 'profile' (profiling.Profile de una
+        ejecución instrumentada del mismo fuente) los saltos llevan
+        branch_weights y las funciones calientes/frías sus atributos, y
+        module.profile_guided elige el pipeline de optimizer.optimize.
+        Con 'target' (compiler.Target) el módulo lleva su triple y data
+        layout; sin él queda 'unknown-unknown-unknown'.
         '''
-        generator = cls()
-        ast.accept(generator, env)
+        generator = cls(instrument, profile)
+        if target is not None:
+            target.apply(generator.module)
+        with current_tracer().span('IRGenerator.generate', 'codegen'):
+            for decl in (externs or []):
+                generator._declare_external(decl)
+            ast.accept(generator, env)
+            if instrument:
+                generator._finish_instrumentation()
+            if profile is not None:
+                generator._apply_function_profile()
+            generator.module.profile_guided = profile is not None
+            if generator.runtime.used:
+                generator._dtors.append(generator.runtime.flush())
+            generator._emit_global_dtors()
         return generator.module
     
-    def get_llvm_type(self, bminor_type):
+    def _declare_external(self, decl):
         '''
-        Convierte un tipo de B-Minor a tipo LLVM
+        Declara (sin definir) una función o global de otro módulo
         '''
-        if bminor_type in self.type_map:
-            return self.type_map[bminor_type]
+        if isinstance(decl, FuncDecl):
+            ret_ty = self.get_llvm_type(decl.type)
+            param_tys = [self.get_llvm_type(p.type) for p in decl.parms]
+            self._get_or_declare_function(decl.name, ret_ty, param_tys)
+        elif isinstance(decl, ArrayDecl):
+            size = decl.dimensions[0]
+            if isinstance(size, IntegerLit):
+                size = size.value
+            arr_ty = ir.ArrayType(self.get_llvm_type(decl.element_type), size)
+            self.globals[decl.name] = ir.GlobalVariable(self.module, arr_ty, name=decl.name)
         else:
+            llvm_type = self.get_llvm_type(decl.type)
+            self.globals[decl.name] = ir.GlobalVariable(self.module, llvm_type, name=decl.name)
+
+    def get_llvm_type(self, bminor_type):
+        '''
+        Convierte un tipo de B-Minor (objeto de Typesys o nombre) a tipo LLVM
+        '''
+        llvm_type = self.type_map.get(lookup_type(bminor_type))
+        if llvm_type is None:
             raise Exception(f"Tipo desconocido: {bminor_type}")
+        return llvm_type
     
     def visit_Program(self, n: Program, env: Symtab):
         '''
@@ -205,11 +459,11 @@ class IRGenerator(Visitor):
             # Variable global
             global_var = ir.GlobalVariable(self.module, llvm_type, name=n.name)
 
-            if n.type == 'integer':
+            if n.type is integer_type:
                 global_var.initializer = ir.Constant(llvm_type, 0)
-            elif n.type == 'float':
+            elif n.type is float_type:
                 global_var.initializer = ir.Constant(llvm_type, 0.0)
-            elif n.type == 'boolean':
+            elif n.type is boolean_type:
                 global_var.initializer = ir.Constant(llvm_type, 0)
 
             # 🔸 GUARDAR EN GLOBALES (NO en self.vars)
@@ -217,8 +471,8 @@ class IRGenerator(Visitor):
 
             # (opcional) si tienes n.value y quieres inicializar con valor real, se hace con un ctor global aparte
         else:
-            # Local (igual que ya lo tenías)
-            alloca = self.builder.alloca(llvm_type, name=n.name)
+            # Local (reservada en el bloque entry)
+            alloca = self._alloca(llvm_type, n.name)
             self.vars[n.name] = alloca
             if n.value:
                 init_value = n.value.accept(self, env)
@@ -228,6 +482,13 @@ class IRGenerator(Visitor):
         '''
         Genera código para declaración de función
         '''
+        if n.body is None:
+            # Prototipo: visit_Program ya la declaró
+            return
+        with current_tracer().span(n.name, 'codegen'):
+            self._gen_function(n, env)
+
+    def _gen_function(self, n: FuncDecl, env: Symtab):
         # Obtener tipo de retorno
         return_type = self.get_llvm_type(n.type)
         param_types = [self.get_llvm_type(p.type) for p in n.parms]
@@ -235,10 +496,13 @@ class IRGenerator(Visitor):
         # Recuperar o declarar (si alguien llama a esta antes)
         func = self._get_or_declare_function(n.name, return_type, param_types)
 
-        # Bloque de entrada y builder
+        # Bloque de entrada (solo allocas) y bloque donde empieza el cuerpo
         entry = func.append_basic_block(name="entry")
-        self.builder = ir.IRBuilder(entry)
+        body_bb = func.append_basic_block(name="body")
+        self._alloca_builder = ir.IRBuilder(entry)
+        self.builder = ir.IRBuilder(body_bb)
         self.current_function = func
+        self._count(n, 'function')
 
         # Nuevo "scope" de variables locales
         old_vars = self.vars
@@ -247,7 +511,7 @@ class IRGenerator(Visitor):
         # Nombrar args y alloca + store
         for parm, arg in zip(n.parms, func.args):
             arg.name = parm.name
-            alloca = self.builder.alloca(self.get_llvm_type(parm.type), name=parm.name)
+            alloca = self._alloca(self.get_llvm_type(parm.type), parm.name)
             self.builder.store(arg, alloca)
             self.vars[parm.name] = alloca
 
@@ -256,17 +520,21 @@ class IRGenerator(Visitor):
 
         # Epílogo si no hay return explícito
         if not self.builder.block.is_terminated:
-            if n.type == 'void':
+            if n.type is void_type:
                 self.builder.ret_void()
-            elif n.type == 'integer':
+            elif n.type is integer_type:
                 self.builder.ret(ir.Constant(ir.IntType(32), 0))
-            elif n.type == 'boolean':
+            elif n.type is boolean_type:
                 self.builder.ret(ir.Constant(ir.IntType(1), 0))
 
+        # Cerrar entry: ya están todas las allocas de la función
+        self._alloca_builder.branch(body_bb)
+
         # Restaurar contexto
         self.vars = old_vars
         self.current_function = None
         self.builder = None
+        self._alloca_builder = None
     
     def visit_ReturnStmt(self, n: ReturnStmt, env: Symtab):
         '''
@@ -312,12 +580,19 @@ class IRGenerator(Visitor):
         '''
         Genera código para operaciones binarias
         '''
+        # && y || evalúan sus operandos ellos mismos (cortocircuito)
+        if n.type is boolean_type and n.left.type is boolean_type:
+            if n.oper == '&&':
+                return self._short_circuit_and(n.left, n.right, env, n)
+            elif n.oper == '||':
+                return self._short_circuit_or(n.left, n.right, env, n)
+
         # Evaluar operandos
         left = n.left.accept(self, env)
         right = n.right.accept(self, env)
         
         # Determinar el tipo de operación
-        if n.type == 'integer':
+        if n.type is integer_type:
             # Operaciones aritméticas con enteros
             if n.oper == '+':
                 return self.builder.add(left, right, name='addtmp')
@@ -330,7 +605,7 @@ class IRGenerator(Visitor):
             elif n.oper == '%':
                 return self.builder.srem(left, right, name='modtmp')
         
-        elif n.type == 'float':
+        elif n.type is float_type:
             # Operaciones aritméticas con floats
             if n.oper == '+':
                 return self.builder.fadd(left, right, name='faddtmp')
@@ -341,9 +616,9 @@ class IRGenerator(Visitor):
             elif n.oper == '/':
                 return self.builder.fdiv(left, right, name='fdivtmp')
         
-        elif n.type == 'boolean':
+        elif n.type is boolean_type:
             # Operaciones de comparación
-            if n.left.type == 'integer':
+            if n.left.type is integer_type:
                 # Comparaciones con enteros
                 if n.oper == '<':
                     return self.builder.icmp_signed('<', left, right, name='cmptmp')
@@ -358,7 +633,7 @@ class IRGenerator(Visitor):
                 elif n.oper == '!=':
                     return self.builder.icmp_signed('!=', left, right, name='cmptmp')
             
-            elif n.left.type == 'float':
+            elif n.left.type is float_type:
                 # Comparaciones con floats
                 if n.oper == '<':
                     return self.builder.fcmp_ordered('<', left, right, name='fcmptmp')
@@ -373,20 +648,11 @@ class IRGenerator(Visitor):
                 elif n.oper == '!=':
                     return self.builder.fcmp_ordered('!=', left, right, name='fcmptmp')
             
-            elif n.left.type == 'boolean':
-                # LÓGICAS CON CORTOCIRCUITO
-                if n.oper == '&&':
-                    return self._short_circuit_and(n.left, n.right, env)
-                elif n.oper == '||':
-                    return self._short_circuit_or(n.left, n.right, env)
+            elif n.left.type is boolean_type:
                 # Igualdad/Desigualdad entre booleanos
-                elif n.oper == '==':
-                    left  = n.left.accept(self, env)
-                    right = n.right.accept(self, env)
+                if n.oper == '==':
                     return self.builder.icmp_signed('==', left, right, name='cmptmp')
                 elif n.oper == '!=':
-                    left  = n.left.accept(self, env)
-                    right = n.right.accept(self, env)
                     return self.builder.icmp_signed('!=', left, right, name='cmptmp')
         
         raise Exception(f"Operación binaria no soportada: {n.oper} con tipo {n.type}")
@@ -397,7 +663,7 @@ class IRGenerator(Visitor):
         '''
         operand = n.operand.accept(self, env)
         
-        if n.type == 'integer':
+        if n.type is integer_type:
             if n.oper == '-':
                 # Negación: 0 - operand
                 zero = ir.Constant(ir.IntType(32), 0)
@@ -406,7 +672,7 @@ class IRGenerator(Visitor):
                 # Unario + no hace nada
                 return operand
         
-        elif n.type == 'float':
+        elif n.type is float_type:
             if n.oper == '-':
                 # Negación float: 0.0 - operand
                 zero = ir.Constant(ir.DoubleType(), 0.0)
@@ -414,7 +680,7 @@ class IRGenerator(Visitor):
             elif n.oper == '+':
                 return operand
         
-        elif n.type == 'boolean':
+        elif n.type is boolean_type:
             if n.oper == '!':
                 # Negación lógica: xor con 1
                 one = ir.Constant(ir.IntType(1), 1)
@@ -474,16 +740,19 @@ class IRGenerator(Visitor):
         # 2) Bloques
         then_bb  = self.current_function.append_basic_block(name="if.then")
         merge_bb = self.current_function.append_basic_block(name="if.end")
-        else_bb  = self.current_function.append_basic_block(name="if.else") if n.else_stmt else None
+        # (instrumentado, la arista falsa siempre tiene su bloque para contarla)
+        else_bb  = self.current_function.append_basic_block(name="if.else") if n.else_stmt or self.instrument else None
 
         # 3) Branch condicional
         if else_bb:
-            self.builder.cbranch(cond_i1, then_bb, else_bb)
+            branch = self.builder.cbranch(cond_i1, then_bb, else_bb)
         else:
-            self.builder.cbranch(cond_i1, then_bb, merge_bb)
+            branch = self.builder.cbranch(cond_i1, then_bb, merge_bb)
+        self._weigh(branch, n, 'if.then', not_taken='if.else')
 
         # 4) THEN
         self.builder.position_at_end(then_bb)
+        self._count(n, 'if.then')
         self._gen_stmt_or_list(n.then_stmt, env)
         if not self.builder.block.is_terminated:
             self.builder.branch(merge_bb)
@@ -491,6 +760,7 @@ class IRGenerator(Visitor):
         # 5) ELSE (si existe)
         if else_bb:
             self.builder.position_at_end(else_bb)
+            self._count(n, 'if.else')
             self._gen_stmt_or_list(n.else_stmt, env)
             if not self.builder.block.is_terminated:
                 self.builder.branch(merge_bb)
@@ -523,12 +793,15 @@ class IRGenerator(Visitor):
 
         # Condición
         self.builder.position_at_end(cond_bb)
+        self._count(n, 'while')
         cond_val = n.condition.accept(self, env)
         cond_i1  = self._as_bool(cond_val)
-        self.builder.cbranch(cond_i1, body_bb, end_bb)
+        branch = self.builder.cbranch(cond_i1, body_bb, end_bb)
+        self._weigh(branch, n, 'while.body', total='while')
 
         # Cuerpo (siempre BlockStmt)
         self.builder.position_at_end(body_bb)
+        self._count(n, 'while.body')
         n.stmt.accept(self, env)
         if not self.builder.block.is_terminated:
             self.builder.branch(cond_bb)
@@ -536,7 +809,7 @@ class IRGenerator(Visitor):
         # Merge / salida del while
         self.builder.position_at_end(end_bb)
 
-    def _short_circuit_and(self, left_node, right_node, env):
+    def _short_circuit_and(self, left_node, right_node, env, node=None):
         """
         Genera:
         left = ...
@@ -548,6 +821,7 @@ class IRGenerator(Visitor):
         phi [0, from_left_bb], [right, rhs_bb]
         """
         func = self.current_function
+        self._count(node, 'and')
 
         # Evalúa left y guarda bloque actual (desde donde saltan las ramas)
         left_val = left_node.accept(self, env)
@@ -558,10 +832,12 @@ class IRGenerator(Visitor):
         end_bb  = func.append_basic_block("and.end")
 
         # Si left es true -> evaluar right, si no -> resultado false
-        self.builder.cbranch(left_i1, rhs_bb, end_bb)
+        branch = self.builder.cbranch(left_i1, rhs_bb, end_bb)
+        self._weigh(branch, node, 'and.rhs', total='and')
 
         # RHS: evalúa el derecho sólo si hizo falta
         self.builder.position_at_end(rhs_bb)
+        self._count(node, 'and.rhs')
         right_i1 = self._as_bool(right_node.accept(self, env))
         self.builder.branch(end_bb)
         from_rhs_bb = self.builder.block
@@ -573,7 +849,7 @@ class IRGenerator(Visitor):
         phi.add_incoming(right_i1, from_rhs_bb)                        # left==true -> right
         return phi
 
-    def _short_circuit_or(self, left_node, right_node, env):
+    def _short_circuit_or(self, left_node, right_node, env, node=None):
         """
         Genera:
         left = ...
@@ -585,6 +861,7 @@ class IRGenerator(Visitor):
         phi [1, from_left_bb], [right, rhs_bb]
         """
         func = self.current_function
+        self._count(node, 'or')
 
         left_val = left_node.accept(self, env)
         left_i1  = self._as_bool(left_val)
@@ -594,10 +871,12 @@ class IRGenerator(Visitor):
         end_bb  = func.append_basic_block("or.end")
 
         # Si left es true -> ya es true (no evalúa right). Si no -> evalúa right
-        self.builder.cbranch(left_i1, end_bb, rhs_bb)
+        branch = self.builder.cbranch(left_i1, end_bb, rhs_bb)
+        self._weigh(branch, node, 'or.rhs', total='or', reverse=True)
 
         # RHS
         self.builder.position_at_end(rhs_bb)
+        self._count(node, 'or.rhs')
         right_i1 = self._as_bool(right_node.accept(self, env))
         self.builder.branch(end_bb)
         from_rhs_bb = self.builder.block
@@ -633,6 +912,10 @@ class IRGenerator(Visitor):
         return self.builder.call(callee, llvm_args, name=(n.name + ".call"))
     
     def visit_PrintStmt(self, n: PrintStmt, env: Symtab):
+        if self.buffered_output:
+            self._print_buffered(n.expr.accept(self, env))
+            return
+
         printf = self._declare_printf()
 
         # Obtén el valor LLVM de la expresión
@@ -668,8 +951,34 @@ class IRGenerator(Visitor):
             self.builder.call(printf, [fmt, val])
             return
 
+        # double -> %g\n
+        if isinstance(ty, ir.DoubleType):
+            fmt = self._cstr("%g\n", prefix="fmt_float")
+            self.builder.call(printf, [fmt, val])
+            return
+
         raise Exception(f"print: tipo no soportado: {ty}")
 
+    def _print_buffered(self, val):
+        '''
+        print con el runtime de salida (runtime.py): un escritor por tipo,
+        sin formato variádico
+        '''
+        ty = val.type
+        if isinstance(ty, ir.IntType) and ty.width == 32:
+            kind = 'int'
+        elif isinstance(ty, ir.IntType) and ty.width == 1:
+            kind, val = 'int', self.builder.zext(val, ir.IntType(32))
+        elif isinstance(ty, ir.IntType) and ty.width == 8:
+            kind = 'char'
+        elif isinstance(ty, ir.DoubleType):
+            kind = 'float'
+        elif isinstance(ty, ir.PointerType) and isinstance(ty.pointee, ir.IntType) and ty.pointee.width == 8:
+            kind = 'str'
+        else:
+            raise Exception(f"print: tipo no soportado: {ty}")
+        self.builder.call(self.runtime.writer(kind), [val])
+
     
     def visit_StringLit(self, n: StringLit, env: Symtab):
         # Retorna i8* a una constante global con el contenido del literal
@@ -708,16 +1017,19 @@ class IRGenerator(Visitor):
 
         # condición
         self.builder.position_at_end(cond_bb)
+        self._count(n, 'for')
         if n.condition is not None:
             cond_val = n.condition.accept(self, env)
             cond_i1  = self._as_bool(cond_val)
         else:
             # for(;;) equivalente a cond true
             cond_i1 = ir.Constant(ir.IntType(1), 1)
-        self.builder.cbranch(cond_i1, body_bb, end_bb)
+        branch = self.builder.cbranch(cond_i1, body_bb, end_bb)
+        self._weigh(branch, n, 'for.body', total='for')
 
         # cuerpo
         self.builder.position_at_end(body_bb)
+        self._count(n, 'for.body')
         n.stmt.accept(self, env)
         if not self.builder.block.is_terminated:
             self.builder.branch(upd_bb)
@@ -732,6 +1044,98 @@ class IRGenerator(Visitor):
         # fin
         self.builder.position_at_end(end_bb)
 
+    def visit_RangeFor(self, n: RangeFor, env):
+        """
+        for i in range(a, b) body
+        Loop contado: a y b se evalúan una sola vez e i es la variable de
+        inducción (alloca que mem2reg promueve). Se emite ya rotado, con
+        una guarda y la comparación en el latch:
+        i = a; stop = b
+        cbr i < stop, body_bb, end_bb
+        body_bb:
+        body...
+        br latch_bb
+        latch_bb:
+        i = i + 1            (nsw si el cuerpo no asigna i: i < stop)
+        cbr i < stop, body_bb, end_bb
+        end_bb:
+        ...
+        Con límites constantes los saltos llevan branch_weights con el
+        número de iteraciones; si no, los del perfil (si hay uno). Si el
+        cuerpo no asigna i el loop siempre termina, y el latch lleva un
+        !llvm.loop con llvm.loop.mustprogress: LLVM puede borrarlo si no
+        tiene efectos y razonar sobre él sin probar que termina.
+        """
+        func = self.current_function
+        i32 = ir.IntType(32)
+
+        start = n.start.accept(self, env)
+        stop = n.stop.accept(self, env)
+
+        old_vars = self.vars
+        self.vars = dict(self.vars)
+        var = self.vars[n.name] = self._alloca(i32, n.name)
+        self.builder.store(start, var)
+
+        body_bb  = func.append_basic_block("range.body")
+        latch_bb = func.append_basic_block("range.latch")
+        end_bb   = func.append_basic_block("range.end")
+
+        # guarda
+        self._count(n, 'range')
+        guard = self.builder.cbranch(self.builder.icmp_signed('<', start, stop, name="range.enter"),
+                                     body_bb, end_bb)
+
+        # cuerpo
+        self.builder.position_at_end(body_bb)
+        self._count(n, 'range.body')
+        n.stmt.accept(self, env)
+        if not self.builder.block.is_terminated:
+            self.builder.branch(latch_bb)
+
+        # latch: incremento y comparación
+        self.builder.position_at_end(latch_bb)
+        self._count(n, 'range')
+        flags = () if n.name in assigned_names(n.stmt) else ('nsw',)
+        current = self.builder.load(var, name=n.name)
+        nxt = self.builder.add(current, ir.Constant(i32, 1), name="range.next", flags=flags)
+        self.builder.store(nxt, var)
+        latch = self.builder.cbranch(self.builder.icmp_signed('<', nxt, stop, name="range.cond"),
+                                     body_bb, end_bb)
+        self._weigh_range(n, guard, latch, start, stop)
+        if flags:
+            latch.set_metadata('llvm.loop', self._loop_id('llvm.loop.mustprogress'))
+
+        self.vars = old_vars
+        self.builder.position_at_end(end_bb)
+
+    def _loop_id(self, *hints):
+        '''
+        Nuevo loop ID con las propiedades dadas (nombres sin valor)
+        '''
+        props = [self.module.add_metadata([ir.MetaDataString(self.module, hint)]) for hint in hints]
+        return _LoopID(self.module, props)
+
+    def _weigh_range(self, n, guard, latch, start, stop):
+        '''
+        Trip count de un RangeFor como branch_weights: exacto si los
+        límites son constantes (la guarda se pliega), estimado del perfil
+        si no. 'range' cuenta
+        evaluaciones de la condición (guarda + latch) y 'range.body'
+        iteraciones, así que entradas = range - range.body.
+        '''
+        if isinstance(start, ir.Constant) and isinstance(stop, ir.Constant):
+            trips = stop.constant - start.constant
+            if trips > 0:
+                # exacto: trips - 1 vueltas al cuerpo y una salida
+                latch.set_weights([trips - 1, 1])
+        elif self.profile is not None:
+            iterations = self._profile_count(n, 'range.body')
+            entries = max(self._profile_count(n, 'range') - iterations, 0)
+            entered = min(entries, iterations)
+            guard.set_weights(branch_weights(entered, entries - entered))
+            latch.set_weights(branch_weights(iterations - entered, entered))
+
     def visit_PreInc(self, n: PreInc, env):
         # ++x  -> devuelve valor nuevo
         if not isinstance(n.expr, VarLoc):
@@ -778,8 +1182,8 @@ class IRGenerator(Visitor):
             g.initializer = ir.Constant(arr_ty, None)  # zeroinitializer
             self.globals[n.name] = g     # 🔸 aquí
         else:
-            # Local
-            alloca = self.builder.alloca(arr_ty, name=n.name)
+            # Local (reservada en el bloque entry)
+            alloca = self._alloca(arr_ty, n.name)
             self.vars[n.name] = alloca   # (local) aquí se queda igual
 
 
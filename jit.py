@@ -0,0 +1,156 @@
+# jit.py
+'''
+Ejecución JIT en proceso para B-Minor
+=====================================
+Convierte el ir.Module producido por IRGenerator en código nativo en
+memoria (MCJIT de llvmlite.binding) y expone las funciones del programa
+(cualquier FuncDecl, no solo main) como callables de ctypes.
+
+Los motores compilados se guardan en caché por hash del fuente: volver
+a ejecutar el mismo programa no repite parsing, chequeo ni codegen.
+Ojo: el motor (y por tanto sus variables globales) se reutiliza entre
+ejecuciones del mismo fuente.
+
+    from jit import run
+    run(source)                      # llama a main()
+    run(source, 'suma', 2, 3)        # cualquier otra función
+'''
+
+import ctypes
+import hashlib
+import threading
+
+import llvmlite.binding as llvm
+
+from model     import FuncDecl
+from Typesys   import (
+    lookup_type, integer_type, float_type, boolean_type, char_type, string_type, void_type,
+)
+from compiler  import compile_source, host_target_machine, parse_ir
+from optimizer import optimize
+from tracing   import current_tracer
+from runtime   import FLUSH_NAME
+from target    import default_target
+
+# Tipos B-Minor -> tipos ctypes (deben coincidir con IRGenerator.type_map)
+_ctype_map = {
+    integer_type: ctypes.c_int32,
+    float_type:   ctypes.c_double,
+    boolean_type: ctypes.c_bool,
+    char_type:    ctypes.c_char,
+    string_type:  ctypes.c_char_p,
+    void_type:    None,
+}
+
+def ctype_for(bminor_type):
+    '''
+    Convierte un tipo de B-Minor al tipo ctypes equivalente
+    '''
+    bminor_type = lookup_type(bminor_type)
+    if bminor_type in _ctype_map:
+        return _ctype_map[bminor_type]
+    raise Exception(f"Tipo no soportado por el JIT: {bminor_type}")
+
+
+class JITProgram:
+    '''
+    Un programa B-Minor compilado a código nativo. Mantiene vivos el
+    motor de ejecución y el módulo LLVM mientras exista.
+    '''
+    def __init__(self, engine, llmod, signatures, sites=None):
+        self.engine = engine
+        self.llmod = llmod
+        self.signatures = signatures    # nombre -> (tipo retorno, [tipos parámetros])
+        self.sites = sites              # contadores si está instrumentado (profiling.py)
+        self._funcs = {}
+        # El JIT no corre destructores: el buffer de print se vacía tras cada llamada
+        flush = engine.get_function_address(FLUSH_NAME)
+        self._flush = ctypes.CFUNCTYPE(None)(flush) if flush else None
+
+    def function(self, name):
+        '''
+        Devuelve la función nativa 'name' como callable de ctypes.
+        '''
+        func = self._funcs.get(name)
+        if func is None:
+            if name not in self.signatures:
+                raise KeyError(f"Función no encontrada: {name}")
+            ret_type, parm_types = self.signatures[name]
+            proto = ctypes.CFUNCTYPE(ctype_for(ret_type), *[ctype_for(t) for t in parm_types])
+            addr = self.engine.get_function_address(name)
+            func = self._funcs[name] = proto(addr)
+        return func
+
+    def run(self, name='main', *args):
+        '''
+        Llama a la función 'name' con los argumentos dados
+        '''
+        try:
+            return self.function(name)(*args)
+        finally:
+            self.flush()
+
+    def flush(self):
+        '''
+        Vacía el buffer de print del código nativo
+        '''
+        if self._flush is not None:
+            self._flush()
+
+
+def _signatures(ast):
+    return {
+        decl.name: (decl.type, [p.type for p in decl.parms])
+        for decl in ast.body if isinstance(decl, FuncDecl)
+    }
+
+def source_hash(source):
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+_engines = {}               # (hash del fuente, nivel, instrumentado, perfil, destino) -> JITProgram
+_engines_lock = threading.Lock()
+
+def compile_module(module, signatures, opt_level=2, target=None):
+    '''
+    Compila un ir.Module ya generado a un JITProgram (sin caché).
+    '''
+    tm = host_target_machine(opt=opt_level, target=target)
+    llmod = parse_ir(module, tm)
+    if opt_level > 0:
+        llmod, _ = optimize(llmod, opt_level, target_machine=tm,
+                            profile_guided=getattr(module, 'profile_guided', False))
+    with current_tracer().span('jit', 'jit'):
+        engine = llvm.create_mcjit_compiler(llmod, tm)
+        engine.finalize_object()
+        engine.run_static_constructors()
+    return JITProgram(engine, llmod, signatures, getattr(module, 'profile_sites', None))
+
+def jit_compile(source, opt_level=2, instrument=False, profile=None, target=None):
+    '''
+    Compila un fuente B-Minor a código nativo. El resultado se guarda
+    en caché por hash del fuente (y nivel de optimización).
+    Con instrument=True los contadores de ejecución se leen con
+    profiling.read_profile(program); con 'profile' (un Profile de esa
+    ejecución) se recompila guiado por el perfil. 'target' (target.Target)
+    elige la CPU y las features para las que se genera código (por
+    defecto el host).
+    '''
+    target = target or default_target()
+    key = (source_hash(source), opt_level, instrument, profile.digest() if profile else None, target.key)
+    with _engines_lock:
+        program = _engines.get(key)
+        if program is None:
+            ast, module = compile_source(source, instrument=instrument, profile=profile, target=target)
+            program = _engines[key] = compile_module(module, _signatures(ast), opt_level, target)
+    return program
+
+def run(source, name='main', *args):
+    '''
+    Compila (o recupera de la caché) y ejecuta la función 'name'.
+    '''
+    return jit_compile(source).run(name, *args)
+
+def clear_cache():
+    with _engines_lock:
+        _engines.clear()
@@ -2,12 +2,28 @@
 '''
 AST Node classes for the bminor language
 Actualizado para compatibilidad con el parser de SLY
+
+Los nodos usan __slots__ (sin __dict__ por instancia): un programa grande
+genera millones de nodos. Cada clase declara en __slots__ exactamente los
+atributos que asigna, incluido 'type' cuando el checker lo completa.
+
+Los atributos 'type' guardan objetos de tipo internados de Typesys (no
+strings): los constructores convierten los nombres que da el parser.
 '''
 
+from Typesys import (
+    lookup_type as _lookup_type, array_type as _array_type,
+    function_type as _function_type,
+    integer_type as _integer, float_type as _float, string_type as _string,
+    char_type as _char, boolean_type as _boolean,
+)
+
 class Node:
     '''
     Base class for all AST nodes
     '''
+    __slots__ = ('lineno',)
+
     def __init__(self, lineno=0):
         self.lineno = lineno
     
@@ -15,28 +31,51 @@ class Node:
         '''
         Accept method for visitor pattern
         '''
-        method_name = f'visit_{self.__class__.__name__}'
-        method = getattr(visitor, method_name, None)
-        if method:
-            return method(self, *args, **kwargs)
-        else:
-            # Try generic visit method
-            method = getattr(visitor, 'visit', None)
-            if method:
-                return method(self, *args, **kwargs)
-            else:
-                raise Exception(f"No visit method for {self.__class__.__name__}")
+        try:
+            method = visitor._dispatch[self.__class__]
+        except (KeyError, AttributeError):
+            method = resolve_visit(visitor.__class__, self.__class__)
+        return method(visitor, self, *args, **kwargs)
+
+def resolve_visit(visitor_cls, node_cls):
+    '''
+    Busca visit_<Clase> (o el genérico visit) en la clase del visitor y lo
+    guarda en su tabla de despacho: la resolución ocurre una sola vez por
+    (clase de visitor, clase de nodo) y cada visita posterior cuesta un
+    solo lookup en un dict.
+    '''
+    method = getattr(visitor_cls, f'visit_{node_cls.__name__}', None)
+    if method is None:
+        # Try generic visit method
+        method = getattr(visitor_cls, 'visit', None)
+        if method is None:
+            raise Exception(f"No visit method for {node_cls.__name__}")
+    table = visitor_cls.__dict__.get('_dispatch')
+    if table is None:
+        table = {}
+        try:
+            visitor_cls._dispatch = table
+        except TypeError:
+            # Clase no modificable (p. ej. builtin): sin caché
+            return method
+    table[node_cls] = method
+    return method
 
 class Visitor:
     '''
     Base visitor class
     '''
-    pass
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Tabla de despacho propia: clase de nodo -> función visit_*
+        cls._dispatch = {}
 
 class Program(Node):
     '''
     Root node of the program
     '''
+    __slots__ = ('body',)
+
     def __init__(self, body, lineno=0):
         super().__init__(lineno)
         self.body = body  # List of declarations
@@ -45,91 +84,103 @@ class VarDecl(Node):
     '''
     Variable declaration: name: type = value;
     '''
+    __slots__ = ('name', 'type', 'value')
+
     def __init__(self, name, type, value=None, lineno=0):
         super().__init__(lineno)
         self.name = name
-        self.type = type
+        self.type = _lookup_type(type)
         self.value = value
 
 class ArrayDecl(Node):
     '''
     Array declaration: name: array [size] type = {...};
     '''
+    __slots__ = ('name', 'element_type', 'dimensions', 'values', 'type')
+
     def __init__(self, name, element_type, dimensions, values=None, lineno=0):
         super().__init__(lineno)
         self.name = name
-        self.element_type = element_type
+        self.element_type = _lookup_type(element_type)
         self.dimensions = dimensions  # Lista de expresiones para cada dimensión
         self.values = values or []
-        # Construir el tipo completo
-        if isinstance(dimensions, list):
-            size_str = ''.join([f'[{d}]' if isinstance(d, int) else '[?]' for d in dimensions])
-        else:
-            size_str = f'[{dimensions}]'
-        self.type = f"array{size_str}{element_type}"
+        # Tipo completo (internado)
+        dims = dimensions if isinstance(dimensions, list) else [dimensions]
+        self.type = _array_type(self.element_type, dims)
 
 class FuncDecl(Node):
     '''
     Function declaration: name: function return_type (params) = { body }
+    Prototype (sin cuerpo): name: function return_type (params);  -> body = None
     '''
+    __slots__ = ('name', 'type', 'parms', 'body')
+
     def __init__(self, name, return_type, parms, body, lineno=0):
         super().__init__(lineno)
         self.name = name
-        self.type = return_type  # Return type of function
+        self.type = _lookup_type(return_type)  # Return type of function
         self.parms = parms       # List of parameters
-        # Normalizamos a BlockStmt (acepta lista/nodo/None)
-        self.body = ensure_blockstmt(body)
+        # Normalizamos a BlockStmt (acepta lista/nodo); None queda como
+        # prototipo: la función se define en otro lado (u otro archivo)
+        self.body = ensure_blockstmt(body) if body is not None else None
 
 class VarParm(Node):
     '''
     Function parameter: name: type
     '''
+    __slots__ = ('name', 'type')
+
     def __init__(self, name, type, lineno=0):
         super().__init__(lineno)
         self.name = name
-        self.type = type
+        self.type = _lookup_type(type)
 
 class ArrayParm(Node):
     '''
     Array parameter: name: array [size] type
     '''
+    __slots__ = ('name', 'element_type', 'dimensions', 'type')
+
     def __init__(self, name, element_type, dimensions, lineno=0):
         super().__init__(lineno)
         self.name = name
-        self.element_type = element_type
+        self.element_type = _lookup_type(element_type)
         self.dimensions = dimensions
-        # Construir el tipo completo
-        if isinstance(dimensions, list):
-            size_str = ''.join([f'[{d}]' if isinstance(d, int) else '[?]' for d in dimensions])
-        else:
-            size_str = f'[{dimensions}]'
-        self.type = f"array{size_str}{element_type}"
+        # Tipo completo (internado)
+        dims = dimensions if isinstance(dimensions, list) else [dimensions]
+        self.type = _array_type(self.element_type, dims)
 
 class ArrayType(Node):
     '''
     Array type: array [size] element_type
     '''
+    __slots__ = ('size', 'element_type', 'type')
+
     def __init__(self, size, element_type, lineno=0):
         super().__init__(lineno)
         self.size = size
-        self.element_type = element_type
-        self.type = f"array[{size}]{element_type}"
+        self.element_type = _lookup_type(element_type)
+        self.type = _array_type(self.element_type, [size])
 
 class FunctionType(Node):
     '''
     Function type: function return_type (param_types)
     '''
+    __slots__ = ('return_type', 'param_types', 'type')
+
     def __init__(self, return_type, param_types=None, lineno=0):
         super().__init__(lineno)
         self.return_type = return_type
         self.param_types = param_types or []
-        self.type = f"function_{return_type}"
+        self.type = _function_type(return_type, [getattr(p, 'type', p) for p in self.param_types])
 
 # Statements
 class ReturnStmt(Node):
     '''
     Return statement: return expr;
     '''
+    __slots__ = ('expr',)
+
     def __init__(self, expr=None, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -138,6 +189,8 @@ class ExprStmt(Node):
     '''
     Expression statement
     '''
+    __slots__ = ('expr',)
+
     def __init__(self, expr, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -146,6 +199,8 @@ class AssignStmt(Node):
     '''
     Assignment statement: location = expr;
     '''
+    __slots__ = ('location', 'expr')
+
     def __init__(self, location, expr, lineno=0):
         super().__init__(lineno)
         self.location = location
@@ -158,6 +213,8 @@ class IfStmt(Node):
     '''
     If statement: if (condition) then_stmt else else_stmt
     '''
+    __slots__ = ('condition', 'then_stmt', 'else_stmt')
+
     def __init__(self, condition, then_stmt, else_stmt=None, lineno=0):
         super().__init__(lineno)
         self.condition = condition
@@ -169,6 +226,8 @@ class WhileStmt(Node):
     '''
     While statement: while (condition) stmt
     '''
+    __slots__ = ('condition', 'stmt')
+
     def __init__(self, condition, stmt, lineno=0):
         super().__init__(lineno)
         self.condition = condition
@@ -179,6 +238,8 @@ class DoWhileStmt(Node):
     '''
     Do-While statement: do stmt while (condition);
     '''
+    __slots__ = ('stmt', 'condition')
+
     def __init__(self, stmt, condition, lineno=0):
         super().__init__(lineno)
         # Normalizamos cuerpo a BlockStmt
@@ -189,6 +250,8 @@ class ForStmt(Node):
     '''
     For statement: for (init; condition; update) stmt
     '''
+    __slots__ = ('init', 'condition', 'update', 'stmt')
+
     def __init__(self, init, condition, update, stmt, lineno=0):
         super().__init__(lineno)
         self.init = init
@@ -197,10 +260,31 @@ class ForStmt(Node):
         # Normalizamos cuerpo a BlockStmt
         self.stmt = ensure_blockstmt(stmt)
 
+class RangeFor(Node):
+    '''
+    Range loop: for name in range(start, stop) stmt
+
+    Cuenta de start a stop - 1 de a uno. stop se evalúa una sola vez,
+    antes de la primera iteración. 'var' es la declaración implícita de
+    la variable del loop (integer, visible solo dentro del loop).
+    '''
+    __slots__ = ('name', 'start', 'stop', 'stmt', 'var')
+
+    def __init__(self, name, start, stop, stmt, lineno=0):
+        super().__init__(lineno)
+        self.name = name
+        self.start = start
+        self.stop = stop
+        # Normalizamos cuerpo a BlockStmt
+        self.stmt = ensure_blockstmt(stmt)
+        self.var = VarDecl(name, 'integer', lineno=lineno)
+
 class BlockStmt(Node):
     '''
     Block statement: { statements }
     '''
+    __slots__ = ('statements',)
+
     def __init__(self, statements, lineno=0):
         super().__init__(lineno)
         self.statements = statements
@@ -225,6 +309,8 @@ class PrintStmt(Node):
     '''
     Print statement: print expr;
     '''
+    __slots__ = ('expr',)
+
     def __init__(self, expr, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -234,6 +320,8 @@ class BinOper(Node):
     '''
     Binary operation: left oper right
     '''
+    __slots__ = ('oper', 'left', 'right', 'type')
+
     def __init__(self, oper, left, right, lineno=0):
         super().__init__(lineno)
         self.oper = oper
@@ -245,6 +333,8 @@ class UnaryOper(Node):
     '''
     Unary operation: oper operand
     '''
+    __slots__ = ('oper', 'operand', 'type')
+
     def __init__(self, oper, operand, lineno=0):
         super().__init__(lineno)
         self.oper = oper
@@ -255,6 +345,8 @@ class PreInc(Node):
     '''
     Pre-increment: ++expr
     '''
+    __slots__ = ('expr', 'type')
+
     def __init__(self, expr, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -264,6 +356,8 @@ class PreDec(Node):
     '''
     Pre-decrement: --expr
     '''
+    __slots__ = ('expr', 'type')
+
     def __init__(self, expr, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -273,6 +367,8 @@ class PostInc(Node):
     '''
     Post-increment: expr++
     '''
+    __slots__ = ('expr', 'type')
+
     def __init__(self, expr, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -282,6 +378,8 @@ class PostDec(Node):
     '''
     Post-decrement: expr--
     '''
+    __slots__ = ('expr', 'type')
+
     def __init__(self, expr, lineno=0):
         super().__init__(lineno)
         self.expr = expr
@@ -291,6 +389,8 @@ class FuncCall(Node):
     '''
     Function call: name(args)
     '''
+    __slots__ = ('name', 'args', 'type')
+
     def __init__(self, name, args=None, lineno=0):
         super().__init__(lineno)
         self.name = name
@@ -301,6 +401,8 @@ class VarLoc(Node):
     '''
     Variable location/reference
     '''
+    __slots__ = ('name', 'type')
+
     def __init__(self, name, lineno=0):
         super().__init__(lineno)
         self.name = name
@@ -310,6 +412,8 @@ class ArrayLoc(Node):
     '''
     Array element access: array[index1][index2]...
     '''
+    __slots__ = ('name', 'indices', 'type')
+
     def __init__(self, name, indices, lineno=0):
         super().__init__(lineno)
         self.name = name
@@ -320,6 +424,8 @@ class ArrayLiteral(Node):
     '''
     Array literal: {expr1, expr2, ...}
     '''
+    __slots__ = ('elements', 'type')
+
     def __init__(self, elements, lineno=0):
         super().__init__(lineno)
         self.elements = elements
@@ -330,46 +436,56 @@ class IntegerLit(Node):
     '''
     Integer literal
     '''
+    __slots__ = ('value', 'type')
+
     def __init__(self, value, lineno=0):
         super().__init__(lineno)
         self.value = value
-        self.type = 'integer'
+        self.type = _integer
 
 class FloatLit(Node):
     '''
     Float literal
     '''
+    __slots__ = ('value', 'type')
+
     def __init__(self, value, lineno=0):
         super().__init__(lineno)
         self.value = value
-        self.type = 'float'
+        self.type = _float
 
 class StringLit(Node):
     '''
     String literal
     '''
+    __slots__ = ('value', 'type')
+
     def __init__(self, value, lineno=0):
         super().__init__(lineno)
         self.value = value
-        self.type = 'string'
+        self.type = _string
 
 class CharLit(Node):
     '''
     Character literal
     '''
+    __slots__ = ('value', 'type')
+
     def __init__(self, value, lineno=0):
         super().__init__(lineno)
         self.value = value
-        self.type = 'char'
+        self.type = _char
 
 class BooleanLit(Node):
     '''
     Boolean literal
     '''
+    __slots__ = ('value', 'type')
+
     def __init__(self, value, lineno=0):
         super().__init__(lineno)
         self.value = value
-        self.type = 'boolean'
+        self.type = _boolean
 
 # Aliases para compatibilidad con el parser
 Integer = IntegerLit
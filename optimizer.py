@@ -0,0 +1,168 @@
+# optimizer.py
+'''
+Pipeline de optimización LLVM (-O0..-O3)
+========================================
+Etapa posterior a IRGenerator.generate: parsea el módulo con
+llvmlite.binding y ejecuta una secuencia de pases según el nivel.
+Cada pase se corre por separado para poder medir su tiempo y el número
+de instrucciones que deja, de modo que se pueda comparar la latencia de
+compilación contra la velocidad de ejecución de cada carga.
+
+    from optimizer import optimize
+    llmod, report = optimize(module, level=2)
+    print(report)
+'''
+
+import time
+
+import llvmlite.binding as llvm
+
+from compiler import host_target_machine, parse_ir
+from tracing  import current_tracer
+
+# Nombre de pase -> función que lo agrega a un ModulePassManager
+_passes = {
+    'always-inline':  lambda pm: pm.add_always_inliner_pass(),
+    'sroa':           lambda pm: pm.add_sroa_pass(),
+    'instcombine':    lambda pm: pm.add_instruction_combine_pass(),
+    'reassociate':    lambda pm: pm.add_reassociate_pass(),
+    'gvn':            lambda pm: pm.add_new_gvn_pass(),
+    'sccp':           lambda pm: pm.add_sccp_pass(),
+    'dce':            lambda pm: pm.add_dead_code_elimination_pass(),
+    'adce':           lambda pm: pm.add_aggressive_dce_pass(),
+    'dse':            lambda pm: pm.add_dead_store_elimination_pass(),
+    'simplifycfg':    lambda pm: pm.add_simplify_cfg_pass(),
+    'jump-threading': lambda pm: pm.add_jump_threading_pass(),
+    'tailcallelim':   lambda pm: pm.add_tail_call_elimination_pass(),
+    'loop-simplify':  lambda pm: pm.add_loop_simplify_pass(),
+    'lcssa':          lambda pm: pm.add_lcssa_pass(),
+    'loop-rotate':    lambda pm: pm.add_loop_rotate_pass(),
+    'loop-deletion':  lambda pm: pm.add_loop_deletion_pass(),
+    'loop-unroll':    lambda pm: pm.add_loop_unroll_pass(),
+    'partial-inline': lambda pm: pm.add_partial_inliner_pass(),
+    'globaldce':      lambda pm: pm.add_global_dead_code_eliminate_pass(),
+}
+
+# 'default' no es un pase suelto: ejecuta el pipeline estándar de LLVM
+# para el nivel (inliner CGSCC, pases de loops y vectorización).
+DEFAULT_PIPELINE = 'default'
+
+# always-inline solo actúa sobre funciones marcadas (PGO, ver irgen.py).
+# sroa promueve las locales (alloca) a registros SSA.
+_O1 = ['always-inline', 'sroa', 'instcombine', 'simplifycfg', 'dce']
+
+# Los pases sueltos limpian el IR antes del pipeline estándar, que aporta
+# el inliner de funciones que llvmlite no expone como pase individual.
+_O2 = ['always-inline', 'sroa', 'instcombine', 'reassociate', 'gvn', 'sccp',
+       'simplifycfg', 'loop-simplify', 'lcssa', 'loop-rotate',
+       'loop-deletion', 'loop-unroll', 'instcombine', 'dse', 'adce',
+       'simplifycfg', DEFAULT_PIPELINE]
+
+_O3 = ['partial-inline'] + _O2 + ['globaldce']
+
+pipelines = {
+    0: [],
+    1: _O1,
+    2: _O2,
+    3: _O3,
+}
+
+# Con perfil (PGO), simplifycfg aplana los saltos muy sesgados en select
+# que conservan su !prof, y el back-end los vuelve a convertir en saltos
+# predichos. instcombine canoniza esos select a smin/smax y pierde el
+# peso, y el pipeline estándar alterna ambos pases. Por eso con perfil
+# -O2 no termina en el pipeline estándar y simplifycfg corre una sola
+# vez, después del último instcombine. Las funciones calientes ya llevan
+# alwaysinline, así que el inliner del pipeline estándar no hace falta.
+_O2_PGO = ['always-inline', 'sroa', 'instcombine', 'reassociate', 'gvn', 'sccp',
+           'loop-simplify', 'lcssa', 'loop-rotate', 'loop-deletion',
+           'loop-unroll', 'instcombine', 'dse', 'adce', 'simplifycfg']
+
+profile_pipelines = {
+    0: [],
+    1: _O1,
+    2: _O2_PGO,
+    3: ['partial-inline'] + _O2_PGO + ['globaldce'],
+}
+
+
+def count_instructions(llmod):
+    '''
+    Número total de instrucciones en las funciones definidas del módulo
+    '''
+    return sum(
+        len(list(block.instructions))
+        for func in llmod.functions if not func.is_declaration
+        for block in func.blocks
+    )
+
+
+class OptReport:
+    '''
+    Resultado de optimize(): tiempo por pase y número de instrucciones
+    antes y después de cada uno.
+    '''
+    def __init__(self, level, instrs_before):
+        self.level = level
+        self.instrs_before = instrs_before
+        self.instrs_after = instrs_before
+        self.passes = []        # lista de (nombre, segundos, instrucciones después)
+
+    def add(self, name, seconds, instrs):
+        self.passes.append((name, seconds, instrs))
+        self.instrs_after = instrs
+
+    @property
+    def total_time(self):
+        return sum(seconds for _, seconds, _ in self.passes)
+
+    def __str__(self):
+        lines = [f"-O{self.level}: {self.instrs_before} -> {self.instrs_after} instrucciones "
+                 f"en {self.total_time * 1000:.3f} ms"]
+        for name, seconds, instrs in self.passes:
+            lines.append(f"  {name:<16} {seconds * 1000:9.3f} ms  {instrs:6d} instr")
+        return '\n'.join(lines)
+
+
+def _run_pass(llmod, name, level, tm):
+    pto = llvm.create_pipeline_tuning_options(speed_level=level)
+    # Como clang a -O2/-O3: vectorizador de loops y SLP (llvmlite deja el
+    # SLP apagado). Con qué ancho vectorizan lo decide la CPU de 'tm'.
+    pto.loop_vectorization = level >= 2
+    pto.slp_vectorization = level >= 2
+    pb = llvm.create_pass_builder(tm, pto)
+    if name == DEFAULT_PIPELINE:
+        pm = pb.getModulePassManager()
+    elif name in _passes:
+        pm = llvm.create_new_module_pass_manager()
+        _passes[name](pm)
+    else:
+        raise Exception(f"Pase de optimización desconocido: {name}")
+    pm.run(llmod, pb)
+
+def optimize(module, level=2, passes=None, target_machine=None, profile_guided=False):
+    '''
+    Optimiza un módulo (ir.Module o llvm.ModuleRef) al nivel dado.
+    'passes' permite reemplazar la lista de pases del nivel; con
+    profile_guided=True se usa la de profile_pipelines.
+    Devuelve (llvm.ModuleRef, OptReport).
+    '''
+    if level not in pipelines:
+        raise Exception(f"Nivel de optimización no soportado: -O{level}")
+
+    tracer = current_tracer()
+    with tracer.span('optimize', 'opt', level=level):
+        tm = target_machine or host_target_machine(opt=level)
+        llmod = module if isinstance(module, llvm.ModuleRef) else parse_ir(module, tm)
+
+        report = OptReport(level, count_instructions(llmod))
+        if passes is None:
+            passes = (profile_pipelines if profile_guided else pipelines)[level]
+        for name in passes:
+            with tracer.span(name, 'opt'):
+                start = time.perf_counter()
+                _run_pass(llmod, name, level, tm)
+                report.add(name, time.perf_counter() - start, count_instructions(llmod))
+
+        llmod.verify()
+    return llmod, report
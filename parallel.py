@@ -0,0 +1,161 @@
+# parallel.py
+'''
+Back-end paralelo
+=================
+Divide el módulo producido por IRGenerator en un módulo por función,
+optimiza y emite cada partición como objeto nativo en un pool de
+procesos, y enlaza los objetos de vuelta en uno solo.
+
+Cada partición contiene:
+- la definición de su función;
+- declaraciones de las demás funciones (incluido printf);
+- las variables globales del programa: definidas en la primera
+  partición y declaradas 'external' en el resto (llvm.global_dtors, con
+  enlace 'appending', solo aparece en la primera);
+- copias 'internal' de las constantes de string/formato que usa.
+
+Las definiciones 'linkonce_odr' (el runtime de salida) se reparten con
+enlace 'weak_odr': en una partición propia nadie las referencia y con
+linkonce_odr GlobalDCE las borraría antes de emitir el objeto.
+
+Las particiones se generan y se recogen en el orden de definición de las
+funciones, así que el resultado es determinista sin importar el número
+de procesos.
+
+    from parallel import build_parallel
+    build_parallel(source, 'programa.o', opt_level=2, jobs=8)
+'''
+
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from llvmlite import ir
+
+
+def _definition(value):
+    '''
+    Texto de una definición para una partición, con linkonce_odr promovido
+    a weak_odr (sigue permitiendo una sola copia al enlazar, pero no se
+    descarta aunque la partición no la use)
+    '''
+    linkage = value.linkage
+    if linkage == 'linkonce_odr':
+        value.linkage = 'weak_odr'
+    try:
+        return str(value)
+    finally:
+        value.linkage = linkage
+
+
+def partition(module):
+    '''
+    Divide un ir.Module en particiones por función.
+    Devuelve una lista de (nombre, texto IR), en orden de definición.
+    '''
+    defined = [f for f in module.functions if not f.is_declaration]
+    variables = [g for g in module.global_values if isinstance(g, ir.GlobalVariable)]
+    constants = [g for g in variables if g.linkage == 'internal']
+    shared = [g for g in variables if g.linkage != 'internal']
+
+    parts = []
+    for i, func in enumerate(defined or [None]):
+        owns_globals = (i == 0)
+        decls = ir.Module(name=f"{module.name}.{func.name if func else 'globals'}")
+        decls.triple = module.triple
+        decls.data_layout = module.data_layout
+
+        # Declaraciones de las demás funciones
+        for other in module.functions:
+            if other is not func:
+                ir.Function(decls, other.ftype, name=other.name)
+
+        # Globales del programa: definición en la partición 0, 'external' en el resto
+        definitions = []
+        for g in shared:
+            if owns_globals:
+                definitions.append(_definition(g))
+            elif g.linkage != 'appending':
+                ext = ir.GlobalVariable(decls, g.value_type, name=g.name)
+                ext.global_constant = g.global_constant
+
+        body = _definition(func) if func is not None else ''
+
+        # Constantes internas que la función referencia
+        for g in constants:
+            if g.get_reference() in body:
+                definitions.append(str(g))
+
+        # Metadatos (!prof de branch_weights, ...) a los que puede referirse el cuerpo
+        metadata = [str(md) for md in module.metadata]
+
+        text = '\n'.join([str(decls)] + definitions + [body] + metadata)
+        parts.append((func.name if func else None, text))
+    return parts
+
+
+def emit_partition(text, opt_level=2):
+    '''
+    Optimiza y emite una partición (texto IR) como objeto nativo.
+    Corre en los procesos del pool.
+    '''
+    import llvmlite.binding as llvm
+    from compiler  import host_target_machine, init_llvm
+    from optimizer import optimize
+
+    init_llvm()
+    tm = host_target_machine(opt=opt_level, for_object=True)
+    llmod = llvm.parse_assembly(text)
+    llmod.triple = tm.triple
+    llmod.data_layout = str(tm.target_data)
+    llmod.verify()
+    if opt_level > 0:
+        llmod, _ = optimize(llmod, opt_level, target_machine=tm)
+    return tm.emit_object(llmod)
+
+def _emit_task(args):
+    return emit_partition(*args)
+
+
+def compile_parallel(module, opt_level=2, jobs=None):
+    '''
+    Particiona 'module' y emite un objeto por función en un pool de
+    'jobs' procesos (por defecto, uno por núcleo). Devuelve la lista de
+    objetos (bytes) en orden de definición.
+    '''
+    parts = partition(module)
+    tasks = [(text, opt_level) for _, text in parts]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) == 1:
+        return [_emit_task(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return list(pool.map(_emit_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+
+
+def link_objects(objects, output, linker='ld'):
+    '''
+    Enlaza los objetos en un único objeto reubicable ('ld -r').
+    '''
+    with tempfile.TemporaryDirectory(prefix='bminor-') as tmp:
+        paths = []
+        for i, data in enumerate(objects):
+            path = os.path.join(tmp, f"part{i:05d}.o")
+            with open(path, 'wb') as f:
+                f.write(data)
+            paths.append(path)
+        result = subprocess.run([linker, '-r', '-o', output] + paths,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"Error al enlazar objetos: {result.stderr.strip()}")
+    return output
+
+
+def build_parallel(source, output, opt_level=2, jobs=None):
+    '''
+    Compila 'source' con el back-end paralelo y deja el objeto en 'output'.
+    '''
+    from compiler import compile_source
+
+    _, module = compile_source(source)
+    return link_objects(compile_parallel(module, opt_level, jobs), output)
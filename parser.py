@@ -5,11 +5,15 @@ Implementa un analizador sintáctico usando SLY (Sly Lex Yacc)
 CORREGIDO: Soporta funciones sin parámetros y literales float
 """
 
+import mmap
 import sys
+import threading
 from sly import Lexer, Parser
 from model import *
-from errors import error, errors_detected
+from errors import errors_detected, current_diagnostics
 from model import ArrayDecl, IntegerLit
+from parsetables import CachedTablesMeta
+from tracing import current_tracer
 
 # =====================================================================
 # LEXER
@@ -107,8 +111,9 @@ class BMinorLexer(Lexer):
         t.value = int(t.value)
         return t
     
-    CHAR = r"'([^'\\]|\\.)'"
-    STRING = r'"([^"\\]|\\.)*"'
+    # Los literales no cruzan líneas (un salto se escribe \n): ver tokenize_stream
+    CHAR = r"'([^'\\\n]|\\.)'"
+    STRING = r'"([^"\\\n]|\\.)*"'
     
     @_(r'[a-zA-Z_][a-zA-Z0-9_]*')
     def ID(self, t):
@@ -148,15 +153,18 @@ class BMinorLexer(Lexer):
         t.value = string_value
         return t
     
+    # Diagnostics de la compilación en curso (None: el actual del contexto)
+    diag = None
+
     def error(self, t):
-        error(f"Carácter ilegal '{t.value[0]}'", t.lineno)
+        (self.diag or current_diagnostics()).error(f"Carácter ilegal '{t.value[0]}'", t.lineno)
         self.index += 1
 
 # =====================================================================
 # PARSER
 # =====================================================================
 
-class BMinorParser(Parser):
+class BMinorParser(Parser, metaclass=CachedTablesMeta):
     tokens = BMinorLexer.tokens
     
     # Precedencia de operadores
@@ -172,8 +180,29 @@ class BMinorParser(Parser):
         ('left', 'LPAREN', 'LBRACKET'),
     )
     
-    def __init__(self):
-        self.lexer = BMinorLexer()
+    def __init__(self, lexer=None, diag=None):
+        # Lexer propio, reutilizado en cada parse_source()
+        self.lexer = lexer or BMinorLexer()
+        self.diag = diag
+
+    def reset(self, diag=None):
+        '''
+        Deja el parser listo para un nuevo fuente, reportando a 'diag'
+        (None: el Diagnostics actual). SLY conserva entre llamadas a
+        parse() los mapas de posiciones (crecen sin límite).
+        '''
+        self.diag = self.lexer.diag = diag
+        self._line_positions = {}
+        self._index_positions = {}
+        self.statestack = []
+        self.symstack = []
+
+    def parse_source(self, source, diag=None):
+        '''
+        Tokeniza y parsea 'source' reutilizando este parser y su lexer
+        '''
+        self.reset(diag)
+        return self.parse(self.lexer.tokenize(source))
     
     # =====================================================================
     # Programa principal
@@ -183,9 +212,12 @@ class BMinorParser(Parser):
     def program(self, p):
         return Program(p.declarations)
     
+    # Las listas se acumulan con append en sitio (O(1) amortizado); con
+    # 'lista + [x]' cada reducción copiaba la lista y el parsing era O(N²)
     @_('declarations declaration')
     def declarations(self, p):
-        return p.declarations + [p.declaration]
+        p.declarations.append(p.declaration)
+        return p.declarations
     
     @_('declaration')
     def declarations(self, p):
@@ -227,6 +259,11 @@ class BMinorParser(Parser):
     @_('ID COLON FUNCTION type LPAREN param_list RPAREN ASSIGN LBRACE stmt_list RBRACE')
     def func_decl(self, p):
         return FuncDecl(p.ID, p.type, p.param_list, BlockStmt(p.stmt_list))
+
+    @_('ID COLON FUNCTION type LPAREN param_list RPAREN SEMICOLON')
+    def func_decl(self, p):
+        # Prototipo: declara la firma, el cuerpo está en otro lado
+        return FuncDecl(p.ID, p.type, p.param_list, None)
     
     # =====================================================================
     # Tipos
@@ -251,7 +288,8 @@ class BMinorParser(Parser):
     # (si solo quieres 1D, con la primera regla basta)
     @_('dimlist COMMA expr')
     def dimlist(self, p):
-        return p.dimlist + [p.expr]
+        p.dimlist.append(p.expr)
+        return p.dimlist
 
     @_('expr')
     def dimlist(self, p):
@@ -264,7 +302,8 @@ class BMinorParser(Parser):
     
     @_('param_list COMMA param')
     def param_list(self, p):
-        return p.param_list + [p.param]
+        p.param_list.append(p.param)
+        return p.param_list
     
     @_('param')
     def param_list(self, p):
@@ -288,7 +327,8 @@ class BMinorParser(Parser):
     
     @_('stmt_list stmt')
     def stmt_list(self, p):
-        return p.stmt_list + [p.stmt]
+        p.stmt_list.append(p.stmt)
+        return p.stmt_list
     
     @_('stmt')
     def stmt_list(self, p):
@@ -335,29 +375,11 @@ class BMinorParser(Parser):
     def for_stmt(self, p):
         return ForStmt(p.stmt0, p.expr, p.stmt1, p.stmt2)
     
-    # azúcar: for i in range(a, b) { ... }
+    # for i in range(a, b) { ... }: nodo propio (loop contado, ver irgen)
     @_('FOR ID IN RANGE LPAREN expr COMMA expr RPAREN LBRACE stmt_list RBRACE')
     def for_stmt(self, p):
-        # Declarar i como entero e inicializar con a
-        init_decl = VarDecl(p.ID, 'integer', p.expr0)
-
-        # while (i < b) { body; i = i + 1; }
-        cond = BinOper('<', VarLoc(p.ID), p.expr1)
+        return RangeFor(p.ID, p.expr0, p.expr1, p.stmt_list)
 
-        step = Assignment(
-            VarLoc(p.ID),
-            BinOper('+', VarLoc(p.ID), IntegerLit(1))
-        )
-
-        # el cuerpo: lo que vino entre llaves + el step al final
-        body_stmts = p.stmt_list + [step]
-
-        loop = WhileStmt(cond, body_stmts)
-
-        # envolver todo en un bloque para el scope de i
-        return BlockStmt([init_decl, loop])
-
-    
     
     @_('RETURN expr SEMICOLON')
     def return_stmt(self, p):
@@ -492,7 +514,8 @@ class BMinorParser(Parser):
     
     @_('expr_list COMMA expr')
     def expr_list(self, p):
-        return p.expr_list + [p.expr]
+        p.expr_list.append(p.expr)
+        return p.expr_list
     
     @_('expr')
     def expr_list(self, p):
@@ -503,40 +526,124 @@ class BMinorParser(Parser):
     # =====================================================================
     
     def error(self, p):
+        diag = self.diag or current_diagnostics()
         if p:
-            error(f"Error de sintaxis en '{p.value}'", p.lineno)
+            diag.error(f"Error de sintaxis en '{p.value}'", p.lineno)
         else:
-            error("Error de sintaxis: final inesperado de entrada")
+            diag.error("Error de sintaxis: final inesperado de entrada")
 
 # =====================================================================
 # Función principal
 # =====================================================================
 
-def parse_file(filename):
+# Tamaño (aprox.) de cada ventana de texto en el modo streaming
+STREAM_CHUNK = 1 << 20
+
+def tokenize_stream(lexer, buf, chunk_size=STREAM_CHUNK):
+    """
+    Tokeniza perezosamente un buffer de bytes UTF-8 (p. ej. un mmap).
+    El buffer se decodifica por ventanas de ~chunk_size cortadas en saltos
+    de línea, así que en memoria solo vive una ventana de texto y los
+    tokens que el parser todavía no consumió. Ningún token del lexer cruza
+    una línea (las expresiones de los comentarios /* */ y de los literales
+    excluyen el salto de línea, también en el modo normal), por lo que
+    cortar ahí no cambia el resultado. Los índices de los
+    tokens son offsets dentro de la ventana más el inicio de la misma.
+    """
+    size = len(buf)
+    pos = 0
+    base = 0
+    lineno = 1
+    while pos < size:
+        end = min(pos + chunk_size, size)
+        if end < size:
+            nl = buf.rfind(b'\n', pos, end)
+            if nl == -1:
+                # Línea más larga que la ventana: extender hasta su final
+                nl = buf.find(b'\n', end)
+            end = size if nl == -1 else nl + 1
+
+        text = buf[pos:end].decode('utf-8')
+        for tok in lexer.tokenize(text, lineno):
+            tok.index += base
+            tok.end += base
+            yield tok
+        lineno = lexer.lineno
+        base += len(text)
+        pos = end
+
+def parse_stream(filename, parser=None, diag=None):
+    """
+    Parse a BMinor file by memory-mapping it and tokenizing it lazily.
+    Peak memory tracks the AST instead of source size plus tokens.
+    """
+    parser = parser or _thread_parser()
+    with open(filename, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return _parse_with(parser, '', diag)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            parser.reset(diag)
+            # Los mapas de posiciones de SLY guardan una entrada por cada
+            # valor reducido (nadie los consulta); aquí no se registran.
+            parser.track_positions = False
+            try:
+                return parser.parse(tokenize_stream(parser.lexer, buf))
+            except Exception as e:
+                (diag or current_diagnostics()).error(f"Error de parsing: {e}")
+                return None
+            finally:
+                del parser.track_positions
+
+def parse_file(filename, stream=False, diag=None):
     """Parse a BMinor file and return the AST"""
     try:
+        if stream:
+            return parse_stream(filename, diag=diag)
         with open(filename, 'r', encoding='utf-8') as f:
             source = f.read()
-        return parse_string(source)
+        return parse_string(source, diag)
     except FileNotFoundError:
-        error(f"Archivo no encontrado: {filename}")
+        (diag or current_diagnostics()).error(f"Archivo no encontrado: {filename}")
         return None
     except Exception as e:
-        error(f"Error al leer archivo: {e}")
+        (diag or current_diagnostics()).error(f"Error al leer archivo: {e}")
         return None
 
-def parse_string(source):
-    """Parse a BMinor source string and return the AST"""
-    lexer = BMinorLexer()
-    parser = BMinorParser()
-    
+# Un parser reutilizable por hilo (los objetos de SLY no son reentrantes)
+_thread_state = threading.local()
+
+def _thread_parser():
+    parser = getattr(_thread_state, 'parser', None)
+    if parser is None:
+        parser = _thread_state.parser = BMinorParser()
+    return parser
+
+def _parse_with(parser, source, diag=None):
     try:
-        ast = parser.parse(lexer.tokenize(source))
-        return ast
+        return parser.parse_source(source, diag)
     except Exception as e:
-        error(f"Error de parsing: {e}")
+        (diag or current_diagnostics()).error(f"Error de parsing: {e}")
         return None
 
+def parse_string(source, diag=None):
+    """Parse a BMinor source string and return the AST"""
+    with current_tracer().span('parse_string', 'parse', bytes=len(source)):
+        return _parse_with(_thread_parser(), source, diag)
+
+def parse_many(sources, diag=None):
+    """
+    Parse many BMinor sources with a single reusable parser/lexer.
+    Returns a list of ASTs, with None for the sources that reported errors.
+    """
+    diag = diag or current_diagnostics()
+    parser = BMinorParser()
+    results = []
+    for source in sources:
+        before = diag.error_count()
+        ast = _parse_with(parser, source, diag)
+        results.append(ast if diag.error_count() == before else None)
+    return results
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Uso: python parser.py <archivo.bminor>")
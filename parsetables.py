@@ -0,0 +1,133 @@
+# parsetables.py
+'''
+Tablas LALR precalculadas para BMinorParser
+===========================================
+SLY construye las tablas LALR cada vez que se define la clase del parser,
+es decir, en cada import de parser.py. Para invocaciones cortas del CLI
+esa construcción domina el tiempo total.
+
+CachedTablesMeta envuelve la construcción de SLY: la gramática se sigue
+armando a partir de las reglas decoradas (es barato), pero las tablas
+(acciones, gotos y estados por defecto) se cargan de un artefacto pickle
+versionado. El artefacto guarda una firma de la gramática (reglas,
+precedencia, tokens y versión de SLY); si no coincide, las tablas se
+regeneran y el artefacto se reescribe de forma atómica.
+
+La variable de entorno BMINOR_PARSETAB=0 desactiva la caché.
+'''
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import sly
+import sly.yacc
+from sly.yacc import ParserMeta
+
+# Cambiar si cambia el formato del artefacto
+PARSETAB_VERSION = 1
+
+PARSETAB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bminor_parsetab.pickle')
+
+
+def grammar_signature(attributes):
+    '''
+    Hash de todo lo que determina las tablas LALR de una clase Parser
+    '''
+    h = hashlib.sha256(f"{PARSETAB_VERSION}:{sly.__version__}".encode())
+    h.update(repr(sorted(attributes.get('tokens', ()))).encode())
+    h.update(repr(attributes.get('precedence', ())).encode())
+    h.update(repr(attributes.get('start', None)).encode())
+    for name, value in attributes.items():
+        # Cada nombre puede tener varias funciones encadenadas por next_func
+        func = value
+        while callable(func) and hasattr(func, 'rules'):
+            h.update(f"{name}:{func.rules!r}\n".encode())
+            func = getattr(func, 'next_func', None)
+    return h.hexdigest()
+
+
+class LoadedLRTable:
+    '''
+    Sustituto de sly.yacc.LRTable con solo lo que usa Parser.parse()
+    '''
+    def __init__(self, data):
+        self.lr_action = data['lr_action']
+        self.lr_goto = data['lr_goto']
+        self.defaulted_states = data['defaulted_states']
+        self.sr_conflicts = data['sr_conflicts']
+        self.rr_conflicts = data['rr_conflicts']
+
+
+def load_tables(signature, path=PARSETAB_FILE):
+    '''
+    Devuelve las tablas guardadas o None si faltan o están desactualizadas.
+    '''
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != PARSETAB_VERSION \
+            or data.get('signature') != signature:
+        return None
+    return data
+
+def save_tables(signature, lrtable, path=PARSETAB_FILE):
+    '''
+    Guarda las tablas de un LRTable recién construido (escritura atómica).
+    Si el directorio no es escribible, simplemente no se guarda.
+    '''
+    data = {
+        'version': PARSETAB_VERSION,
+        'signature': signature,
+        'lr_action': lrtable.lr_action,
+        'lr_goto': lrtable.lr_goto,
+        'defaulted_states': lrtable.defaulted_states,
+        'sr_conflicts': list(lrtable.sr_conflicts),
+        'rr_conflicts': list(lrtable.rr_conflicts),
+    }
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.parsetab-')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def enabled():
+    return os.environ.get('BMINOR_PARSETAB', '1') != '0'
+
+
+class CachedTablesMeta(ParserMeta):
+    '''
+    Metaclase de Parser que carga/guarda las tablas LALR en PARSETAB_FILE.
+    '''
+    def __new__(meta, clsname, bases, attributes):
+        if not enabled():
+            return super().__new__(meta, clsname, bases, attributes)
+
+        signature = grammar_signature(attributes)
+        data = load_tables(signature)
+        real_lrtable = sly.yacc.LRTable
+        built = []
+
+        def lrtable_factory(grammar):
+            if data is not None:
+                return LoadedLRTable(data)
+            table = real_lrtable(grammar)
+            built.append(table)
+            return table
+
+        # SLY construye las tablas con sly.yacc.LRTable durante __new__
+        sly.yacc.LRTable = lrtable_factory
+        try:
+            cls = super().__new__(meta, clsname, bases, attributes)
+        finally:
+            sly.yacc.LRTable = real_lrtable
+
+        if built:
+            save_tables(signature, built[0])
+        return cls
@@ -0,0 +1,240 @@
+# profiling.py
+'''
+Perfiles de ejecución de programas B-Minor
+==========================================
+Con IRGenerator.generate(..., instrument=True) el código generado cuenta
+cuántas veces pasa por cada "sitio":
+
+    function     entrada de la función
+    while        cabecera de un while (evaluaciones de la condición)
+    while.body   entradas al cuerpo del while
+    for          cabecera de un for
+    for.body     entradas al cuerpo del for
+    range        evaluaciones de la condición de un for-in-range
+                 (guarda + latch; entradas = range - range.body)
+    range.body   iteraciones de un for-in-range
+    if.then      arista "verdadera" de un if
+    if.else      arista "falsa" de un if (tenga o no else)
+    and, or      evaluaciones de un && / ||
+    and.rhs,     evaluaciones del operando derecho (no cortocircuitadas)
+    or.rhs
+
+Los contadores viven en el arreglo global __bminor_counters ([N x i64]).
+Cada sitio se identifica por (función, construcción, ordinal): el
+ordinal numera desde 1 las construcciones del mismo tipo dentro de la
+función, en orden de aparición en el fuente.
+
+Hay dos formas de obtener el perfil:
+
+- Ejecutables (AOT): un destructor global escribe los contadores al
+  terminar el programa en $BMINOR_PROFILE (por defecto bminor.profile).
+- JIT: el host lee el arreglo directamente de la memoria del motor.
+
+      from jit import jit_compile
+      from profiling import read_profile
+      program = jit_compile(source, instrument=True)
+      program.run()
+      print(read_profile(program).report())
+
+El perfil se usa para recompilar el mismo fuente (PGO):
+
+      program = jit_compile(source, profile=profile)
+      compile_source(source, profile=Profile.load('bminor.profile'))
+
+IRGenerator pone branch_weights en los saltos de if/while/for/range/&&/||,
+alwaysinline en las funciones calientes y cold/minsize en las que no se
+ejecutaron (ver Profile.hot_functions/cold_functions).
+
+El archivo es texto, una línea por sitio ('#' inicia comentario):
+
+    <cuenta>\\t<función>\\t<construcción>\\t<ordinal>
+
+    python profiling.py programa.bminor [-o salida.profile]
+    python profiling.py --show bminor.profile
+'''
+
+import ctypes
+import hashlib
+
+COUNTERS_NAME = '__bminor_counters'
+DEFAULT_PROFILE = 'bminor.profile'
+PROFILE_HEADER = '# bminor profile v1'
+
+
+class ProfileSite:
+    '''
+    Un contador del código instrumentado
+    '''
+    __slots__ = ('function', 'kind', 'ordinal')
+
+    def __init__(self, function, kind, ordinal):
+        self.function = function
+        self.kind = kind
+        self.ordinal = ordinal
+
+    @property
+    def key(self):
+        return (self.function, self.kind, self.ordinal)
+
+    def __str__(self):
+        if self.kind == 'function':
+            return self.function
+        return f"{self.function}: {self.kind} #{self.ordinal}"
+
+    def __repr__(self):
+        return f"ProfileSite({self.function!r}, {self.kind!r}, {self.ordinal})"
+
+
+class Profile:
+    '''
+    Cuentas de ejecución por sitio
+    '''
+    def __init__(self, sites, counts):
+        if len(sites) != len(counts):
+            raise Exception(f"Perfil inválido: {len(sites)} sitios y {len(counts)} contadores")
+        self.sites = list(sites)
+        self.counts = {site.key: count for site, count in zip(self.sites, counts)}
+
+    def count(self, function, kind='function', ordinal=1):
+        '''
+        Cuenta de un sitio (0 si el perfil no lo tiene)
+        '''
+        return self.counts.get((function, kind, ordinal), 0)
+
+    def function_counts(self):
+        '''
+        {función: llamadas}
+        '''
+        return {s.function: self.counts[s.key] for s in self.sites if s.kind == 'function'}
+
+    def hot_functions(self, fraction=0.05, min_calls=1000):
+        '''
+        Funciones con al menos 'min_calls' llamadas y al menos 'fraction'
+        de las llamadas de la más llamada
+        '''
+        calls = self.function_counts()
+        threshold = max(min_calls, fraction * max(calls.values(), default=0))
+        return {name for name, count in calls.items() if count >= threshold}
+
+    def cold_functions(self):
+        '''
+        Funciones que nunca se ejecutaron
+        '''
+        return {name for name, count in self.function_counts().items() if count == 0}
+
+    def digest(self):
+        '''
+        Hash del contenido (para las claves de caché)
+        '''
+        data = '\n'.join(f"{c}\t{f}\t{k}\t{o}" for (f, k, o), c in sorted(self.counts.items()))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def merge(self, other):
+        '''
+        Suma las cuentas de otro perfil (p.ej. de otra ejecución)
+        '''
+        for site in other.sites:
+            if site.key not in self.counts:
+                self.sites.append(site)
+                self.counts[site.key] = 0
+            self.counts[site.key] += other.counts[site.key]
+        return self
+
+    def hottest(self, limit=None):
+        '''
+        Sitios ordenados de más a menos ejecutado
+        '''
+        ranked = sorted(self.sites, key=lambda s: self.counts[s.key], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def report(self, limit=20):
+        lines = [f"{'cuenta':>14}  sitio"]
+        for site in self.hottest(limit):
+            lines.append(f"{self.counts[site.key]:>14}  {site}")
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
+
+    # -----------------------------------------------------------------
+    # Archivo
+    # -----------------------------------------------------------------
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(PROFILE_HEADER + '\n')
+            for site in self.sites:
+                f.write(f"{self.counts[site.key]}\t{site.function}\t{site.kind}\t{site.ordinal}\n")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        sites, counts = [], []
+        with open(path) as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                fields = line.split('\t')
+                if len(fields) != 4:
+                    raise Exception(f"{path}:{lineno}: línea de perfil inválida")
+                count, function, kind, ordinal = fields
+                sites.append(ProfileSite(function, kind, int(ordinal)))
+                counts.append(int(count))
+        return cls(sites, counts)
+
+
+def branch_weights(taken, not_taken):
+    '''
+    Pesos de !prof branch_weights (enteros de 32 bits): las cuentas + 1,
+    escaladas si no caben
+    '''
+    scale = max(taken, not_taken) // 0xFFFF0000 + 1
+    return [taken // scale + 1, not_taken // scale + 1]
+
+
+# ---------------------------------------------------------------------
+# JIT
+# ---------------------------------------------------------------------
+
+def _counter_array(program):
+    if not program.sites:
+        raise Exception("El programa no fue compilado con instrument=True")
+    addr = program.engine.get_global_value_address(COUNTERS_NAME)
+    return (ctypes.c_int64 * len(program.sites)).from_address(addr)
+
+def read_profile(program):
+    '''
+    Perfil actual de un JITProgram instrumentado. Los contadores se
+    acumulan entre llamadas (ver reset_counters).
+    '''
+    return Profile(program.sites, list(_counter_array(program)))
+
+def reset_counters(program):
+    ctypes.memset(_counter_array(program), 0, 8 * len(program.sites))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Perfil de ejecución de un programa B-Minor")
+    ap.add_argument('source', nargs='?', help="programa B-Minor (se ejecuta main() en el JIT)")
+    ap.add_argument('-o', '--output', help="archivo de perfil de salida")
+    ap.add_argument('--show', help="mostrar un archivo de perfil existente")
+    ap.add_argument('--limit', type=int, default=20, help="sitios a mostrar")
+    args = ap.parse_args()
+
+    if args.show:
+        profile = Profile.load(args.show)
+    elif args.source:
+        from jit import jit_compile
+        with open(args.source, encoding='utf-8') as f:
+            program = jit_compile(f.read(), instrument=True)
+        program.run()
+        profile = read_profile(program)
+    else:
+        ap.error("falta el programa o --show")
+
+    print(profile.report(args.limit))
+    if args.output:
+        print(f"perfil: {profile.save(args.output)}")
@@ -8,10 +8,12 @@ define i32 @"main"()
 {
 entry:
   %"a" = alloca i32
-  store i32 10, i32* %"a"
   %"b" = alloca i32
-  store i32 3, i32* %"b"
   %"c" = alloca i32
+  br label %"body"
+body:
+  store i32 10, i32* %"a"
+  store i32 3, i32* %"b"
   %"a.1" = load i32, i32* %"a"
   %"b.1" = load i32, i32* %"b"
   %"multmp" = mul i32 %"a.1", %"b.1"
@@ -8,10 +8,12 @@ define i32 @"main"()
 {
 entry:
   %"x" = alloca i32
-  store i32 7, i32* %"x"
   %"y" = alloca i32
-  store i32 10, i32* %"y"
   %"r" = alloca i32
+  br label %"body"
+body:
+  store i32 7, i32* %"x"
+  store i32 10, i32* %"y"
   store i32 0, i32* %"r"
   %"x.1" = load i32, i32* %"x"
   %"y.1" = load i32, i32* %"y"
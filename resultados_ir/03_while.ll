@@ -8,10 +8,12 @@ define i32 @"main"()
 {
 entry:
   %"n" = alloca i32
-  store i32 8, i32* %"n"
   %"i" = alloca i32
-  store i32 1, i32* %"i"
   %"acc" = alloca i32
+  br label %"body"
+body:
+  store i32 8, i32* %"n"
+  store i32 1, i32* %"i"
   store i32 0, i32* %"acc"
   br label %"while.cond"
 while.cond:
@@ -8,6 +8,8 @@ define i32 @"inc"(i32 %"x")
 {
 entry:
   %"x.1" = alloca i32
+  br label %"body"
+body:
   store i32 %"x", i32* %"x.1"
   %"x.2" = load i32, i32* %"x.1"
   %"addtmp" = add i32 %"x.2", 1
@@ -18,6 +20,8 @@ define i32 @"main"()
 {
 entry:
   %"t" = alloca i32
+  br label %"body"
+body:
   store i32 10, i32* %"t"
   %"t.1" = load i32, i32* %"t"
   %"inc.call" = call i32 @"inc"(i32 %"t.1")
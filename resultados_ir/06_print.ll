@@ -7,35 +7,178 @@ target datalayout = ""
 define i32 @"main"()
 {
 entry:
-  %".2" = getelementptr inbounds [11 x i8], [11 x i8]* @"strlit_0", i32 0, i32 0
-  %".3" = getelementptr inbounds [4 x i8], [4 x i8]* @"fmt_str_1", i32 0, i32 0
-  %".4" = call i32 (i8*, ...) @"printf"(i8* %".3", i8* %".2")
   %"c" = alloca i8
+  %"x" = alloca i32
+  %"t" = alloca i1
+  br label %"body"
+body:
+  %".2" = getelementptr inbounds [11 x i8], [11 x i8]* @"strlit_0", i32 0, i32 0
+  call void @"__bminor_out_str"(i8* %".2")
   store i8 90, i8* %"c"
   %"c.1" = load i8, i8* %"c"
-  %".6" = getelementptr inbounds [4 x i8], [4 x i8]* @"fmt_char_2", i32 0, i32 0
-  %".7" = zext i8 %"c.1" to i32
-  %".8" = call i32 (i8*, ...) @"printf"(i8* %".6", i32 %".7")
-  %"x" = alloca i32
+  call void @"__bminor_out_char"(i8 %"c.1")
   store i32 42, i32* %"x"
   %"x.1" = load i32, i32* %"x"
-  %".10" = getelementptr inbounds [4 x i8], [4 x i8]* @"fmt_int_3", i32 0, i32 0
-  %".11" = call i32 (i8*, ...) @"printf"(i8* %".10", i32 %"x.1")
-  %"t" = alloca i1
+  call void @"__bminor_out_int"(i32 %"x.1")
   %"x.2" = load i32, i32* %"x"
   %"cmptmp" = icmp sgt i32 %"x.2", 0
   store i1 %"cmptmp", i1* %"t"
   %"t.1" = load i1, i1* %"t"
-  %".13" = getelementptr inbounds [4 x i8], [4 x i8]* @"fmt_bool_4", i32 0, i32 0
-  %".14" = zext i1 %"t.1" to i32
-  %".15" = call i32 (i8*, ...) @"printf"(i8* %".13", i32 %".14")
+  %".9" = zext i1 %"t.1" to i32
+  call void @"__bminor_out_int"(i32 %".9")
   ret i32 0
 }
 
-declare i32 @"printf"(i8* %".1", ...)
-
 @"strlit_0" = internal constant [11 x i8] [i8 66, i8 45, i8 77, i8 105, i8 110, i8 111, i8 114, i8 32, i8 79, i8 75, i8 0]
-@"fmt_str_1" = internal constant [4 x i8] [i8 37, i8 115, i8 10, i8 0]
-@"fmt_char_2" = internal constant [4 x i8] [i8 37, i8 99, i8 10, i8 0]
-@"fmt_int_3" = internal constant [4 x i8] [i8 37, i8 100, i8 10, i8 0]
-@"fmt_bool_4" = internal constant [4 x i8] [i8 37, i8 100, i8 10, i8 0]
+declare i64 @"strlen"(i8* %".1")
+
+declare void @"llvm.memcpy.p0i8.p0i8.i64"(i8* %".1", i8* %".2", i64 %".3", i1 %".4")
+
+@"__bminor_out_buf" = linkonce_odr global [65536 x i8] zeroinitializer
+@"__bminor_out_len" = linkonce_odr global i64 0
+define linkonce_odr void @"__bminor_out_str"(i8* %".1")
+{
+entry:
+  %".3" = call i64 @"strlen"(i8* %".1")
+  %".4" = load i64, i64* @"__bminor_out_len"
+  %".5" = add i64 %".3", 1
+  %".6" = add i64 %".4", %".5"
+  %".7" = icmp ule i64 %".6", 65536
+  br i1 %".7", label %"copy", label %"slow"
+slow:
+  call void @"__bminor_out_flush"()
+  %".10" = icmp uge i64 %".3", 65536
+  br i1 %".10", label %"direct", label %"copy"
+direct:
+  call void @"__bminor_write_all"(i8* %".1", i64 %".3")
+  br label %"newline"
+copy:
+  %".14" = load i64, i64* @"__bminor_out_len"
+  %".15" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".14"
+  call void @"llvm.memcpy.p0i8.p0i8.i64"(i8* %".15", i8* %".1", i64 %".3", i1 0)
+  %".17" = add i64 %".14", %".3"
+  store i64 %".17", i64* @"__bminor_out_len"
+  br label %"newline"
+newline:
+  %".20" = load i64, i64* @"__bminor_out_len"
+  %".21" = add i64 %".20", 1
+  %".22" = icmp ugt i64 %".21", 65536
+  br i1 %".22", label %"newline.if", label %"newline.endif"
+newline.if:
+  call void @"__bminor_out_flush"()
+  br label %"newline.endif"
+newline.endif:
+  %".26" = load i64, i64* @"__bminor_out_len"
+  %".27" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".26"
+  store i8 10, i8* %".27"
+  %".29" = add i64 %".26", 1
+  store i64 %".29", i64* @"__bminor_out_len"
+  ret void
+}
+
+define linkonce_odr void @"__bminor_out_flush"()
+{
+entry:
+  %".2" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i32 0
+  %".3" = load i64, i64* @"__bminor_out_len"
+  call void @"__bminor_write_all"(i8* %".2", i64 %".3")
+  store i64 0, i64* @"__bminor_out_len"
+  ret void
+}
+
+declare i64 @"write"(i32 %".1", i8* %".2", i64 %".3")
+
+define linkonce_odr void @"__bminor_write_all"(i8* %".1", i64 %".2")
+{
+entry:
+  %".4" = icmp ugt i64 %".2", 0
+  br i1 %".4", label %"loop", label %"done"
+loop:
+  %".6" = phi  i64 [0, %"entry"], [%".12", %"advance"]
+  %".7" = getelementptr inbounds i8, i8* %".1", i64 %".6"
+  %".8" = sub i64 %".2", %".6"
+  %".9" = call i64 @"write"(i32 1, i8* %".7", i64 %".8")
+  %".10" = icmp sgt i64 %".9", 0
+  br i1 %".10", label %"advance", label %"done"
+advance:
+  %".12" = add i64 %".6", %".9"
+  %".13" = icmp ult i64 %".12", %".2"
+  br i1 %".13", label %"loop", label %"done"
+done:
+  ret void
+}
+
+define linkonce_odr void @"__bminor_out_char"(i8 %".1")
+{
+entry:
+  %".3" = load i64, i64* @"__bminor_out_len"
+  %".4" = add i64 %".3", 2
+  %".5" = icmp ugt i64 %".4", 65536
+  br i1 %".5", label %"entry.if", label %"entry.endif"
+entry.if:
+  call void @"__bminor_out_flush"()
+  br label %"entry.endif"
+entry.endif:
+  %".9" = load i64, i64* @"__bminor_out_len"
+  %".10" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".9"
+  store i8 %".1", i8* %".10"
+  %".12" = add i64 %".9", 1
+  %".13" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".12"
+  store i8 10, i8* %".13"
+  %".15" = add i64 %".9", 2
+  store i64 %".15", i64* @"__bminor_out_len"
+  ret void
+}
+
+define linkonce_odr void @"__bminor_out_int"(i32 %".1")
+{
+entry:
+  %"digits.1" = alloca [12 x i8]
+  %".3" = sext i32 %".1" to i64
+  %".4" = icmp slt i64 %".3", 0
+  %".5" = sub i64 0, %".3"
+  %".6" = select  i1 %".4", i64 %".5", i64 %".3"
+  br label %"digits"
+digits:
+  %".8" = phi  i64 [12, %"entry"], [%".10", %"digits"]
+  %".9" = phi  i64 [%".6", %"entry"], [%".16", %"digits"]
+  %".10" = sub i64 %".8", 1
+  %".11" = urem i64 %".9", 10
+  %".12" = trunc i64 %".11" to i8
+  %".13" = add i8 %".12", 48
+  %".14" = getelementptr inbounds [12 x i8], [12 x i8]* %"digits.1", i32 0, i64 %".10"
+  store i8 %".13", i8* %".14"
+  %".16" = udiv i64 %".9", 10
+  %".17" = icmp ne i64 %".16", 0
+  br i1 %".17", label %"digits", label %"emit"
+emit:
+  %".19" = load i64, i64* @"__bminor_out_len"
+  %".20" = add i64 %".19", 13
+  %".21" = icmp ugt i64 %".20", 65536
+  br i1 %".21", label %"emit.if", label %"emit.endif"
+emit.if:
+  call void @"__bminor_out_flush"()
+  br label %"emit.endif"
+emit.endif:
+  %".25" = load i64, i64* @"__bminor_out_len"
+  br i1 %".4", label %"emit.endif.if", label %"emit.endif.endif"
+emit.endif.if:
+  %".27" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".25"
+  store i8 45, i8* %".27"
+  br label %"emit.endif.endif"
+emit.endif.endif:
+  %".30" = zext i1 %".4" to i64
+  %".31" = add i64 %".25", %".30"
+  %".32" = sub i64 12, %".10"
+  %".33" = getelementptr inbounds [12 x i8], [12 x i8]* %"digits.1", i32 0, i64 %".10"
+  %".34" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".31"
+  call void @"llvm.memcpy.p0i8.p0i8.i64"(i8* %".34", i8* %".33", i64 %".32", i1 0)
+  %".36" = add i64 %".31", %".32"
+  %".37" = getelementptr inbounds [65536 x i8], [65536 x i8]* @"__bminor_out_buf", i32 0, i64 %".36"
+  store i8 10, i8* %".37"
+  %".39" = add i64 %".36", 1
+  store i64 %".39", i64* @"__bminor_out_len"
+  ret void
+}
+
+@"llvm.global_dtors" = appending global [1 x {i32, void ()*, i8*}] [{i32, void ()*, i8*} {i32 65535, void ()* @"__bminor_out_flush", i8* null}]
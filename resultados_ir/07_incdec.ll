@@ -8,23 +8,25 @@ define i32 @"main"()
 {
 entry:
   %"i" = alloca i32
-  store i32 2, i32* %"i"
   %"a" = alloca i32
+  %"b" = alloca i32
+  %"c" = alloca i32
+  %"d" = alloca i32
+  br label %"body"
+body:
+  store i32 2, i32* %"i"
   %"i.ld" = load i32, i32* %"i"
   %"i.inc" = add i32 %"i.ld", 1
   store i32 %"i.inc", i32* %"i"
   store i32 %"i.inc", i32* %"a"
-  %"b" = alloca i32
   %"i.ld.1" = load i32, i32* %"i"
   %"i.inc.1" = add i32 %"i.ld.1", 1
   store i32 %"i.inc.1", i32* %"i"
   store i32 %"i.ld.1", i32* %"b"
-  %"c" = alloca i32
   %"i.ld.2" = load i32, i32* %"i"
   %"i.dec" = sub i32 %"i.ld.2", 1
   store i32 %"i.dec", i32* %"i"
   store i32 %"i.dec", i32* %"c"
-  %"d" = alloca i32
   %"i.ld.3" = load i32, i32* %"i"
   %"i.dec.1" = sub i32 %"i.ld.3", 1
   store i32 %"i.dec.1", i32* %"i"
@@ -9,8 +9,10 @@ define i32 @"main"()
 entry:
   %"a" = alloca [5 x i32]
   %"i" = alloca i32
-  store i32 0, i32* %"i"
   %"sum" = alloca i32
+  br label %"body"
+body:
+  store i32 0, i32* %"i"
   store i32 0, i32* %"sum"
   %".4" = getelementptr inbounds [5 x i32], [5 x i32]* %"a", i32 0, i32 0
   store i32 5, i32* %".4"
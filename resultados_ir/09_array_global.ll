@@ -7,6 +7,11 @@ target datalayout = ""
 define i32 @"main"()
 {
 entry:
+  %"i" = alloca i32
+  %"x" = alloca i32
+  %"y" = alloca i32
+  br label %"body"
+body:
   %".2" = getelementptr inbounds [4 x i32], [4 x i32]* @"a", i32 0, i32 0
   store i32 2, i32* %".2"
   %".4" = getelementptr inbounds [4 x i32], [4 x i32]* @"a", i32 0, i32 1
@@ -15,14 +20,11 @@ entry:
   store i32 6, i32* %".6"
   %".8" = getelementptr inbounds [4 x i32], [4 x i32]* @"a", i32 0, i32 3
   store i32 8, i32* %".8"
-  %"i" = alloca i32
   store i32 2, i32* %"i"
-  %"x" = alloca i32
   %"i.1" = load i32, i32* %"i"
   %".11" = getelementptr inbounds [4 x i32], [4 x i32]* @"a", i32 0, i32 %"i.1"
   %"a.elem" = load i32, i32* %".11"
   store i32 %"a.elem", i32* %"x"
-  %"y" = alloca i32
   %"i.2" = load i32, i32* %"i"
   %"subtmp" = sub i32 %"i.2", 1
   %".13" = getelementptr inbounds [4 x i32], [4 x i32]* @"a", i32 0, i32 %"subtmp"
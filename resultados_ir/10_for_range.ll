@@ -1,4 +1,4 @@
-; for in range desazucarado
+; for in range
 
 ; ModuleID = "bminor_program"
 target triple = "unknown-unknown-unknown"
@@ -8,25 +8,30 @@ define i32 @"main"()
 {
 entry:
   %"sum" = alloca i32
-  store i32 0, i32* %"sum"
   %"i" = alloca i32
+  br label %"body"
+body:
+  store i32 0, i32* %"sum"
   store i32 1, i32* %"i"
-  br label %"while.cond"
-while.cond:
-  %"i.1" = load i32, i32* %"i"
-  %"cmptmp" = icmp slt i32 %"i.1", 6
-  br i1 %"cmptmp", label %"while.body", label %"while.end"
-while.body:
+  %"range.enter" = icmp slt i32 1, 6
+  br i1 %"range.enter", label %"range.body", label %"range.end"
+range.body:
   %"sum.1" = load i32, i32* %"sum"
-  %"i.2" = load i32, i32* %"i"
-  %"addtmp" = add i32 %"sum.1", %"i.2"
+  %"i.1" = load i32, i32* %"i"
+  %"addtmp" = add i32 %"sum.1", %"i.1"
   store i32 %"addtmp", i32* %"sum"
-  %"i.3" = load i32, i32* %"i"
-  %"addtmp.1" = add i32 %"i.3", 1
-  store i32 %"addtmp.1", i32* %"i"
-  br label %"while.cond"
-while.end:
+  br label %"range.latch"
+range.latch:
+  %"i.2" = load i32, i32* %"i"
+  %"range.next" = add nsw i32 %"i.2", 1
+  store i32 %"range.next", i32* %"i"
+  %"range.cond" = icmp slt i32 %"range.next", 6
+  br i1 %"range.cond", label %"range.body", label %"range.end", !prof !0, !llvm.loop !2
+range.end:
   %"sum.2" = load i32, i32* %"sum"
   ret i32 %"sum.2"
 }
 
+!0 = !{ !"branch_weights", i32 4, i32 1 }
+!1 = !{ !"llvm.loop.mustprogress" }
+!2 = distinct !{ !2, !1 }
@@ -8,10 +8,12 @@ define i32 @"main"()
 {
 entry:
   %"a" = alloca double
-  store double 0x4000000000000000, double* %"a"
   %"b" = alloca double
-  store double 0x4008000000000000, double* %"b"
   %"r" = alloca i32
+  br label %"body"
+body:
+  store double 0x4000000000000000, double* %"a"
+  store double 0x4008000000000000, double* %"b"
   store i32 0, i32* %"r"
   %"a.1" = load double, double* %"a"
   %"b.1" = load double, double* %"b"
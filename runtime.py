@@ -0,0 +1,275 @@
+# runtime.py
+'''
+Runtime de salida con buffer
+============================
+print no llama a printf: IRGenerator lo baja a un escritor especializado
+por tipo que copia el texto a un buffer global de 64 KiB y solo hace la
+llamada al sistema write(1, ...) cuando el buffer se llena o al terminar
+el programa. Así la salida no paga el formateo variádico de printf ni
+el lock de stdout en cada línea.
+
+    __bminor_out_int(i32)       entero en decimal + '\\n' (boolean: 0/1)
+    __bminor_out_float(double)  snprintf("%g\\n") directo al buffer
+    __bminor_out_char(i8)       carácter + '\\n'
+    __bminor_out_str(i8*)       cadena + '\\n' (memcpy; si no cabe en el
+                                buffer se escribe directamente)
+    __bminor_out_flush()        vacía el buffer
+    __bminor_write_all(i8*, i64) write(1, ...) repetido hasta escribir todo
+
+El runtime se emite como IR dentro del módulo que lo usa (solo los
+escritores necesarios) con enlace linkonce_odr: al enlazar varios
+módulos (build.py, parallel.py) queda una sola copia del buffer y de
+cada función (parallel.py las reparte como weak_odr, ver partition).
+
+El vaciado final lo hace un destructor global (llvm.global_dtors) en los
+ejecutables; el JIT no corre destructores, así que JITProgram.run vacía
+el buffer después de cada llamada. Si el programa aborta, lo que quede
+en el buffer se pierde.
+'''
+
+from llvmlite import ir
+
+BUFFER_SIZE = 1 << 16
+FLUSH_NAME = '__bminor_out_flush'
+
+_i8 = ir.IntType(8)
+_i32 = ir.IntType(32)
+_i64 = ir.IntType(64)
+_i8p = _i8.as_pointer()
+
+
+def _c32(value):
+    return ir.Constant(_i32, value)
+
+def _c64(value):
+    return ir.Constant(_i64, value)
+
+
+class OutputRuntime:
+    '''
+    Emite (bajo demanda) el buffer de salida y sus escritores en un ir.Module
+    '''
+    def __init__(self, module):
+        self.module = module
+        self._buf = None        # [BUFFER_SIZE x i8]
+        self._len = None        # i64: bytes ocupados
+        self._funcs = {}
+
+    @property
+    def used(self):
+        return bool(self._funcs)
+
+    def writer(self, kind):
+        '''
+        Escritor para 'int', 'float', 'char' o 'str'
+        '''
+        func = self._funcs.get(kind)
+        if func is None:
+            emit = getattr(self, f"_emit_{kind}", None)
+            if emit is None:
+                raise Exception(f"print: no hay escritor para '{kind}'")
+            func = self._funcs[kind] = emit()
+        return func
+
+    def flush(self):
+        func = self._funcs.get('flush')
+        if func is None:
+            func = self._funcs['flush'] = self._emit_flush()
+        return func
+
+    def write_all(self):
+        func = self._funcs.get('write_all')
+        if func is None:
+            func = self._funcs['write_all'] = self._emit_write_all()
+        return func
+
+    # -----------------------------------------------------------------
+    # Utilidades
+    # -----------------------------------------------------------------
+
+    def _globals(self):
+        if self._buf is None:
+            arr_ty = ir.ArrayType(_i8, BUFFER_SIZE)
+            self._buf = ir.GlobalVariable(self.module, arr_ty, name="__bminor_out_buf")
+            self._buf.linkage = 'linkonce_odr'
+            self._buf.initializer = ir.Constant(arr_ty, None)
+            self._len = ir.GlobalVariable(self.module, _i64, name="__bminor_out_len")
+            self._len.linkage = 'linkonce_odr'
+            self._len.initializer = _c64(0)
+
+    def _declare(self, name, ret, params, var_arg=False):
+        func = self.module.globals.get(name)
+        if func is None:
+            func = ir.Function(self.module, ir.FunctionType(ret, params, var_arg=var_arg), name=name)
+        return func
+
+    def _define(self, name, params):
+        self._globals()
+        func = ir.Function(self.module, ir.FunctionType(ir.VoidType(), params), name=name)
+        func.linkage = 'linkonce_odr'
+        return func, ir.IRBuilder(func.append_basic_block("entry"))
+
+    def _at(self, builder, index):
+        return builder.gep(self._buf, [_c32(0), index], inbounds=True)
+
+    def _reserve(self, builder, nbytes):
+        '''
+        Asegura 'nbytes' libres en el buffer (vaciándolo si hace falta) y
+        devuelve la longitud actual
+        '''
+        length = builder.load(self._len)
+        full = builder.icmp_unsigned('>', builder.add(length, _c64(nbytes)), _c64(BUFFER_SIZE))
+        with builder.if_then(full):
+            builder.call(self.flush(), [])
+        return builder.load(self._len)
+
+    def _newline(self, builder):
+        length = self._reserve(builder, 1)
+        builder.store(ir.Constant(_i8, ord('\n')), self._at(builder, length))
+        builder.store(builder.add(length, _c64(1)), self._len)
+
+    # -----------------------------------------------------------------
+    # Funciones del runtime
+    # -----------------------------------------------------------------
+
+    def _emit_write_all(self):
+        write = self._declare('write', _i64, [_i32, _i8p, _i64])
+        func, b = self._define("__bminor_write_all", [_i8p, _i64])
+        loop = func.append_basic_block("loop")
+        advance = func.append_basic_block("advance")
+        done = func.append_basic_block("done")
+
+        entry = b.block
+        data, length = func.args
+        b.cbranch(b.icmp_unsigned('>', length, _c64(0)), loop, done)
+
+        # write() puede escribir menos de lo pedido: se repite hasta el final
+        b.position_at_end(loop)
+        offset = b.phi(_i64)
+        offset.add_incoming(_c64(0), entry)
+        written = b.call(write, [_c32(1), b.gep(data, [offset], inbounds=True), b.sub(length, offset)])
+        b.cbranch(b.icmp_signed('>', written, _c64(0)), advance, done)
+
+        b.position_at_end(advance)
+        next_offset = b.add(offset, written)
+        offset.add_incoming(next_offset, advance)
+        b.cbranch(b.icmp_unsigned('<', next_offset, length), loop, done)
+
+        b.position_at_end(done)
+        b.ret_void()
+        return func
+
+    def _emit_flush(self):
+        func, b = self._define(FLUSH_NAME, [])
+        b.call(self.write_all(), [self._at(b, _c32(0)), b.load(self._len)])
+        b.store(_c64(0), self._len)
+        b.ret_void()
+        return func
+
+    def _emit_char(self):
+        func, b = self._define("__bminor_out_char", [_i8])
+        length = self._reserve(b, 2)
+        b.store(func.args[0], self._at(b, length))
+        b.store(ir.Constant(_i8, ord('\n')), self._at(b, b.add(length, _c64(1))))
+        b.store(b.add(length, _c64(2)), self._len)
+        b.ret_void()
+        return func
+
+    def _emit_int(self):
+        '''
+        Dígitos de atrás hacia adelante en un temporal y copia al buffer
+        (el valor absoluto se calcula en i64 para que INT_MIN funcione)
+        '''
+        memcpy = self.module.declare_intrinsic('llvm.memcpy', [_i8p, _i8p, _i64])
+        func, b = self._define("__bminor_out_int", [_i32])
+        loop = func.append_basic_block("digits")
+        emit = func.append_basic_block("emit")
+
+        tmp_ty = ir.ArrayType(_i8, 12)
+        tmp = b.alloca(tmp_ty, name="digits")
+        value = b.sext(func.args[0], _i64)
+        negative = b.icmp_signed('<', value, _c64(0))
+        magnitude = b.select(negative, b.sub(_c64(0), value), value)
+        entry = b.block
+        b.branch(loop)
+
+        b.position_at_end(loop)
+        pos = b.phi(_i64)
+        rest = b.phi(_i64)
+        pos.add_incoming(_c64(12), entry)
+        rest.add_incoming(magnitude, entry)
+        new_pos = b.sub(pos, _c64(1))
+        digit = b.add(b.trunc(b.urem(rest, _c64(10)), _i8), ir.Constant(_i8, ord('0')))
+        b.store(digit, b.gep(tmp, [_c32(0), new_pos], inbounds=True))
+        new_rest = b.udiv(rest, _c64(10))
+        pos.add_incoming(new_pos, loop)
+        rest.add_incoming(new_rest, loop)
+        b.cbranch(b.icmp_unsigned('!=', new_rest, _c64(0)), loop, emit)
+
+        b.position_at_end(emit)
+        length = self._reserve(b, 13)
+        with b.if_then(negative):
+            b.store(ir.Constant(_i8, ord('-')), self._at(b, length))
+        start = b.add(length, b.zext(negative, _i64))
+        count = b.sub(_c64(12), new_pos)
+        src = b.gep(tmp, [_c32(0), new_pos], inbounds=True)
+        b.call(memcpy, [self._at(b, start), src, count, ir.Constant(ir.IntType(1), 0)])
+        end = b.add(start, count)
+        b.store(ir.Constant(_i8, ord('\n')), self._at(b, end))
+        b.store(b.add(end, _c64(1)), self._len)
+        b.ret_void()
+        return func
+
+    def _emit_float(self):
+        snprintf = self._declare('snprintf', _i32, [_i8p, _i64, _i8p], var_arg=True)
+        data = bytearray(b"%g\n\x00")
+        fmt_ty = ir.ArrayType(_i8, len(data))
+        fmt = ir.GlobalVariable(self.module, fmt_ty, name="__bminor_out_fmt_float")
+        fmt.linkage = 'internal'
+        fmt.global_constant = True
+        fmt.initializer = ir.Constant(fmt_ty, data)
+
+        # "%g\n" ocupa a lo sumo 14 bytes (-1.79769e+308\n)
+        func, b = self._define("__bminor_out_float", [ir.DoubleType()])
+        length = self._reserve(b, 32)
+        fmt_ptr = b.gep(fmt, [_c32(0), _c32(0)], inbounds=True)
+        written = b.call(snprintf, [self._at(b, length), _c64(32), fmt_ptr, func.args[0]])
+        b.store(b.add(length, b.sext(written, _i64)), self._len)
+        b.ret_void()
+        return func
+
+    def _emit_str(self):
+        strlen = self._declare('strlen', _i64, [_i8p])
+        memcpy = self.module.declare_intrinsic('llvm.memcpy', [_i8p, _i8p, _i64])
+        func, b = self._define("__bminor_out_str", [_i8p])
+        slow = func.append_basic_block("slow")
+        direct = func.append_basic_block("direct")
+        copy = func.append_basic_block("copy")
+        newline = func.append_basic_block("newline")
+
+        text = func.args[0]
+        size = b.call(strlen, [text])
+        length = b.load(self._len)
+        fits = b.icmp_unsigned('<=', b.add(length, b.add(size, _c64(1))), _c64(BUFFER_SIZE))
+        b.cbranch(fits, copy, slow)
+
+        # No cabe: vaciar; si tampoco cabe en un buffer vacío, write directo
+        b.position_at_end(slow)
+        b.call(self.flush(), [])
+        too_big = b.icmp_unsigned('>=', size, _c64(BUFFER_SIZE))
+        b.cbranch(too_big, direct, copy)
+
+        b.position_at_end(direct)
+        b.call(self.write_all(), [text, size])
+        b.branch(newline)
+
+        b.position_at_end(copy)
+        length = b.load(self._len)
+        b.call(memcpy, [self._at(b, length), text, size, ir.Constant(ir.IntType(1), 0)])
+        b.store(b.add(length, size), self._len)
+        b.branch(newline)
+
+        b.position_at_end(newline)
+        self._newline(b)
+        b.ret_void()
+        return func
@@ -0,0 +1,106 @@
+# target.py
+'''
+Selección de la máquina destino
+===============================
+Triple, CPU y features con los que se configuran el módulo (triple y
+data layout), la TargetMachine de los pases de optimización y el
+back-end. Por defecto es el host con todas sus features (AVX2/AVX-512
+si las tiene), así que el vectorizador de loops y el SLP pueden usar
+vectores anchos; una CPU explícita da código portable:
+
+    from target import Target
+    Target()                                  # host
+    Target('x86-64')                          # baseline SSE2
+    Target('x86-64', '+avx2,+fma')            # baseline + features
+
+BMINOR_CPU / BMINOR_FEATURES cambian el destino por defecto.
+
+No importa el front-end (parser): la caché lo usa para sus claves sin
+pagar la carga del compilador.
+'''
+
+import os
+
+import llvmlite.binding as llvm
+
+
+_llvm_ready = False
+
+def init_llvm():
+    '''
+    Inicializa el target nativo una sola vez por proceso.
+    '''
+    global _llvm_ready
+    if not _llvm_ready:
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+        _llvm_ready = True
+
+
+class Target:
+    '''
+    Máquina destino: triple, CPU y features de LLVM (p.ej. '+avx2,-avx512f').
+    Target() es el host con la CPU y las features detectadas; una CPU
+    explícita ('x86-64', 'skylake', 'generic', ...) usa solo las features
+    que se den.
+    '''
+    def __init__(self, cpu=None, features=None, triple=None):
+        init_llvm()
+        self.triple = triple or llvm.get_process_triple()
+        if cpu in (None, 'host'):
+            cpu = llvm.get_host_cpu_name()
+            if features is None:
+                features = llvm.get_host_cpu_features().flatten()
+        self.cpu = cpu
+        self.features = features or ''
+        self._data_layout = None
+
+    def target_machine(self, opt=2, for_object=False):
+        '''
+        TargetMachine para este destino. Con for_object=True se configura
+        para emitir objetos enlazables (PIC, code model por defecto) en vez
+        de para el JIT.
+        '''
+        target = llvm.Target.from_triple(self.triple)
+        if for_object:
+            return target.create_target_machine(cpu=self.cpu, features=self.features, opt=opt,
+                                                reloc='pic', codemodel='default')
+        return target.create_target_machine(cpu=self.cpu, features=self.features, opt=opt)
+
+    @property
+    def data_layout(self):
+        if self._data_layout is None:
+            self._data_layout = str(self.target_machine().target_data)
+        return self._data_layout
+
+    def apply(self, module):
+        '''
+        Fija triple y data layout en un ir.Module (o llvm.ModuleRef)
+        '''
+        module.triple = self.triple
+        module.data_layout = self.data_layout
+        return module
+
+    @property
+    def key(self):
+        '''
+        Identifica el destino en claves de caché
+        '''
+        return f"{self.triple}/{self.cpu}/{self.features}"
+
+    def __str__(self):
+        return f"{self.triple} (cpu {self.cpu})"
+
+
+_default_target = None
+
+def default_target():
+    '''
+    Destino por defecto: el host, o la CPU/features de las variables de
+    entorno BMINOR_CPU y BMINOR_FEATURES (p.ej. BMINOR_CPU=x86-64 para
+    objetos portables).
+    '''
+    global _default_target
+    if _default_target is None:
+        _default_target = Target(os.environ.get('BMINOR_CPU'), os.environ.get('BMINOR_FEATURES'))
+    return _default_target
@@ -2,7 +2,7 @@
 Script de prueba del generador de IR usando el parser real
 Cobertura de generación: aritmética, comparaciones, if/else, while,
 short-circuit, llamadas a función, print, arreglos 1D, ++/-- pre/post,
-for i in range (desazucarado), strings y floats (sin print).
+for i in range (RangeFor), strings y floats (sin print).
 '''
 
 from parser import parse_string
@@ -224,7 +224,7 @@ main: function integer () = {
 '''
     return test_code("Arreglo global 1D: loads con índice expresión", code)
 
-def test10_for_in_range_desugar():
+def test10_for_in_range():
     code = '''
 main: function integer () = {
     sum: integer = 0;
@@ -234,7 +234,7 @@ main: function integer () = {
     return sum;
 }
 '''
-    return test_code("for i in range(a,b) desazucarado a while", code)
+    return test_code("for i in range(a,b) como loop contado", code)
 
 def test11_comparisons_combo():
     code = '''
@@ -268,6 +268,357 @@ main: function integer () = {
 '''
     return test_code("Float: operaciones y comparación (sin print)", code)
 
+def test13_decl_inside_loops():
+    code = '''
+main: function integer () = {
+    total: integer = 0;
+    for i in range(0, 4) {
+        t: integer = i * 2;
+        buf: array [4] integer;
+        buf[i] = t;
+        total = total + buf[i];
+    }
+    return total;
+}
+'''
+    return test_code("Declaraciones dentro de ciclos (alloca en entry)", code)
+
+def test14_prototype_then_definition():
+    code = '''
+twice: function integer (x: integer);
+main: function integer () = {
+    r: integer = twice(21);
+    return r;
+}
+twice: function integer (x: integer) = {
+    return x + x;
+}
+'''
+    return test_code("Prototipo seguido de la definición", code)
+
+def test15_instrumented_counters():
+    code = '''
+main: function integer () = {
+    s: integer = 0;
+    i: integer = 0;
+    while (i < 10) {
+        if (i % 2 == 0) {
+            s = s + i;
+        }
+        i = i + 1;
+    }
+    return s;
+}
+'''
+    from jit import jit_compile
+    from profiling import read_profile
+    print("=" * 70)
+    print("PRUEBA: Contadores de ejecución (instrument=True)")
+    print("=" * 70)
+    program = jit_compile(code, opt_level=0, instrument=True)
+    result = program.run()
+    profile = read_profile(program)
+    print(profile.report())
+    return (result == 20 and profile.count('main') == 1
+            and profile.count('main', 'while') == 11
+            and profile.count('main', 'if.then') == 5
+            and profile.count('main', 'if.else') == 5)
+
+def test16_profile_guided():
+    code = '''
+inc: function integer (x: integer) = {
+    return x + 1;
+}
+never: function integer (x: integer) = {
+    return x - 1;
+}
+main: function integer () = {
+    s: integer = 0;
+    for k in range(0, 2000) {
+        if (k < 0 && s > 10) {
+            s = never(s);
+        } else {
+            s = inc(s);
+        }
+    }
+    return s;
+}
+'''
+    from jit import jit_compile
+    from profiling import read_profile
+    from compiler import compile_source
+    print("=" * 70)
+    print("PRUEBA: Compilación guiada por perfil")
+    print("=" * 70)
+    training = jit_compile(code, opt_level=0, instrument=True)
+    training.run()
+    profile = read_profile(training)
+    _, module = compile_source(code, profile=profile)
+    ir_text = str(module)
+    print(ir_text)
+    return (jit_compile(code, profile=profile).run() == 2000
+            and 'branch_weights' in ir_text
+            and 'alwaysinline' in str(module.get_global('inc'))
+            and 'cold' in str(module.get_global('never')))
+
+def test17_aot_object():
+    code = '''
+main: function integer () = {
+    print "aot";
+    return 0;
+}
+'''
+    import llvmlite.binding as llvm
+    from compiler import compile_source
+    from aot import optimized_module, emit_object
+    print("=" * 70)
+    print("PRUEBA: Objeto nativo AOT con el target del host")
+    print("=" * 70)
+    _, module = compile_source(code)
+    llmod = optimized_module(module, 2)
+    obj = emit_object(compile_source(code)[1], 2)
+    print(f"triple: {llmod.triple}   objeto: {len(obj)} bytes")
+    return llmod.triple == llvm.get_process_triple() and llmod.data_layout != '' and len(obj) > 0
+
+def test18_range_bound_once():
+    code = '''
+calls: integer = 0;
+bound: function integer (n: integer) = {
+    calls = calls + 1;
+    return n;
+}
+main: function integer () = {
+    s: integer = 0;
+    for i in range(0, bound(10)) {
+        s = s + i;      // 0+1+...+9 = 45
+    }
+    return s * 100 + calls;
+}
+'''
+    from jit import jit_compile
+    print("=" * 70)
+    print("PRUEBA: range evalúa su límite una sola vez")
+    print("=" * 70)
+    return all(jit_compile(code, opt_level=opt).run() == 4501 for opt in (0, 2))
+
+def test19_operands_once():
+    code = '''
+calls: integer = 0;
+mark: function boolean (b: boolean) = {
+    calls = calls + 1;
+    return b;
+}
+main: function integer () = {
+    r: integer = 0;
+    if (mark(true) && mark(true)) {
+        r = r + 1;
+    }
+    if (mark(false) || mark(true)) {
+        r = r + 1;
+    }
+    if (mark(true) == mark(true)) {
+        r = r + 1;
+    }
+    if (mark(true) != mark(false)) {
+        r = r + 1;
+    }
+    return r * 100 + calls;     // 4 condiciones ciertas, 8 llamadas
+}
+'''
+    from jit import jit_compile
+    print("=" * 70)
+    print("PRUEBA: &&, || y ==/!= booleanos evalúan cada operando una vez")
+    print("=" * 70)
+    return all(jit_compile(code, opt_level=opt).run() == 408 for opt in (0, 2))
+
+def test20_tiered_interpreter():
+    code = '''
+total: integer;
+step: function integer (x: integer) = {
+    total = total + x;
+    return total % 1000;
+}
+main: function integer () = {
+    r: integer = 0;
+    for i in range(0, 500) {
+        r = (r + step(i)) % 100003;
+    }
+    return r + total;
+}
+'''
+    from jit import jit_compile
+    from interp import Interpreter
+    print("=" * 70)
+    print("PRUEBA: Intérprete con promoción al JIT")
+    print("=" * 70)
+    expected = jit_compile(code, opt_level=0).run()
+    interpreted = Interpreter(code, jit=False)
+    tiered = Interpreter(code, call_threshold=100, background=False)
+    results = (interpreted.run(), tiered.run())
+    print(tiered.report())
+
+    # Un ciclo caliente de main (que no se vuelve a llamar) termina en nativo
+    loop_code = '''
+main: function integer () = {
+    acc: integer = 0;
+    x: float = 1.0;
+    for i in range(0, 20000) {
+        d: integer = i % 7;
+        acc = (acc + d * i) % 100003;
+        x = x * 1.0001;
+    }
+    k: integer = 0;
+    while (k < 20000) {
+        k = k + 1;
+        if (k == 15001) {
+            if (x > 2.0) {
+                return acc + k;
+            }
+            return acc;
+        }
+    }
+    return 0 - 1;
+}
+'''
+    looping = Interpreter(loop_code, loop_threshold=1000, background=False)
+    loop_results = (jit_compile(loop_code, opt_level=0).run(), Interpreter(loop_code, jit=False).run(),
+                    looping.run())
+    print(looping.report())
+    main = looping.functions['main']
+
+    # NaN: != ordenado como fcmp one y el mismo signo que fdiv en el hardware
+    nan_code = '''
+main: function integer () = {
+    x: float = 0.0;
+    y: float = x / x;
+    print y;
+    print 1.0 / x;
+    if (y != y) {
+        return 1;
+    }
+    return 0;
+}
+'''
+    import os, subprocess, sys, tempfile
+    from aot import compile_executable
+    with tempfile.TemporaryDirectory(prefix='bminor-test-') as tmp:
+        path = os.path.join(tmp, 'nan.bminor')
+        with open(path, 'w') as f:
+            f.write(nan_code)
+        native = subprocess.run([compile_executable(nan_code, os.path.join(tmp, 'nan'), opt_level=0)],
+                                capture_output=True, text=True)
+        interp = subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'interp.py'),
+                                 '--no-jit', path],
+                                capture_output=True, text=True)
+    print(native.stdout, interp.stdout)
+    return (results == (expected, expected) and tiered.tier('step') == 'jit'
+            and len(set(loop_results)) == 1 and main.loops[0] < 20000
+            and all(loop.entered == 1 for loop in main.entries)
+            and native.returncode == interp.returncode == jit_compile(nan_code, opt_level=0).run() == 0
+            and native.stdout == interp.stdout)
+
+def test21_parallel_print():
+    code = '''
+twice: function integer (n: integer) = {
+    return n * 2;
+}
+main: function integer () = {
+    x: float = 1.5;
+    print twice(21);
+    print x;
+    print "paralelo";
+    return 0;
+}
+'''
+    import os, subprocess, tempfile
+    from parallel import build_parallel
+    from aot import link_executable
+    print("=" * 70)
+    print("PRUEBA: Back-end paralelo a -O2 con print, enlazado y ejecutado")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory(prefix='bminor-test-') as tmp:
+        obj = build_parallel(code, os.path.join(tmp, 'prog.o'), opt_level=2, jobs=1)
+        exe = link_executable([obj], os.path.join(tmp, 'prog'))
+        out = subprocess.run([exe], capture_output=True, text=True).stdout
+    print(out)
+    return out == "42\n1.5\nparalelo\n"
+
+def test22_profile_guided_o2():
+    from bench_pgo import kernel
+    from jit import jit_compile
+    from profiling import read_profile
+    from compiler import compile_source
+    from optimizer import optimize
+    print("=" * 70)
+    print("PRUEBA: -O2 con perfil conserva los select con peso (como -O1)")
+    print("=" * 70)
+    training = jit_compile(kernel(2000), opt_level=0, instrument=True)
+    training.run()
+    profile = read_profile(training)
+    _, module = compile_source(kernel(2000), profile=profile)
+    mains = {}
+    for level in (1, 2):
+        llmod, _ = optimize(module, level, profile_guided=module.profile_guided)
+        mains[level] = str(llmod.get_function('main'))
+    print(mains[2])
+    # clamp, en línea en main, queda como select con !prof; smin/smax perderían el peso
+    return all('select' in text and '!prof' in text and 'llvm.smax' not in text
+               for text in mains.values())
+
+def test23_stream_windows():
+    # El primer literal tiene un salto de línea dentro: es un error en los dos modos
+    code = 'main: function integer () = {\n    print "ab\ncd";\n    print "x\\ny";\n    c: char = \'\\n\';\n    return 0;\n}\n'
+    from parser import BMinorLexer, tokenize_stream
+    from errors import Diagnostics
+    print("=" * 70)
+    print("PRUEBA: streaming cortando la ventana en cada línea")
+    print("=" * 70)
+
+    def lex(tokens):
+        lexer = BMinorLexer()
+        lexer.diag = Diagnostics()
+        found = [(t.type, t.value, t.index) for t in tokens(lexer)]
+        return found, [d.message for d in lexer.diag.errors]
+
+    expected = lex(lambda lexer: lexer.tokenize(code))
+    print(expected)
+    # Con ventanas de 1 a len(code) bytes los cortes caen en todos los saltos
+    return all(lex(lambda lexer: tokenize_stream(lexer, code.encode(), size)) == expected
+               for size in range(1, len(code) + 1)) and len(expected[1]) == 2
+
+def test24_build_used_signatures():
+    sources = {
+        'main.bminor': 'main: function integer () = {\n    print sq(7);\n    return 0;\n}\n',
+        'util.bminor': 'sq: function integer (x: integer) = {\n    return x * x;\n}\n',
+        'other.bminor': 'twice: function integer (x: integer) = {\n    return x + x;\n}\n',
+    }
+    import os, tempfile
+    from build import Project
+    print("=" * 70)
+    print("PRUEBA: compilación separada recompila solo a quien usa la firma")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory(prefix='bminor-test-') as tmp:
+        paths = [os.path.join(tmp, name) for name in sources]
+        for path, text in zip(paths, sources.values()):
+            with open(path, 'w') as f:
+                f.write(text)
+        project = Project(os.path.join(tmp, 'build'))
+        project.compile(paths)
+        first = [os.path.basename(p) for p in project.rebuilt]
+        # Una firma nueva en other.bminor: main.bminor no la nombra
+        with open(paths[2], 'a') as f:
+            f.write('thrice: function integer (x: integer) = {\n    return 3 * x;\n}\n')
+        project.compile(paths)
+        second = [os.path.basename(p) for p in project.rebuilt]
+        # Cambiar la firma de sq sí recompila main.bminor
+        with open(paths[1], 'w') as f:
+            f.write('sq: function float (x: integer) = {\n    return 1.5;\n}\n')
+        project.compile(paths)
+        third = [os.path.basename(p) for p in project.rebuilt]
+    print(first, second, third)
+    return (first == list(sources) and second == ['other.bminor']
+            and third == ['main.bminor', 'util.bminor'])
+
 # =====================================================================
 # MAIN
 # =====================================================================
@@ -287,9 +638,21 @@ if __name__ == '__main__':
         ("++/-- pre y post", test07_inc_dec_pre_post_mix),
         ("Arreglo local 1D", test08_array_local_expr_index),
         ("Arreglo global 1D", test09_array_global_expr_index),
-        ("for in range desazucarado", test10_for_in_range_desugar),
+        ("for in range", test10_for_in_range),
         ("Comparaciones combinadas", test11_comparisons_combo),
         ("Float (sin print)", test12_floats_ops_only),
+        ("Declaraciones en ciclos", test13_decl_inside_loops),
+        ("Prototipos", test14_prototype_then_definition),
+        ("Instrumentación", test15_instrumented_counters),
+        ("PGO", test16_profile_guided),
+        ("Objeto AOT", test17_aot_object),
+        ("range: límite una vez", test18_range_bound_once),
+        ("Operandos una vez", test19_operands_once),
+        ("Intérprete por niveles", test20_tiered_interpreter),
+        ("Paralelo con print", test21_parallel_print),
+        ("PGO a -O2", test22_profile_guided_o2),
+        ("Streaming por ventanas", test23_stream_windows),
+        ("Build: firmas usadas", test24_build_used_signatures),
     ]
     
     passed = 0
@@ -212,7 +212,7 @@ main: function integer () = {
     return sum;
 }
 '''
-    return test_code("for in range desazucarado", code, "10_for_range")
+    return test_code("for in range", code, "10_for_range")
 
 def test11_comparisons():
     code = '''
@@ -0,0 +1,216 @@
+# tracing.py
+'''
+Trazas del pipeline
+===================
+Puntos de instrumentación del compilador: parse_string, Check.checker
+(y el chequeo de cada función), IRGenerator (y el codegen de cada
+función), el optimizador (y cada pase) y el JIT abren un "span" en el
+tracer actual.
+
+Por defecto el tracer es nulo: span() devuelve siempre el mismo context
+manager vacío, así que la instrumentación apagada cuesta una llamada.
+Para registrar se instala un RecordingTracer:
+
+    from tracing import RecordingTracer, use_tracer
+    tracer = RecordingTracer()
+    with use_tracer(tracer):
+        compile_source(source)
+    tracer.write_chrome('traza.json')     # chrome://tracing o Perfetto
+    tracer.write_pstats('traza.prof')     # pstats.Stats('traza.prof')
+    tracer.print_summary()
+
+use_tracer() fija el tracer para el contexto actual (como
+errors.use_diagnostics); set_tracer() lo fija para todo el proceso.
+'''
+
+import contextlib
+import contextvars
+import json
+import marshal
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_null_span = _NullSpan()
+
+
+class Tracer:
+    '''
+    Tracer nulo: no registra nada
+    '''
+    enabled = False
+
+    def span(self, name, cat='', **args):
+        return _null_span
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start', 'child')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.child = 0          # ns dentro de spans hijos (para el tiempo propio)
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        stack.pop()
+        duration = end - self.start
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            parent.child += duration
+        self.tracer._record(self, duration, parent)
+        return False
+
+
+class SpanEvent:
+    '''
+    Un span terminado (tiempos en ns desde el inicio del tracer)
+    '''
+    __slots__ = ('name', 'cat', 'start', 'duration', 'self_time', 'tid', 'parent', 'args')
+
+    def __init__(self, name, cat, start, duration, self_time, tid, parent, args):
+        self.name = name
+        self.cat = cat
+        self.start = start
+        self.duration = duration
+        self.self_time = self_time
+        self.tid = tid
+        self.parent = parent        # (cat, name) del span que lo contiene, o None
+        self.args = args
+
+
+class RecordingTracer(Tracer):
+    '''
+    Registra todos los spans (de todos los hilos) en memoria
+    '''
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, name, cat='', **args):
+        return _Span(self, name, cat, args)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span, duration, parent):
+        event = SpanEvent(
+            span.name, span.cat, span.start - self.origin, duration, duration - span.child,
+            threading.get_ident(), (parent.cat, parent.name) if parent else None, span.args,
+        )
+        with self._lock:
+            self.events.append(event)
+
+    # -----------------------------------------------------------------
+    # Exportación
+    # -----------------------------------------------------------------
+
+    def chrome_trace(self):
+        '''
+        Eventos en formato Trace Event de Chrome (eventos completos 'X')
+        '''
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': e.name, 'cat': e.cat, 'ph': 'X',
+                    'ts': e.start / 1000, 'dur': e.duration / 1000,
+                    'pid': pid, 'tid': e.tid,
+                    'args': {k: str(v) for k, v in e.args.items()},
+                }
+                for e in sorted(self.events, key=lambda e: e.start)
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def write_chrome(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def pstats_dict(self):
+        '''
+        Estadísticas en el formato interno de pstats/cProfile:
+        {(archivo, línea, función): (cc, nc, tt, ct, llamadores)}, con la
+        categoría del span como "archivo" y su nombre como "función".
+        '''
+        stats = {}
+        for e in self.events:
+            key = (e.cat or 'bminor', 0, e.name)
+            cc, nc, tt, ct, callers = stats.get(key, (0, 0, 0.0, 0.0, {}))
+            stats[key] = (cc + 1, nc + 1, tt + e.self_time / 1e9, ct + e.duration / 1e9, callers)
+            if e.parent is not None:
+                caller = (e.parent[0] or 'bminor', 0, e.parent[1])
+                pcc, pnc, ptt, pct = callers.get(caller, (0, 0, 0.0, 0.0))
+                callers[caller] = (pcc + 1, pnc + 1, ptt + e.self_time / 1e9, pct + e.duration / 1e9)
+        return stats
+
+    def write_pstats(self, path):
+        '''
+        Archivo que se abre con pstats.Stats(path) (o snakeviz, etc.)
+        '''
+        with open(path, 'wb') as f:
+            marshal.dump(self.pstats_dict(), f)
+        return path
+
+    def print_summary(self, sort='cumulative', limit=None, stream=None):
+        import pstats
+        stats = pstats.Stats(stream=stream)
+        stats.stats = self.pstats_dict()
+        stats.get_top_level_stats()
+        stats.total_calls = sum(v[1] for v in stats.stats.values())
+        stats.prim_calls = sum(v[0] for v in stats.stats.values())
+        stats.sort_stats(sort).print_stats(*([limit] if limit else []))
+        return stats
+
+
+# Tracer global (nulo) y el del contexto actual
+_default = Tracer()
+_current = contextvars.ContextVar('bminor_tracer', default=None)
+
+def current_tracer():
+    return _current.get() or _default
+
+def set_tracer(tracer):
+    '''
+    Fija el tracer de todo el proceso (None: vuelve al nulo)
+    '''
+    global _default
+    _default = tracer or Tracer()
+
+@contextlib.contextmanager
+def use_tracer(tracer):
+    '''
+    Fija 'tracer' como tracer actual dentro del bloque with
+    '''
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)